@@ -0,0 +1,231 @@
+"""
+Embedding backend for the policy collection.
+
+Chroma's DefaultEmbeddingFunction builds a new ONNXMiniLM_L6_V2 on every
+call, so each policy query re-read the ONNX model and tokenizer from disk,
+and the first one downloaded the model from S3, which fails outright on
+air-gapped nodes. PolicyEmbeddings is the same model (all-MiniLM-L6-v2,
+ONNX, mean pooling, normalized), with these changes:
+
+  - it loads once per process, from POLICY_EMBEDDING_MODEL_DIR when set
+    (an extracted model.onnx + tokenizer.json; nothing is ever downloaded,
+    and missing files are a clear error), else from Chroma's model cache;
+  - load() loads eagerly (graph.warmup calls it at startup) and records
+    the load time;
+  - concurrent callers share model runs: while one batch is running, new
+    texts queue up and are embedded together in the next run (at most
+    EMBEDDING_BATCH_SIZE texts per run), and sequences are padded to the
+    longest in the batch instead of always to 256 tokens;
+  - EMBEDDING_THREADS sets ONNX Runtime's intra-op thread count;
+  - stats() reports load time, calls, model runs and per-call embed latency.
+
+It registers under Chroma's "default" name with an empty config, so it
+opens collections created with the default embedding function (by
+policy_agent, scripts/seed_policy.py or chroma-mcp-server) and produces the
+same vectors. Seeding and querying both use get_embedding_function().
+
+Settings (environment):
+  POLICY_EMBEDDINGS            local (default) | chroma (Chroma's DefaultEmbeddingFunction)
+  POLICY_EMBEDDING_MODEL_DIR   directory with model.onnx + tokenizer.json (offline)
+  EMBEDDING_THREADS            ONNX Runtime intra-op threads (default 0 = runtime default)
+  EMBEDDING_BATCH_SIZE         max texts per model run (default 32)
+"""
+import os
+import threading
+import time
+from functools import cached_property
+from typing import Any, Optional
+
+import numpy as np
+from chromadb.api.types import Documents, Embeddings
+from chromadb.utils.embedding_functions import DefaultEmbeddingFunction
+from chromadb.utils.embedding_functions.onnx_mini_lm_l6_v2 import ONNXMiniLM_L6_V2
+
+from graph.lazy_init import LazyInit
+
+POLICY_EMBEDDINGS = os.environ.get("POLICY_EMBEDDINGS", "local")
+POLICY_EMBEDDING_MODEL_DIR = os.environ.get("POLICY_EMBEDDING_MODEL_DIR", "")
+EMBEDDING_THREADS = int(os.environ.get("EMBEDDING_THREADS", "0"))
+EMBEDDING_BATCH_SIZE = int(os.environ.get("EMBEDDING_BATCH_SIZE", "32"))
+
+_MODEL_FILES = ("model.onnx", "tokenizer.json")
+
+
+class _EmbedRequest:
+    __slots__ = ("texts", "result", "error")
+
+    def __init__(self, texts: list[str]):
+        self.texts = texts
+        self.result: Optional[np.ndarray] = None
+        self.error: Optional[BaseException] = None
+
+
+class PolicyEmbeddings(ONNXMiniLM_L6_V2):
+    """all-MiniLM-L6-v2 on ONNX Runtime, loaded once, with shared batched runs."""
+
+    def __init__(
+        self,
+        model_dir: Optional[str] = None,
+        threads: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        preferred_providers: Optional[list[str]] = None,
+    ):
+        super().__init__(preferred_providers=preferred_providers)
+        model_dir = model_dir or POLICY_EMBEDDING_MODEL_DIR
+        # An explicit model directory means offline: never download
+        self.offline = bool(model_dir)
+        self.model_dir = model_dir or os.path.join(self.DOWNLOAD_PATH, self.EXTRACTED_FOLDER_NAME)
+        self.threads = EMBEDDING_THREADS if threads is None else threads
+        self.batch_size = max(1, EMBEDDING_BATCH_SIZE if batch_size is None else batch_size)
+        self.load_s: Optional[float] = None
+        self.calls = 0
+        self.texts = 0
+        self.runs = 0
+        self.embed_s = 0.0
+        self._pending: list[_EmbedRequest] = []
+        self._pending_lock = threading.Lock()
+        self._run_lock = threading.Lock()
+        self._load_lock = threading.Lock()
+
+    # Chroma persists the embedding function by name; match the default one
+    # so existing collections open with this backend.
+    @staticmethod
+    def name() -> str:
+        return DefaultEmbeddingFunction.name()
+
+    def get_config(self) -> dict[str, Any]:
+        return {}
+
+    @staticmethod
+    def build_from_config(config: dict[str, Any]) -> DefaultEmbeddingFunction:
+        return DefaultEmbeddingFunction.build_from_config(config)
+
+    @staticmethod
+    def validate_config(config: dict[str, Any]) -> None:
+        return
+
+    def default_space(self):
+        return "l2"  # DefaultEmbeddingFunction's
+
+    @cached_property
+    def tokenizer(self) -> Any:
+        tokenizer = self.Tokenizer.from_file(os.path.join(self.model_dir, "tokenizer.json"))
+        tokenizer.enable_truncation(max_length=self.max_tokens())
+        tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")  # to the longest in the batch
+        return tokenizer
+
+    @cached_property
+    def model(self) -> Any:
+        providers = self._preferred_providers or [
+            p for p in self.ort.get_available_providers() if p != "CoreMLExecutionProvider"
+        ]
+        so = self.ort.SessionOptions()
+        so.log_severity_level = 3
+        so.graph_optimization_level = self.ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if self.threads > 0:
+            so.intra_op_num_threads = self.threads
+        return self.ort.InferenceSession(
+            os.path.join(self.model_dir, "model.onnx"), providers=providers, sess_options=so
+        )
+
+    def _ensure_model(self) -> None:
+        if self.load_s is not None:
+            return
+        with self._load_lock:
+            if self.load_s is not None:
+                return
+            start = time.perf_counter()
+            if self.offline:
+                missing = [f for f in _MODEL_FILES if not os.path.exists(os.path.join(self.model_dir, f))]
+                if missing:
+                    raise FileNotFoundError(
+                        f"Embedding model files {missing} not found in POLICY_EMBEDDING_MODEL_DIR={self.model_dir}"
+                    )
+            else:
+                self._download_model_if_not_exists()
+            _ = self.tokenizer
+            _ = self.model
+            self.load_s = time.perf_counter() - start
+
+    def load(self) -> float:
+        """Load the tokenizer and model now; returns the load time in seconds."""
+        self._ensure_model()
+        return self.load_s
+
+    def _forward(self, documents: list[str], batch_size: Optional[int] = None) -> np.ndarray:
+        batch_size = batch_size or self.batch_size
+        out = []
+        for i in range(0, len(documents), batch_size):
+            encoded = self.tokenizer.encode_batch(documents[i:i + batch_size])
+            input_ids = np.array([e.ids for e in encoded], dtype=np.int64)
+            attention_mask = np.array([e.attention_mask for e in encoded], dtype=np.int64)
+            hidden = self.model.run(None, {
+                "input_ids": input_ids,
+                "attention_mask": attention_mask,
+                "token_type_ids": np.zeros_like(input_ids),
+            })[0]
+            mask = attention_mask[..., None].astype(hidden.dtype)
+            pooled = (hidden * mask).sum(1) / np.clip(mask.sum(1), 1e-9, None)
+            out.append(self._normalize(pooled).astype(np.float32))
+            self.runs += 1
+        return np.concatenate(out)
+
+    def __call__(self, input: Documents) -> Embeddings:
+        self._ensure_model()
+        start = time.perf_counter()
+        request = _EmbedRequest(list(input))
+        with self._pending_lock:
+            self._pending.append(request)
+        with self._run_lock:
+            if request.result is None and request.error is None:
+                # Embed everything queued while the previous run was busy
+                with self._pending_lock:
+                    batch, self._pending = self._pending, []
+                try:
+                    vectors = self._forward([t for r in batch for t in r.texts])
+                except Exception as e:
+                    for r in batch:
+                        r.error = e
+                else:
+                    offset = 0
+                    for r in batch:
+                        r.result = vectors[offset:offset + len(r.texts)]
+                        offset += len(r.texts)
+        if request.error is not None:
+            raise request.error
+        with self._pending_lock:
+            self.calls += 1
+            self.texts += len(request.texts)
+            self.embed_s += time.perf_counter() - start
+        return [np.array(v, dtype=np.float32) for v in request.result]
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "model_dir": self.model_dir,
+            "threads": self.threads,
+            "load_s": self.load_s,
+            "calls": self.calls,
+            "texts": self.texts,
+            "runs": self.runs,
+            "mean_embed_ms": self.embed_s / self.calls * 1e3 if self.calls else 0.0,
+        }
+
+
+def _new_embedding_function():
+    if POLICY_EMBEDDINGS == "chroma":
+        return DefaultEmbeddingFunction()
+    return PolicyEmbeddings()
+
+
+_embeddings = LazyInit(_new_embedding_function, name="policy embeddings")
+
+
+def get_embedding_function():
+    """Process-wide embedding function for policy collections (seed and query)."""
+    return _embeddings.get()
+
+
+def embedding_stats() -> dict[str, Any]:
+    """Load time and embed latency of the policy embedding backend (empty until used)."""
+    fn = _embeddings.peek()
+    return fn.stats() if isinstance(fn, PolicyEmbeddings) else {}
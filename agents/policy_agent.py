@@ -6,11 +6,23 @@ Sprint 4: switched from EphemeralClient to PersistentClient at ./data/vector_sto
 so the vector store survives restarts. Run `python scripts/seed_policy.py` once to
 populate the store.
 """
+import asyncio
 import os
+import threading
+import warnings
 from typing import Optional
 
+import numpy as np
 from dotenv import load_dotenv
 
+from agents.embeddings import get_embedding_function
+from agents.policy_cache import PolicyCache, normalize_query, store_version
+from agents.policy_hnsw import collection_configuration, sync_collection_settings
+from agents.policy_lexical import POLICY_RETRIEVAL, BM25Index, choose_mode, reciprocal_rank_fusion
+from agents.policy_matrix import POLICY_INDEX, POLICY_INDEX_DIR, MatrixIndex
+from agents.policy_scope import chroma_query_scoped, in_department, policy_where_for, where_key
+from graph.lazy_init import LazyInit
+
 load_dotenv()
 
 _LLM_MODEL = os.environ.get("LLM_MODEL", "gemini-2.5-pro")
@@ -32,47 +44,321 @@ DEFAULT_POLICIES = [
     "Referrals: Specialist referrals require prior authorization. Allow 5-7 business days for processing.",
 ]
 
-_collection = None
+# Department / topic of each DEFAULT_POLICIES entry (agents.policy_scope filters on these)
+DEFAULT_POLICY_METADATA = [
+    {"department": "pharmacy", "topic": "prescription refills"},
+    {"department": "scheduling", "topic": "appointments"},
+    {"department": "nursing", "topic": "clinical questions"},
+    {"department": "billing", "topic": "billing"},
+    {"department": "general", "topic": "emergency"},
+    {"department": "laboratory", "topic": "lab results"},
+    {"department": "referrals", "topic": "referrals"},
+]
+
+
+def tag_default_policies(coll) -> int:
+    """Add department/topic metadata to seeded DEFAULT_POLICIES docs that
+    predate it (stores seeded before scoping); returns how many were tagged."""
+    ids = [f"policy_{i}" for i in range(len(DEFAULT_POLICIES))]
+    existing = coll.get(ids=ids, include=["metadatas"])
+    by_id = dict(zip(existing["ids"], existing["metadatas"]))
+    untagged = [i for i, doc_id in enumerate(ids) if doc_id in by_id and "department" not in (by_id[doc_id] or {})]
+    if untagged:
+        coll.update(
+            ids=[ids[i] for i in untagged],
+            metadatas=[{**(by_id[ids[i]] or {}), **DEFAULT_POLICY_METADATA[i]} for i in untagged],
+        )
+    return len(untagged)
+
+
+def _new_client():
+    import chromadb
+    os.makedirs(VECTOR_STORE_PATH, exist_ok=True)
+    return chromadb.PersistentClient(path=VECTOR_STORE_PATH)
+
+
+def _new_collection():
+    coll = _get_client().get_or_create_collection(
+        "hospital_policies",
+        metadata={"description": "Clinic policy snippets"},
+        configuration=collection_configuration(),
+        embedding_function=get_embedding_function(),
+    )
+    # get_or_create keeps an existing collection's settings: apply search-time
+    # changes, and flag build-time ones (agents.policy_hnsw)
+    drift = sync_collection_settings(coll)["rebuild_needed"]
+    if drift:
+        warnings.warn(
+            "hospital_policies was built with different HNSW settings "
+            f"({', '.join(f'{k}: {old} -> {new}' for k, (old, new) in drift.items())}); "
+            "run scripts/rebuild_policy_index.py to apply them."
+        )
+    # Inline fallback seed if store is empty (e.g. seed script not yet run)
+    if coll.count() == 0:
+        ids = [f"policy_{i}" for i in range(len(DEFAULT_POLICIES))]
+        coll.add(documents=DEFAULT_POLICIES, ids=ids, metadatas=DEFAULT_POLICY_METADATA)
+    else:
+        tag_default_policies(coll)
+    return coll
+
+
+# Process-wide Chroma client and collection, built once; a failed build is
+# cached with backoff (graph.lazy_init) instead of retried on every call
+_client = LazyInit(_new_client, name="Chroma client")
+_collection = LazyInit(_new_collection, name="hospital_policies collection")
+
+
+def _get_client():
+    """Lazy-init the process-wide ChromaDB PersistentClient on VECTOR_STORE_PATH."""
+    return _client.get()
 
 
 def _get_collection():
-    """Lazy-init ChromaDB collection with default policy documents (persistent store)."""
-    global _collection
-    if _collection is not None:
-        return _collection
+    """Lazy-init ChromaDB collection with default policy documents (persistent store).
+    None while the store is unavailable."""
     try:
-        import chromadb
-        os.makedirs(VECTOR_STORE_PATH, exist_ok=True)
-        client = chromadb.PersistentClient(path=VECTOR_STORE_PATH)
-        coll = client.get_or_create_collection(
-            "hospital_policies",
-            metadata={"description": "Clinic policy snippets"},
-        )
-        # Inline fallback seed if store is empty (e.g. seed script not yet run)
-        if coll.count() == 0:
-            ids = [f"policy_{i}" for i in range(len(DEFAULT_POLICIES))]
-            coll.add(documents=DEFAULT_POLICIES, ids=ids)
-        _collection = coll
-        return coll
+        return _collection.get()
     except Exception:
         return None
 
 
-def get_relevant_policy(message: str, triage_summary: str = "", top_k: int = 3) -> list[str]:
+# Retrieval results per (normalized query, top_k), dropped whenever the store
+# changes (see agents.policy_cache)
+_policy_cache = PolicyCache()
+
+
+def policy_cache_stats() -> dict:
+    """Hit/miss counts of the policy retrieval cache."""
+    return _policy_cache.stats()
+
+
+# BM25 index over the same documents (agents.policy_lexical), rebuilt from the
+# collection whenever the store version changes and updated in place by
+# ingest_policy_directory()
+_lexical = BM25Index()
+_lexical_lock = threading.Lock()
+
+
+def _get_lexical_index(coll) -> BM25Index:
+    version = store_version(VECTOR_STORE_PATH)
+    if _lexical.version != version or version is None:
+        with _lexical_lock:
+            if _lexical.version != version or version is None:
+                _lexical.build(coll)
+                _lexical.version = version
+    return _lexical
+
+
+# Exact-search matrix over the collection's embeddings (agents.policy_matrix),
+# used instead of Chroma's HNSW query with POLICY_INDEX=numpy; rebuilt from the
+# stored embeddings whenever the store version changes
+_matrix: Optional[MatrixIndex] = None
+_matrix_lock = threading.Lock()
+
+
+def _get_matrix_index(coll) -> MatrixIndex:
+    global _matrix
+    path = POLICY_INDEX_DIR or os.path.join(VECTOR_STORE_PATH, "matrix_index")
+    version = store_version(VECTOR_STORE_PATH)
+    with _matrix_lock:
+        if _matrix is None or _matrix.path != path:
+            _matrix = MatrixIndex(path)
+        _matrix.load()  # picks up a generation another worker wrote
+        if _matrix.version != version or version is None:
+            _matrix.build(coll, version)
+        return _matrix
+
+
+def _vector_search_batch(coll, queries: list[str], n: int, where: Optional[dict] = None) -> list[list[tuple[str, str]]]:
+    """(id, document) of the n nearest chunks per query: one embedding batch
+    and one index query for all of them, restricted to where if given."""
+    if not queries:
+        return []
+    if POLICY_INDEX == "numpy":
+        # Embed with the collection's own function so vectors match the stored ones
+        embed = getattr(coll, "_embedding_function", None) or get_embedding_function()
+        return _get_matrix_index(coll).query(np.asarray(embed(queries)), n, where)
+    ranked = chroma_query_scoped(coll, n, where, query_texts=queries)
+    return ranked + [[] for _ in range(len(queries) - len(ranked))]
+
+
+def _rank_batch(
+    coll, queries: list[str], top_k: int, depth: int, mode: Optional[str] = None, where: Optional[dict] = None,
+) -> list[list[tuple[str, str]]]:
+    """Ranked (id, document) lists of up to depth entries per query. Lexical
+    queries are answered from the BM25 index; every query that needs vectors
+    shares one _vector_search_batch call."""
+    requested = mode or POLICY_RETRIEVAL
+    fusion_depth = max(top_k * 4, 10, depth)
+    ranked: list[list[tuple[str, str]]] = [[] for _ in queries]
+    lexical: dict[int, list[str]] = {}  # hybrid queries' BM25 rankings
+    needs_vector: list[int] = []
+    for i, query in enumerate(queries):
+        chosen = choose_mode(query, mode)
+        if chosen != "vector":
+            index = _get_lexical_index(coll)
+            hits = [doc_id for doc_id, _ in index.search(query, depth if chosen == "lexical" else fusion_depth, where)]
+            if chosen == "lexical":
+                if hits or requested == "lexical":
+                    ranked[i] = [(doc_id, index.document(doc_id)) for doc_id in hits]
+                    continue
+                # A short query with no keyword match: embeddings may still find it
+            else:
+                lexical[i] = hits
+        needs_vector.append(i)
+    vector = _vector_search_batch(coll, [queries[i] for i in needs_vector], fusion_depth if lexical else depth, where)
+    for i, hits in zip(needs_vector, vector):
+        if i not in lexical:
+            ranked[i] = hits[:depth]
+            continue
+        docs = dict(hits)
+        fused = reciprocal_rank_fusion([lexical[i], [doc_id for doc_id, _ in hits]])[:depth]
+        ranked[i] = [(doc_id, docs.get(doc_id) or _lexical.document(doc_id)) for doc_id in fused]
+    return ranked
+
+
+def _rank_batch_scoped(
+    coll, queries: list[str], top_k: int, depth: int, where: Optional[dict] = None,
+) -> list[list[tuple[str, str]]]:
+    """_rank_batch within where; a query whose hits are all "general" chunks
+    (nothing from its departments) is ranked over the whole collection."""
+    results = _rank_batch(coll, queries, top_k, depth, where=where)
+    if not where:
+        return results
+    index = _get_lexical_index(coll)
+    missed = [i for i, hits in enumerate(results) if not any(in_department(index.metadata(d)) for d, _ in hits)]
+    if missed:
+        for i, hits in zip(missed, _rank_batch(coll, [queries[i] for i in missed], top_k, depth)):
+            results[i] = hits
+    return results
+
+
+def search_policies(query: str, top_k: int = 3, mode: Optional[str] = None, where: Optional[dict] = None) -> list[str]:
+    """
+    Uncached policy search. mode is "vector", "lexical" or "hybrid" (vector and
+    BM25 rankings merged by reciprocal rank fusion); default POLICY_RETRIEVAL,
+    with short keyword queries answered lexically when they match.
+    where is a metadata filter (see agents.policy_scope.policy_where).
+    """
+    coll = _get_collection()
+    if not coll:
+        return []
+    return [doc for _, doc in _rank_batch(coll, [query], top_k, top_k, mode, where)[0]]
+
+
+def policy_chunk_ids(chunks: list[str]) -> list[str]:
+    """Store ids of retrieved policy chunks, in order ("" for text not in the store)."""
+    coll = _get_collection()
+    if not coll or not chunks:
+        return ["" for _ in chunks]
+    index = _get_lexical_index(coll)
+    return [index.id_of(chunk) or "" for chunk in chunks]
+
+
+def get_relevant_policy(
+    message: str, triage_summary: str = "", top_k: int = 3, where: Optional[dict] = None,
+) -> list[str]:
     """
     Retrieve policy snippets relevant to the message and triage summary.
     Returns list of text chunks (empty if ChromaDB unavailable).
+    where limits the search to a department scope (policy_where /
+    policy_where_for); if no chunk of those departments matches (only
+    "general" ones), the whole collection is searched instead.
+    Repeated queries are served from the policy cache until the store changes.
     """
+    query = f"{message}\n{triage_summary}".strip() or "general policy"
+    version = store_version(VECTOR_STORE_PATH)
+    scope = where_key(where)
+    cached = _policy_cache.get(query, top_k, version, scope)
+    if cached is not None:
+        return cached
     coll = _get_collection()
     if not coll:
         return []
     try:
-        query = f"{message}\n{triage_summary}".strip() or "general policy"
-        results = coll.query(query_texts=[query], n_results=min(top_k, coll.count()))
-        docs = results.get("documents", [[]])
-        return docs[0] if docs else []
+        chunks = [doc for _, doc in _rank_batch_scoped(coll, [query], top_k, top_k, where)[0]]
     except Exception:
+        if _collection.ready:
+            _collection.reset()  # e.g. rebuilt by another process (scripts/rebuild_policy_index.py): reopen next time
         return []
+    _policy_cache.put(query, top_k, version, chunks, scope)
+    return chunks
+
+
+def get_relevant_policy_batch(
+    queries: list[str], top_k: int = 3, dedupe: bool = True, where: Optional[dict] = None,
+) -> list[list[str]]:
+    """
+    Policy snippets for several queries at once (e.g. one per intent of a
+    multi-intent message); one list per query, in order.
+    Queries that normalize to the same text are searched once, and all vector
+    lookups share one embedding batch and one collection query. With dedupe,
+    a snippet is returned only under the first query that retrieves it, and
+    later queries are backfilled from their next-best matches.
+    where limits every query to a department scope, as in get_relevant_policy.
+    Empty lists if ChromaDB is unavailable.
+    """
+    queries = [q.strip() or "general policy" for q in queries]
+    unique = list(dict.fromkeys(normalize_query(q) for q in queries))
+    originals = {normalize_query(q): q for q in reversed(queries)}  # first spelling wins
+    depth = top_k * len(unique) if dedupe else top_k
+    version = store_version(VECTOR_STORE_PATH)
+    scope = where_key(where)
+    ranked: dict[str, list[str]] = {}
+    for key in unique:
+        cached = _policy_cache.get(originals[key], depth, version, scope)
+        if cached is not None:
+            ranked[key] = cached
+    missing = [key for key in unique if key not in ranked]
+    if missing:
+        coll = _get_collection()
+        if not coll:
+            return [[] for _ in queries]
+        try:
+            results = _rank_batch_scoped(coll, [originals[key] for key in missing], top_k, depth, where)
+        except Exception:
+            if _collection.ready:
+                _collection.reset()
+            return [[] for _ in queries]
+        for key, hits in zip(missing, results):
+            ranked[key] = [doc for _, doc in hits]
+            _policy_cache.put(originals[key], depth, version, ranked[key], scope)
+
+    per_query: dict[str, list[str]] = {}
+    claimed: set[str] = set()
+    for key in unique:
+        chunks = [doc for doc in ranked[key] if not (dedupe and doc in claimed)][:top_k]
+        claimed.update(chunks)
+        per_query[key] = chunks
+    return [list(per_query[normalize_query(q)]) for q in queries]
+
+
+def ingest_policy_directory(root: str, **kwargs) -> dict:
+    """agents.policy_ingest.ingest_directory on the policy collection, keeping
+    the BM25 index in step instead of rebuilding it."""
+    from agents.policy_ingest import ingest_directory
+    coll = _collection.get()
+    with _lexical_lock:
+        in_sync = _lexical.version is not None and _lexical.version == store_version(VECTOR_STORE_PATH)
+        report = ingest_directory(root, coll, index=_lexical if in_sync else None, **kwargs)
+        if in_sync:
+            _lexical.version = store_version(VECTOR_STORE_PATH)
+    return report
+
+
+def _draft_prompt(message: str, triage_result: dict, policy_text: str) -> str:
+    return f"""You are a clinic staff member drafting a reply to a patient message. Use the clinic policy context below. Be professional and concise. Do not make medical diagnoses.
+
+Patient message:
+{message[:1500]}
+
+Triage: {triage_result.get('urgency', 'N/A')} – {triage_result.get('summary', '')}
+Recommended queue: {triage_result.get('recommended_queue', '')}
+
+Policy context:
+{policy_text[:2000]}
+
+Write a short draft reply (2-4 sentences) that staff can edit before sending. If the message is an emergency, suggest they call 911 or go to the ER."""
 
 
 def generate_draft_reply(
@@ -85,7 +371,9 @@ def generate_draft_reply(
     Uses Gemini when LLM_GEMINI_API_KEY is set; otherwise returns a short placeholder.
     """
     if policy_chunks is None:
-        policy_chunks = get_relevant_policy(message, triage_result.get("summary", ""))
+        policy_chunks = get_relevant_policy(
+            message, triage_result.get("summary", ""), where=policy_where_for(triage_result)
+        )
     policy_text = "\n".join(policy_chunks) if policy_chunks else "No specific policy retrieved."
     api_key = os.environ.get("LLM_GEMINI_API_KEY")
     if not api_key:
@@ -94,21 +382,36 @@ def generate_draft_reply(
     try:
         from google import genai
         client = genai.Client(api_key=api_key)
-        prompt = f"""You are a clinic staff member drafting a reply to a patient message. Use the clinic policy context below. Be professional and concise. Do not make medical diagnoses.
-
-Patient message:
-{message[:1500]}
+        response = client.models.generate_content(
+            model=_LLM_MODEL,
+            contents=_draft_prompt(message, triage_result, policy_text),
+        )
+        return (response.text or "").strip() or "[No draft generated.]"
+    except Exception:
+        return f"[Draft generation failed.] Policy context:\n{policy_text[:300]}..."
 
-Triage: {triage_result.get('urgency', 'N/A')} – {triage_result.get('summary', '')}
-Recommended queue: {triage_result.get('recommended_queue', '')}
 
-Policy context:
-{policy_text[:2000]}
+async def agenerate_draft_reply(
+    message: str,
+    triage_result: dict,
+    policy_chunks: Optional[list[str]] = None,
+) -> str:
+    """Async variant of generate_draft_reply using the Gemini client's aio surface."""
+    if policy_chunks is None:
+        policy_chunks = await asyncio.to_thread(
+            get_relevant_policy, message, triage_result.get("summary", ""), 3, policy_where_for(triage_result)
+        )
+    policy_text = "\n".join(policy_chunks) if policy_chunks else "No specific policy retrieved."
+    api_key = os.environ.get("LLM_GEMINI_API_KEY")
+    if not api_key:
+        return f"[Draft reply – add LLM key to generate]\nPolicy context:\n{policy_text[:200]}..."
 
-Write a short draft reply (2-4 sentences) that staff can edit before sending. If the message is an emergency, suggest they call 911 or go to the ER."""
-        response = client.models.generate_content(
+    try:
+        from google import genai
+        client = genai.Client(api_key=api_key)
+        response = await client.aio.models.generate_content(
             model=_LLM_MODEL,
-            contents=prompt,
+            contents=_draft_prompt(message, triage_result, policy_text),
         )
         return (response.text or "").strip() or "[No draft generated.]"
     except Exception:
@@ -125,7 +428,9 @@ def generate_next_steps(
     Returns a list of short action items.
     """
     if policy_chunks is None:
-        policy_chunks = get_relevant_policy(message, triage_result.get("summary", ""))
+        policy_chunks = get_relevant_policy(
+            message, triage_result.get("summary", ""), where=policy_where_for(triage_result)
+        )
     policy_text = "\n".join(policy_chunks) if policy_chunks else ""
     api_key = os.environ.get("LLM_GEMINI_API_KEY")
     if not api_key:
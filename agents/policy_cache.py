@@ -0,0 +1,123 @@
+"""
+LRU + TTL cache for policy retrieval results.
+
+get_relevant_policy runs for every draft reply, and the staff view calls it
+twice per render (draft and next steps). Streamlit re-renders on every
+click, so the same query was embedded and searched again and again.
+
+Results are cached per (normalized query, top_k, scope, store version),
+where scope is the department filter (agents.policy_scope.where_key):
+
+  - the query is lowercased with whitespace collapsed;
+  - the store version is the mtime and size of the Chroma SQLite file,
+    which every write (including a re-seed from another process) changes.
+    A version change clears the cache, so stale policy text is never
+    served, even within the TTL;
+  - entries expire after POLICY_CACHE_TTL_S, and the least recently used
+    entry is evicted beyond POLICY_CACHE_SIZE.
+
+stats() reports hits, misses, hit rate, and the number of expirations,
+evictions and invalidations.
+
+Settings (environment):
+  POLICY_CACHE_SIZE    max cached queries (default 256, 0 = cache disabled)
+  POLICY_CACHE_TTL_S   entry lifetime in seconds (default 600)
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+POLICY_CACHE_SIZE = int(os.environ.get("POLICY_CACHE_SIZE", "256"))
+POLICY_CACHE_TTL_S = float(os.environ.get("POLICY_CACHE_TTL_S", "600"))
+
+
+def normalize_query(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def store_version(path: str) -> Optional[tuple[int, int]]:
+    """Version stamp of a persistent Chroma store (None if it has no data file)."""
+    try:
+        st = os.stat(os.path.join(path, "chroma.sqlite3"))
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class PolicyCache:
+    """Thread-safe LRU of retrieval results with a TTL and a store version."""
+
+    def __init__(
+        self,
+        max_entries: int = POLICY_CACHE_SIZE,
+        ttl_s: float = POLICY_CACHE_TTL_S,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.clock = clock
+        self._entries: "OrderedDict[tuple, tuple[float, Any]]" = OrderedDict()
+        self._version: Any = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _check_version(self, version: Any) -> None:
+        if version != self._version:
+            if self._entries:
+                self.invalidations += 1
+            self._entries.clear()
+            self._version = version
+
+    def get(self, query: str, top_k: int, version: Any, scope: str = "") -> Optional[list[str]]:
+        """Cached result (a copy), or None on a miss."""
+        if self.max_entries <= 0:
+            return None
+        key = (normalize_query(query), top_k, scope)
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is not None and self.clock() - entry[0] > self.ttl_s:
+                del self._entries[key]
+                self.expired += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return list(entry[1])
+
+    def put(self, query: str, top_k: int, version: Any, result: list[str], scope: str = "") -> None:
+        if self.max_entries <= 0:
+            return
+        key = (normalize_query(query), top_k, scope)
+        with self._lock:
+            self._check_version(version)
+            self._entries[key] = (self.clock(), list(result))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "expired": self.expired,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
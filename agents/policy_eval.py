@@ -0,0 +1,149 @@
+"""
+Labelled query set and metrics for policy retrieval benchmarks.
+
+The triage eval datasets (tests/eval_dataset*.json) label each patient
+message with an intent and an emergency flag. labeled_queries() turns them
+into retrieval cases: the message is the query and the expected documents
+are the DEFAULT_POLICIES entries (ids policy_0 .. policy_6) a staff member
+would want next to it:
+
+  emergency             policy_4 (emergency guidance) only
+  Refill                policy_0
+  Appointment           policy_1
+  Clinical Question     policy_2, or policy_5 / policy_6 when the message is
+                        about lab results / a referral or prior auth
+  Billing               policy_3
+  Multiple              every policy whose keywords appear in the message
+
+Messages are deduplicated across files (eval_dataset_large repeats
+eval_dataset). Items with no intent and no emergency flag are skipped.
+
+recall_at_k() and reciprocal_rank() score one ranked id list;
+retrieval_metrics() and latency_summary() aggregate them. Used by
+scripts/bench_policy_rag.py.
+"""
+import glob
+import json
+import os
+import statistics
+from typing import Iterable, Optional
+
+from agents.policy_cache import normalize_query
+
+EVAL_DATASET_GLOB = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tests", "eval_dataset*.json"
+)
+
+EMERGENCY_POLICY = "policy_4"
+
+INTENT_POLICIES = {
+    "Refill": ["policy_0"],
+    "Appointment": ["policy_1"],
+    "Clinical Question": ["policy_2"],
+    "Billing": ["policy_3"],
+}
+
+# Keyword in a message -> policy it asks about (clinical questions and multi-intent messages)
+POLICY_KEYWORDS = [
+    ("refill", "policy_0"),
+    ("prescription", "policy_0"),
+    ("pharmacy", "policy_0"),
+    ("appointment", "policy_1"),
+    ("schedule", "policy_1"),
+    ("reschedule", "policy_1"),
+    ("book", "policy_1"),
+    ("bill", "policy_3"),
+    ("charge", "policy_3"),
+    ("insurance", "policy_3"),
+    ("statement", "policy_3"),
+    ("payment", "policy_3"),
+    ("lab result", "policy_5"),
+    ("test result", "policy_5"),
+    ("blood work", "policy_5"),
+    ("bloodwork", "policy_5"),
+    ("results", "policy_5"),
+    ("referral", "policy_6"),
+    ("prior auth", "policy_6"),
+    ("specialist", "policy_6"),
+]
+
+
+def _keyword_policies(message: str) -> list[str]:
+    text = message.lower()
+    return list(dict.fromkeys(policy for keyword, policy in POLICY_KEYWORDS if keyword in text))
+
+
+def expected_policies(item: dict) -> list[str]:
+    """Policy ids relevant to one eval item (empty if it cannot be labelled)."""
+    message = item.get("message") or item.get("patient_message") or ""
+    intent = item.get("expected_intent")
+    if item.get("is_emergency"):
+        return [EMERGENCY_POLICY]
+    if intent == "Multiple":
+        return _keyword_policies(message) or INTENT_POLICIES["Clinical Question"]
+    if intent == "Clinical Question":
+        specific = [p for p in _keyword_policies(message) if p in ("policy_5", "policy_6")]
+        return specific or INTENT_POLICIES[intent]
+    return list(INTENT_POLICIES.get(intent, []))
+
+
+def labeled_queries(paths: Optional[Iterable[str]] = None) -> list[dict]:
+    """[{"id", "source", "query", "intent", "expected"}] from the eval datasets."""
+    cases, seen = [], set()
+    for path in sorted(paths or glob.glob(EVAL_DATASET_GLOB)):
+        with open(path) as f:
+            items = json.load(f)
+        for item in items:
+            query = item.get("message") or item.get("patient_message") or ""
+            expected = expected_policies(item)
+            key = normalize_query(query)
+            if not expected or not key or key in seen:
+                continue
+            seen.add(key)
+            cases.append({
+                "id": item.get("id", ""),
+                "source": os.path.basename(path),
+                "query": query,
+                "intent": "Emergency" if item.get("is_emergency") else item.get("expected_intent", ""),
+                "expected": expected,
+            })
+    return cases
+
+
+def recall_at_k(ranked: list[str], expected: list[str], k: int) -> float:
+    """Share of the expected ids found in the top k."""
+    return len(set(ranked[:k]) & set(expected)) / len(expected) if expected else 0.0
+
+
+def reciprocal_rank(ranked: list[str], expected: list[str]) -> float:
+    """1 / rank of the first expected id (0 if none was retrieved)."""
+    for rank, doc_id in enumerate(ranked, 1):
+        if doc_id in expected:
+            return 1.0 / rank
+    return 0.0
+
+
+def retrieval_metrics(rankings: list[list[str]], cases: list[dict], ks: Iterable[int] = (1, 3, 5)) -> dict:
+    """Mean recall@k per k and MRR over all cases, plus recall@max(k) per intent."""
+    ks = sorted(ks)
+    metrics = {
+        f"recall@{k}": statistics.mean(recall_at_k(r, c["expected"], k) for r, c in zip(rankings, cases)) for k in ks
+    }
+    metrics["mrr"] = statistics.mean(reciprocal_rank(r, c["expected"]) for r, c in zip(rankings, cases))
+    by_intent: dict[str, list[float]] = {}
+    for ranked, case in zip(rankings, cases):
+        by_intent.setdefault(case["intent"], []).append(recall_at_k(ranked, case["expected"], ks[-1]))
+    metrics[f"recall@{ks[-1]}_by_intent"] = {intent: statistics.mean(v) for intent, v in sorted(by_intent.items())}
+    return metrics
+
+
+def latency_summary(seconds: list[float]) -> dict:
+    """Mean and p50 / p95 / p99 in milliseconds."""
+    ms = sorted(s * 1e3 for s in seconds)
+    if not ms:
+        return {}
+
+    def pct(p: float) -> float:
+        return ms[min(len(ms) - 1, int(round(p / 100 * (len(ms) - 1))))]
+
+    return {"n": len(ms), "mean_ms": statistics.mean(ms), "p50_ms": pct(50), "p95_ms": pct(95), "p99_ms": pct(99)}
@@ -0,0 +1,163 @@
+"""
+HNSW settings for the hospital_policies collection, and an in-place rebuild.
+
+The collection used to be created with Chroma's defaults, so nothing could
+trade recall against latency as the corpus grew. The parameters now come
+from the environment. Every get_or_create_collection("hospital_policies")
+(policy_agent, seed_policy, ingest_policies) passes collection_configuration().
+
+Chroma fixes some parameters when the collection is created and lets
+others change later:
+
+  build    space, ef_construction, max_neighbors (M): a change needs a
+           rebuild (scripts/rebuild_policy_index.py);
+  search   ef_search, sync_threshold, resize_factor, batch_size: applied to
+           an existing collection by sync_collection_settings() when it is
+           opened. Chroma reads them when it loads the index, so the sync
+           runs before the first query; a process that has already queried
+           the collection keeps the old values until it restarts. Chroma
+           does not report batch_size back, so a change to it is only
+           applied by a rebuild.
+
+rebuild_collection() recreates the collection under new build settings
+from what the store already holds: ids, documents, metadatas and
+embeddings. Nothing is re-ingested or re-embedded. The copy is filled under
+a temporary name and then swapped in; the old collection is kept under a
+backup name until the swap succeeds. Other processes reopen the collection
+on their next failed query (agents.policy_agent resets its handle).
+
+scripts/sweep_policy_hnsw.py measures latency and recall@k against exact
+search for a grid of settings.
+
+Settings (environment):
+  POLICY_HNSW_SPACE            distance: l2 (default, Chroma's), cosine or ip
+  POLICY_HNSW_M                max_neighbors per node (default 16)
+  POLICY_HNSW_EF_CONSTRUCTION  build-time candidate list (default 100)
+  POLICY_HNSW_EF_SEARCH        query-time candidate list (default 100; higher = better recall, slower)
+  POLICY_HNSW_BATCH_SIZE       vectors buffered before they are indexed (default 100)
+  POLICY_HNSW_SYNC_THRESHOLD   vectors between index syncs to disk (default 1000)
+"""
+import os
+import time
+from typing import Any, Optional
+
+POLICY_HNSW_SPACE = os.environ.get("POLICY_HNSW_SPACE", "l2")
+POLICY_HNSW_M = int(os.environ.get("POLICY_HNSW_M", "16"))
+POLICY_HNSW_EF_CONSTRUCTION = int(os.environ.get("POLICY_HNSW_EF_CONSTRUCTION", "100"))
+POLICY_HNSW_EF_SEARCH = int(os.environ.get("POLICY_HNSW_EF_SEARCH", "100"))
+POLICY_HNSW_BATCH_SIZE = int(os.environ.get("POLICY_HNSW_BATCH_SIZE", "100"))
+POLICY_HNSW_SYNC_THRESHOLD = int(os.environ.get("POLICY_HNSW_SYNC_THRESHOLD", "1000"))
+
+BUILD_KEYS = ("space", "ef_construction", "max_neighbors")
+SEARCH_KEYS = ("ef_search", "sync_threshold", "resize_factor", "batch_size")
+
+
+def hnsw_settings(**overrides: Any) -> dict[str, Any]:
+    """The configured HNSW parameters (Chroma's key names), with overrides."""
+    settings = {
+        "space": POLICY_HNSW_SPACE,
+        "max_neighbors": POLICY_HNSW_M,
+        "ef_construction": POLICY_HNSW_EF_CONSTRUCTION,
+        "ef_search": POLICY_HNSW_EF_SEARCH,
+        "batch_size": POLICY_HNSW_BATCH_SIZE,
+        "sync_threshold": POLICY_HNSW_SYNC_THRESHOLD,
+    }
+    settings.update({k: v for k, v in overrides.items() if v is not None})
+    return settings
+
+
+def collection_configuration(**overrides: Any) -> dict[str, Any]:
+    """configuration= argument for create / get_or_create_collection."""
+    return {"hnsw": hnsw_settings(**overrides)}
+
+
+def current_settings(coll) -> dict[str, Any]:
+    return dict((coll.configuration or {}).get("hnsw") or {})
+
+
+def sync_collection_settings(coll, settings: Optional[dict] = None) -> dict[str, dict]:
+    """Apply changed search-time settings to an existing collection. Returns
+    {"updated": {key: (old, new)}, "rebuild_needed": {key: (old, new)}};
+    build-time differences are only reported."""
+    settings = settings or hnsw_settings()
+    current = current_settings(coll)
+    updated = {
+        k: (current[k], settings[k]) for k in SEARCH_KEYS
+        if k in settings and k in current and current[k] != settings[k]
+    }
+    rebuild_needed = {
+        k: (current[k], settings[k]) for k in BUILD_KEYS
+        if k in settings and k in current and current[k] != settings[k]
+    }
+    if updated:
+        coll.modify(configuration={"hnsw": {k: new for k, (_, new) in updated.items()}})
+    return {"updated": updated, "rebuild_needed": rebuild_needed}
+
+
+def _copy(source, target, batch_size: int) -> int:
+    copied, offset = 0, 0
+    while True:
+        page = source.get(include=["documents", "metadatas", "embeddings"], limit=batch_size, offset=offset)
+        if not page["ids"]:
+            return copied
+        target.add(
+            ids=page["ids"],
+            documents=page["documents"],
+            metadatas=[m or None for m in page["metadatas"]],
+            embeddings=page["embeddings"],
+        )
+        copied += len(page["ids"])
+        offset += batch_size
+
+
+def rebuild_collection(
+    client,
+    name: str,
+    embedding_function,
+    settings: Optional[dict] = None,
+    batch_size: int = 1000,
+    keep_backup: bool = False,
+) -> dict[str, Any]:
+    """Recreate collection `name` with new HNSW settings from its stored
+    records (no re-embedding); returns counts, settings and timings."""
+    settings = settings or hnsw_settings()
+    source = client.get_collection(name, embedding_function=embedding_function)
+    before = current_settings(source)
+    building, backup = f"{name}__rebuild", f"{name}__backup"
+    for stale in (building, backup):
+        try:
+            client.delete_collection(stale)
+        except Exception:
+            pass  # not there
+
+    start = time.perf_counter()
+    target = client.create_collection(
+        building,
+        metadata=source.metadata,
+        configuration={"hnsw": settings},
+        embedding_function=embedding_function,
+    )
+    copied = _copy(source, target, batch_size)
+    if copied != source.count():
+        client.delete_collection(building)
+        raise RuntimeError(f"Rebuild copied {copied} of {source.count()} records; {name} left unchanged")
+    copy_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    source.modify(name=backup)
+    try:
+        target.modify(name=name)
+    except Exception:
+        source.modify(name=name)  # put the original back
+        client.delete_collection(building)
+        raise
+    if not keep_backup:
+        client.delete_collection(backup)
+    swap_s = time.perf_counter() - start
+    return {
+        "records": copied,
+        "before": before,
+        "after": current_settings(client.get_collection(name, embedding_function=embedding_function)),
+        "backup": backup if keep_backup else None,
+        "seconds": {"copy": copy_s, "swap": swap_s},
+    }
@@ -0,0 +1,255 @@
+"""
+Policy manual ingestion: chunk a policy directory into the vector store.
+
+scripts/seed_policy.py only knows the seven DEFAULT_POLICIES sentences. The
+real manual is a directory of markdown, text and PDF files. ingest_directory()
+walks it and upserts only what changed:
+
+  - files are streamed one at a time through a chunker: markdown is split
+    at headings (the section is the heading path, e.g. "Refills > Controlled
+    substances"), then into paragraph-packed chunks of at most max_chars;
+    PDFs are split per page (section "page N", needs the optional pypdf);
+  - chunk ids are stable: a hash of the source path, section and the
+    chunk's position within its section, so an edit elsewhere in the file
+    does not renumber it;
+  - each chunk carries metadata: source (path relative to the root),
+    section, department (front matter "department:", else the first
+    directory under the root, lowercased), topic (front matter "topic:",
+    else the section's top-level heading, else the file name), chunk
+    (position in its section) and content_hash (of the text, department
+    and topic). agents.policy_scope filters retrieval on department;
+  - the existing chunks' hashes are read once; unchanged chunks are
+    skipped, new or changed ones are upserted in batches (one embedding
+    call per batch), and ingested chunks whose source no longer yields them
+    are deleted. Chunks that were not ingested (the DEFAULT_POLICIES seed)
+    are left alone. An optional BM25 index (agents.policy_lexical) gets
+    the same upserts and deletes.
+
+The report has the counts and the time per phase (scan + chunk, diff,
+embed + upsert, delete).
+"""
+import hashlib
+import os
+import re
+import time
+from typing import Any, Iterator, Optional
+
+try:
+    import pypdf
+except ImportError:  # optional: PDFs are skipped without it
+    pypdf = None
+
+POLICY_EXTENSIONS = (".md", ".markdown", ".txt", ".pdf")
+
+_HEADING = re.compile(r"^(#{1,6})\s+(.*?)\s*#*\s*$")
+_FRONT_MATTER = re.compile(r"\A---\s*\n(.*?)\n---\s*\n", re.DOTALL)
+
+
+def _hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _front_matter(text: str) -> tuple[dict[str, str], str]:
+    match = _FRONT_MATTER.match(text)
+    if not match:
+        return {}, text
+    fields = {}
+    for line in match.group(1).splitlines():
+        key, sep, value = line.partition(":")
+        if sep:
+            fields[key.strip().lower()] = value.strip().strip("\"'")
+    return fields, text[match.end():]
+
+
+def _pack(paragraphs: list[str], max_chars: int) -> Iterator[str]:
+    """Greedy paragraph packing; a paragraph longer than max_chars is split at sentence ends."""
+    current = ""
+    for para in paragraphs:
+        pieces = [para]
+        if len(para) > max_chars:
+            pieces, piece = [], ""
+            for sentence in re.split(r"(?<=[.!?])\s+", para):
+                if piece and len(piece) + len(sentence) + 1 > max_chars:
+                    pieces.append(piece)
+                    piece = ""
+                piece = f"{piece} {sentence}".strip()
+            if piece:
+                pieces.append(piece)
+        for piece in pieces:
+            if current and len(current) + len(piece) + 2 > max_chars:
+                yield current
+                current = ""
+            current = f"{current}\n\n{piece}" if current else piece
+    if current:
+        yield current
+
+
+def chunk_markdown(text: str, max_chars: int = 1200) -> Iterator[tuple[str, str]]:
+    """(section, chunk text) pairs; the section is the heading path."""
+    headings: list[tuple[int, str]] = []
+    paragraphs: list[str] = []
+    lines: list[str] = []
+
+    def _flush_paragraph():
+        if lines:
+            paragraphs.append(" ".join(line.strip() for line in lines))
+            lines.clear()
+
+    def _flush_section():
+        _flush_paragraph()
+        section = " > ".join(title for _, title in headings)
+        for chunk in _pack(paragraphs, max_chars):
+            yield section, chunk
+        paragraphs.clear()
+
+    for line in text.splitlines():
+        match = _HEADING.match(line)
+        if match:
+            yield from _flush_section()
+            level = len(match.group(1))
+            while headings and headings[-1][0] >= level:
+                headings.pop()
+            headings.append((level, match.group(2)))
+        elif line.strip():
+            lines.append(line)
+        else:
+            _flush_paragraph()
+    yield from _flush_section()
+
+
+def _pdf_pages(path: str) -> Iterator[tuple[str, str]]:
+    reader = pypdf.PdfReader(path)
+    for number, page in enumerate(reader.pages, start=1):
+        yield f"page {number}", page.extract_text() or ""
+
+
+def iter_policy_chunks(root: str, max_chars: int = 1200, report: Optional[dict] = None) -> Iterator[dict[str, Any]]:
+    """Chunks of every policy file under root, one file at a time (sorted, so ids are deterministic)."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            ext = os.path.splitext(filename)[1].lower()
+            if ext not in POLICY_EXTENSIONS:
+                continue
+            path = os.path.join(dirpath, filename)
+            source = os.path.relpath(path, root).replace(os.sep, "/")
+            if ext == ".pdf":
+                if pypdf is None:
+                    if report is not None:
+                        report["skipped_files"].append(f"{source} (install pypdf for PDFs)")
+                    continue
+                fields = {}
+                sections = [(section, chunk) for section, page in _pdf_pages(path)
+                            for chunk in _pack([p.strip() for p in page.split("\n\n") if p.strip()], max_chars)]
+            else:
+                with open(path, encoding="utf-8", errors="replace") as f:
+                    fields, text = _front_matter(f.read())
+                sections = list(chunk_markdown(text, max_chars))
+            department = (fields.get("department") or (source.split("/", 1)[0] if "/" in source else "general")).lower()
+            file_topic = fields.get("topic") or os.path.splitext(filename)[0].replace("_", " ").replace("-", " ")
+            if report is not None:
+                report["files"] += 1
+            position: dict[str, int] = {}
+            for section, chunk in sections:
+                n = position[section] = position.get(section, -1) + 1
+                heading = section.split(" > ", 1)[0] if ext != ".pdf" else ""
+                topic = (fields.get("topic") or heading or file_topic).lower()
+                yield {
+                    "id": f"ingest:{_hash(f'{source}|{section}|{n}')[:24]}",
+                    "document": chunk,
+                    "metadata": {
+                        "source": source,
+                        "section": section,
+                        "department": department,
+                        "topic": topic,
+                        "chunk": n,
+                        "content_hash": _hash(f"{department}|{topic}|{chunk}")[:32],
+                    },
+                }
+
+
+def _existing_hashes(collection, page_size: int = 5000) -> dict[str, str]:
+    """id -> content_hash of previously ingested chunks."""
+    hashes = {}
+    offset = 0
+    while True:
+        page = collection.get(include=["metadatas"], limit=page_size, offset=offset)
+        for doc_id, meta in zip(page["ids"], page["metadatas"]):
+            if meta and "content_hash" in meta:
+                hashes[doc_id] = meta["content_hash"]
+        if len(page["ids"]) < page_size:
+            return hashes
+        offset += page_size
+
+
+def ingest_directory(
+    root: str,
+    collection,
+    *,
+    batch_size: int = 64,
+    max_chars: int = 1200,
+    delete_removed: bool = True,
+    index=None,
+) -> dict[str, Any]:
+    """Upsert new/changed chunks of the policy files under root into collection
+    and delete ingested chunks that no longer exist; returns counts and timings.
+    index (an agents.policy_lexical.BM25Index) receives the same upserts and
+    deletes."""
+    report: dict[str, Any] = {
+        "files": 0, "chunks": 0, "unchanged": 0, "upserted": 0, "deleted": 0,
+        "skipped_files": [], "seconds": {"diff": 0.0, "scan": 0.0, "upsert": 0.0, "delete": 0.0},
+    }
+    timings = report["seconds"]
+    total_start = time.perf_counter()
+
+    start = time.perf_counter()
+    existing = _existing_hashes(collection)
+    timings["diff"] += time.perf_counter() - start
+
+    seen: set[str] = set()
+    batch: list[dict] = []
+
+    def _flush():
+        if not batch:
+            return
+        start = time.perf_counter()
+        collection.upsert(
+            ids=[c["id"] for c in batch],
+            documents=[c["document"] for c in batch],
+            metadatas=[c["metadata"] for c in batch],
+        )
+        if index is not None:
+            index.upsert([c["id"] for c in batch], [c["document"] for c in batch], [c["metadata"] for c in batch])
+        timings["upsert"] += time.perf_counter() - start
+        report["upserted"] += len(batch)
+        batch.clear()
+
+    chunks = iter_policy_chunks(root, max_chars, report)
+    while True:
+        start = time.perf_counter()
+        chunk = next(chunks, None)
+        timings["scan"] += time.perf_counter() - start
+        if chunk is None:
+            break
+        report["chunks"] += 1
+        seen.add(chunk["id"])
+        if existing.get(chunk["id"]) == chunk["metadata"]["content_hash"]:
+            report["unchanged"] += 1
+            continue
+        batch.append(chunk)
+        if len(batch) >= batch_size:
+            _flush()
+    _flush()
+
+    if delete_removed:
+        start = time.perf_counter()
+        removed = [doc_id for doc_id in existing if doc_id not in seen]
+        for i in range(0, len(removed), 5000):
+            collection.delete(ids=removed[i:i + 5000])
+        if index is not None:
+            index.delete(removed)
+        report["deleted"] = len(removed)
+        timings["delete"] += time.perf_counter() - start
+
+    report["seconds"]["total"] = time.perf_counter() - total_start
+    return report
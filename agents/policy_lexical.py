@@ -0,0 +1,198 @@
+"""
+In-process BM25 index and rank fusion for hybrid policy retrieval.
+
+Pure embedding similarity has two weaknesses for policy lookups. It needs the
+embedding model loaded before the first query. It is also weak on exact
+terms ("prior authorization", drug names) that a keyword match gets right.
+BM25Index is an inverted index (term -> {doc id: term frequency}) over the
+hospital_policies documents, held in memory:
+
+  - build() loads it from the collection; upsert() / delete() keep it in
+    step with agents.policy_ingest without a rebuild;
+  - search() scores with Okapi BM25 (k1=1.5, b=0.75) and only touches the
+    postings of the query's terms; an optional where filter
+    (agents.policy_scope) restricts scoring to that department's chunks
+    (the matching ids are computed once per filter and index state);
+  - reciprocal_rank_fusion() merges the lexical and vector rankings: each
+    document scores sum(1 / (k + rank)) over the lists it appears in, so
+    neither list's raw scores need calibrating against the other.
+
+agents.policy_agent picks the mode per query: "hybrid" fuses both lists;
+"lexical" skips embedding entirely. In hybrid mode, short keyword queries
+(at most POLICY_LEXICAL_MAX_TERMS terms) that match something are answered
+lexically too.
+
+Settings (environment):
+  POLICY_RETRIEVAL           hybrid (default) | vector | lexical
+  POLICY_LEXICAL_MAX_TERMS   queries with at most this many terms skip embedding in hybrid mode (default 3, 0 = never)
+  POLICY_RRF_K               rank-fusion constant (default 60)
+"""
+import math
+import os
+import re
+import threading
+from collections import Counter
+from typing import Any, Iterable, Optional
+
+from agents.policy_scope import matches, where_key
+
+POLICY_RETRIEVAL = os.environ.get("POLICY_RETRIEVAL", "hybrid")
+POLICY_LEXICAL_MAX_TERMS = int(os.environ.get("POLICY_LEXICAL_MAX_TERMS", "3"))
+POLICY_RRF_K = int(os.environ.get("POLICY_RRF_K", "60"))
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by can do for from have how i if in is it me my of on or our "
+    "please should the their this to was we what when will with you your".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    return [t for t in _TOKEN.findall(text.lower()) if t not in _STOPWORDS]
+
+
+class BM25Index:
+    """Thread-safe Okapi BM25 inverted index keyed by document id."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.version: Any = None  # store version the index was built from (set by the owner)
+        self._postings: dict[str, dict[str, int]] = {}
+        self._lengths: dict[str, int] = {}
+        self._documents: dict[str, str] = {}
+        self._metadatas: dict[str, dict] = {}
+        self._scopes: dict[str, frozenset[str]] = {}  # where_key -> matching ids
+        self._ids_by_document: Optional[dict[str, str]] = None  # built on first id_of()
+        self._total_length = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def _remove(self, doc_id: str) -> None:
+        if doc_id not in self._documents:
+            return
+        self._scopes.clear()
+        self._ids_by_document = None
+        for term in set(tokenize(self._documents.pop(doc_id))):
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+        self._total_length -= self._lengths.pop(doc_id)
+        self._metadatas.pop(doc_id, None)
+
+    def upsert(self, ids: Iterable[str], documents: Iterable[str], metadatas: Optional[Iterable[dict]] = None) -> None:
+        ids, documents = list(ids), list(documents)
+        metadatas = list(metadatas) if metadatas is not None else [None] * len(ids)
+        with self._lock:
+            self._scopes.clear()
+            self._ids_by_document = None
+            for doc_id, document, metadata in zip(ids, documents, metadatas):
+                self._remove(doc_id)
+                terms = tokenize(document or "")
+                for term, tf in Counter(terms).items():
+                    self._postings.setdefault(term, {})[doc_id] = tf
+                self._lengths[doc_id] = len(terms)
+                self._documents[doc_id] = document or ""
+                self._metadatas[doc_id] = metadata or {}
+                self._total_length += len(terms)
+
+    def delete(self, ids: Iterable[str]) -> None:
+        with self._lock:
+            for doc_id in ids:
+                self._remove(doc_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._postings.clear()
+            self._lengths.clear()
+            self._documents.clear()
+            self._metadatas.clear()
+            self._scopes.clear()
+            self._ids_by_document = None
+            self._total_length = 0
+            self.version = None
+
+    def build(self, collection, page_size: int = 5000) -> None:
+        """Replace the contents with every document in a Chroma collection."""
+        with self._lock:
+            self.clear()
+            offset = 0
+            while True:
+                page = collection.get(include=["documents", "metadatas"], limit=page_size, offset=offset)
+                self.upsert(page["ids"], page["documents"], page["metadatas"])
+                if len(page["ids"]) < page_size:
+                    return
+                offset += page_size
+
+    def search(self, query: str, top_k: int = 3, where: Optional[dict] = None) -> list[tuple[str, float]]:
+        """(id, score) of the best matches, highest first; empty if no term matches.
+        where restricts the candidates by metadata (agents.policy_scope.matches)."""
+        terms = set(tokenize(query))
+        with self._lock:
+            n = len(self._documents)
+            if not n or not terms:
+                return []
+            avgdl = self._total_length / n or 1.0
+            allowed = self._scope(where) if where else None
+            scores: dict[str, float] = {}
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+                if allowed is None:
+                    candidates = postings.items()
+                elif len(allowed) < len(postings):
+                    candidates = [(doc_id, postings[doc_id]) for doc_id in allowed if doc_id in postings]
+                else:
+                    candidates = [(doc_id, tf) for doc_id, tf in postings.items() if doc_id in allowed]
+                for doc_id, tf in candidates:
+                    norm = tf + self.k1 * (1 - self.b + self.b * self._lengths[doc_id] / avgdl)
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (self.k1 + 1) / norm
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:top_k]
+
+    def _scope(self, where: dict) -> frozenset[str]:
+        key = where_key(where)
+        allowed = self._scopes.get(key)
+        if allowed is None:
+            allowed = frozenset(d for d, m in self._metadatas.items() if matches(m, where))
+            if len(self._scopes) >= 16:
+                self._scopes.pop(next(iter(self._scopes)))
+            self._scopes[key] = allowed
+        return allowed
+
+    def document(self, doc_id: str) -> Optional[str]:
+        return self._documents.get(doc_id)
+
+    def metadata(self, doc_id: str) -> dict:
+        return self._metadatas.get(doc_id) or {}
+
+    def id_of(self, document: str) -> Optional[str]:
+        """Id of the (first) document with exactly this text."""
+        with self._lock:
+            if self._ids_by_document is None:
+                self._ids_by_document = {}
+                for doc_id, text in self._documents.items():
+                    self._ids_by_document.setdefault(text, doc_id)
+            return self._ids_by_document.get(document)
+
+
+def reciprocal_rank_fusion(rankings: Iterable[list[str]], k: int = POLICY_RRF_K) -> list[str]:
+    """Ids ordered by sum(1 / (k + rank)) over the rankings (rank starts at 1)."""
+    scores: dict[str, float] = {}
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (k + rank)
+    return sorted(scores, key=lambda doc_id: -scores[doc_id])
+
+
+def choose_mode(query: str, mode: Optional[str] = None) -> str:
+    """The retrieval mode for a query: POLICY_RETRIEVAL, with short keyword
+    queries sent to "lexical" in hybrid mode."""
+    mode = mode or POLICY_RETRIEVAL
+    if mode == "hybrid" and 0 < len(tokenize(query)) <= POLICY_LEXICAL_MAX_TERMS:
+        return "lexical"
+    return mode
@@ -0,0 +1,247 @@
+"""
+Exact-search policy index: a memory-mapped float32 matrix.
+
+The policy corpus is at most a few thousand chunks, and each lookup still
+went through Chroma's HNSW index and its SQLite metadata layer. At this size
+a brute-force scan is exact and faster. MatrixIndex keeps the collection's
+embeddings L2-normalized in one contiguous (N, dim) float32 .npy file:
+
+  - search() scores every row with one matrix product (queries @ matrix.T)
+    and takes the top k with np.argpartition, then sorts only those k. A
+    batch of queries costs one matrix-matrix product;
+  - the matrix is opened with np.load(mmap_mode="r"), so worker processes
+    on the same host share one copy in the page cache instead of each
+    holding its own;
+  - build() copies the embeddings Chroma already stores (nothing is
+    re-embedded) and records the store version it was built from.
+    agents.policy_agent rebuilds when the store changes;
+  - a where filter (agents.policy_scope) scores only the matching rows;
+    each filter's row subset is gathered once per generation and kept
+    (up to 16 filters), so a department-scoped query scans only that
+    department;
+  - files are written under a new generation name and then index.json is
+    atomically replaced, so a reader never sees a half-written matrix and
+    other processes pick up the new generation on their next lookup. A
+    writer then deletes only generations older than the manifest it
+    replaced, keeping that one and its own: two workers rebuilding after
+    the same store change cannot delete each other's files, and load()
+    re-reads the manifest if a generation disappears under it;
+  - query() and search() read one (matrix, ids, documents) snapshot, so a
+    concurrent load() cannot make rows index another generation's ids.
+
+Scores are cosine similarities. Chroma's l2 distance on normalized vectors
+(2 - 2cos) ranks the same way, so results match an exact Chroma search.
+
+Settings (environment):
+  POLICY_INDEX        chroma (default) | numpy (this index behind get_relevant_policy)
+  POLICY_INDEX_DIR    where the matrix lives (default data/vector_store/matrix_index)
+"""
+import glob
+import json
+import os
+import threading
+import uuid
+from typing import Any, Optional
+
+import numpy as np
+
+from agents.policy_scope import matches, where_key
+
+POLICY_INDEX = os.environ.get("POLICY_INDEX", "chroma")
+POLICY_INDEX_DIR = os.environ.get("POLICY_INDEX_DIR", "")
+
+_MANIFEST = "index.json"
+_MAX_SUBSETS = 16
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if vectors.ndim == 1:
+        vectors = vectors[None, :]
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+def _write_json(path: str, data: Any) -> None:
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+
+class MatrixIndex:
+    """Brute-force top-k over a memory-mapped matrix of normalized embeddings."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.version: Any = None
+        self.generation: Optional[str] = None
+        self.matrix: np.ndarray = np.zeros((0, 0), dtype=np.float32)
+        self.ids: list[str] = []
+        self.documents: list[str] = []
+        self.metadatas: list[dict] = []
+        self._subsets: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        self._manifest_mtime: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _manifest_path(self) -> str:
+        return os.path.join(self.path, _MANIFEST)
+
+    def write(
+        self,
+        ids: list[str],
+        documents: list[str],
+        embeddings: np.ndarray,
+        version: Any = None,
+        metadatas: Optional[list[dict]] = None,
+    ) -> None:
+        """Persist a new generation and switch to it."""
+        os.makedirs(self.path, exist_ok=True)
+        generation = uuid.uuid4().hex[:12]
+        matrix = _normalize(embeddings) if len(ids) else np.zeros((0, 0), dtype=np.float32)
+        out = np.lib.format.open_memmap(
+            os.path.join(self.path, f"matrix-{generation}.npy"), mode="w+", dtype=np.float32, shape=matrix.shape
+        )
+        out[:] = matrix
+        out.flush()
+        del out
+        _write_json(os.path.join(self.path, f"docs-{generation}.json"), {
+            "ids": ids, "documents": documents, "metadatas": [m or {} for m in (metadatas or [None] * len(ids))],
+        })
+        replaced = self._read_manifest()
+        _write_json(self._manifest_path(), {
+            "generation": generation,
+            "count": len(ids),
+            "dim": int(matrix.shape[1]) if matrix.ndim == 2 else 0,
+            "version": list(version) if isinstance(version, tuple) else version,
+        })
+        if replaced is not None:
+            self._remove_stale({generation, replaced[0]["generation"]}, replaced[1])
+        self.load()
+
+    def _read_manifest(self) -> Optional[tuple[dict, int]]:
+        """(manifest, its mtime in ns), or None if there is none yet."""
+        try:
+            mtime = os.stat(self._manifest_path()).st_mtime_ns
+            with open(self._manifest_path()) as f:
+                return json.load(f), mtime
+        except (OSError, ValueError):
+            return None
+
+    def _remove_stale(self, keep: set[str], before_ns: int) -> None:
+        """Delete generations written before the manifest this writer replaced.
+        Anything newer may belong to a concurrent writer that has not swapped
+        its manifest in yet. Open memmaps in other processes stay valid after
+        unlink."""
+        for stale in glob.glob(os.path.join(self.path, "matrix-*.npy")) + glob.glob(os.path.join(self.path, "docs-*.json")):
+            name = os.path.basename(stale)
+            if any(generation in name for generation in keep):
+                continue
+            try:
+                if os.stat(stale).st_mtime_ns < before_ns:
+                    os.remove(stale)
+            except OSError:
+                pass
+
+    def build(self, collection, version: Any = None, page_size: int = 5000) -> None:
+        """Copy every embedding and document out of a Chroma collection."""
+        ids, documents, metadatas, chunks = [], [], [], []
+        offset = 0
+        while True:
+            page = collection.get(include=["embeddings", "documents", "metadatas"], limit=page_size, offset=offset)
+            ids.extend(page["ids"])
+            documents.extend(page["documents"])
+            metadatas.extend(page["metadatas"])
+            if len(page["ids"]):
+                chunks.append(np.asarray(page["embeddings"], dtype=np.float32))
+            if len(page["ids"]) < page_size:
+                break
+            offset += page_size
+        self.write(ids, documents, np.concatenate(chunks) if chunks else np.zeros((0, 0)), version, metadatas)
+
+    def load(self) -> bool:
+        """(Re)open the current generation if the manifest changed; False if there is none."""
+        try:
+            mtime = os.stat(self._manifest_path()).st_mtime_ns
+        except OSError:
+            return False
+        if mtime == self._manifest_mtime:
+            return True
+        with self._lock:
+            for attempt in range(3):
+                try:
+                    if attempt:
+                        mtime = os.stat(self._manifest_path()).st_mtime_ns
+                    with open(self._manifest_path()) as f:
+                        manifest = json.load(f)
+                    generation = manifest["generation"]
+                    with open(os.path.join(self.path, f"docs-{generation}.json")) as f:
+                        docs = json.load(f)
+                    matrix = np.load(os.path.join(self.path, f"matrix-{generation}.npy"), mmap_mode="r")
+                    break
+                except FileNotFoundError:
+                    # Replaced and cleaned up by another writer mid-read: follow the new manifest
+                    if attempt == 2:
+                        return False
+            version = manifest.get("version")
+            self.matrix, self.ids, self.documents = matrix, docs["ids"], docs["documents"]
+            self.metadatas = docs.get("metadatas") or [{} for _ in self.ids]
+            self._subsets = {}
+            self.version = tuple(version) if isinstance(version, list) else version
+            self.generation = generation
+            self._manifest_mtime = mtime
+        return True
+
+    def _snapshot(self) -> tuple:
+        """(matrix, ids, documents, metadatas, subsets) of one generation."""
+        with self._lock:
+            return self.matrix, self.ids, self.documents, self.metadatas, self._subsets
+
+    def _subset(self, snapshot: tuple, where: dict) -> tuple[np.ndarray, np.ndarray]:
+        """(row numbers, contiguous matrix of those rows) matching a filter."""
+        matrix, _, _, metadatas, subsets = snapshot
+        key = where_key(where)
+        subset = subsets.get(key)
+        if subset is None:
+            rows = np.array([i for i, m in enumerate(metadatas) if matches(m, where)], dtype=np.int64)
+            subset = (rows, np.ascontiguousarray(matrix[rows]) if len(rows) else np.zeros((0, 0), np.float32))
+            with self._lock:
+                if len(subsets) >= _MAX_SUBSETS:
+                    subsets.pop(next(iter(subsets)))
+                subsets[key] = subset
+        return subset
+
+    def search(self, queries: np.ndarray, top_k: int = 3, where: Optional[dict] = None) -> list[list[tuple[int, float]]]:
+        """For each query vector, (row, cosine similarity) of the top_k rows, best
+        first; with where, only rows whose metadata matches are considered."""
+        return self._search(self._snapshot(), queries, top_k, where)
+
+    def _search(self, snapshot: tuple, queries: np.ndarray, top_k: int, where: Optional[dict]) -> list[list[tuple[int, float]]]:
+        matrix, ids, rows = snapshot[0], snapshot[1], None
+        if where and len(ids):
+            rows, matrix = self._subset(snapshot, where)
+        queries = _normalize(queries)
+        if not len(matrix) or not len(queries):
+            return [[] for _ in range(len(queries))]
+        scores = queries @ matrix.T  # (queries, N)
+        k = min(top_k, scores.shape[1])
+        if k < scores.shape[1]:
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(k), (len(queries), k))
+        results = []
+        for row, candidates in zip(scores, top):
+            ordered = candidates[np.argsort(-row[candidates], kind="stable")]
+            results.append([(int(i if rows is None else rows[i]), float(row[i])) for i in ordered])
+        return results
+
+    def query(self, query_embeddings: np.ndarray, top_k: int = 3, where: Optional[dict] = None) -> list[list[tuple[str, str]]]:
+        """search() as (id, document) pairs per query."""
+        snapshot = self._snapshot()
+        _, ids, documents = snapshot[:3]
+        return [
+            [(ids[i], documents[i]) for i, _ in hits] for hits in self._search(snapshot, query_embeddings, top_k, where)
+        ]
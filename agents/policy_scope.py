@@ -0,0 +1,158 @@
+"""
+Department scoping for policy retrieval.
+
+Policy chunks carry "department" and "topic" metadata: agents.policy_ingest
+sets both at ingest, and the DEFAULT_POLICIES seed is tagged by
+agents.policy_agent. policy_where() turns a triage result's
+recommended_queue and intent (or an explicit department) into a Chroma
+`where` filter:
+
+    {"department": {"$in": ["nursing", "laboratory", "general"]}}
+
+The queue and intent departments are unioned: a lab-results question
+routed to Nursing still reaches the laboratory policy. "general" chunks
+(emergency guidance, manual-wide rules) stay in every scope, so a scoped
+search is rarely empty; callers check in_department() on the hits and
+search the whole collection when only "general" chunks came back. A
+filtered query only ranks that department's chunks, which makes
+top-k both cheaper and more precise. The BM25 and matrix indexes apply the
+same filter through matches(), which supports the subset of Chroma's
+operators used here ($eq, $ne, $in, $nin, $and, $or).
+
+Chroma evaluates a where filter through its SQLite metadata layer before
+the HNSW search, which is slower than an unfiltered query on a large
+collection. chroma_query_scoped() therefore first asks Chroma for
+POLICY_SCOPE_OVERFETCH x n unfiltered neighbours and keeps the in-scope
+ones. Only queries left with fewer than n are re-run with where=.
+
+Queues and intents are matched by keyword; an unknown queue gives no
+filter, so the search covers the whole collection.
+
+Settings (environment):
+  POLICY_SCOPE_OVERFETCH   unfiltered candidates per wanted result before falling back to where= (default 16, 0 = always where=)
+"""
+import json
+import os
+from typing import Any, Optional
+
+POLICY_SCOPE_OVERFETCH = int(os.environ.get("POLICY_SCOPE_OVERFETCH", "16"))
+
+# Keyword in a queue / intent / department name -> department slug (first match wins)
+DEPARTMENT_KEYWORDS = [
+    ("pharmac", "pharmacy"),
+    ("refill", "pharmacy"),
+    ("prescription", "pharmacy"),
+    ("medication", "pharmacy"),
+    ("billing", "billing"),
+    ("insurance", "billing"),
+    ("payment", "billing"),
+    ("lab", "laboratory"),
+    ("referral", "referrals"),
+    ("specialist", "referrals"),
+    ("front desk", "scheduling"),
+    ("appointment", "scheduling"),
+    ("scheduling", "scheduling"),
+    ("nurs", "nursing"),
+    ("clinical", "nursing"),
+    ("symptom", "nursing"),
+]
+
+GENERAL_DEPARTMENT = "general"
+
+
+def department_for(name: Optional[str]) -> Optional[str]:
+    """Department slug for a queue, intent or department name (None if unknown)."""
+    text = " ".join((name or "").lower().split())
+    if not text:
+        return None
+    for keyword, department in DEPARTMENT_KEYWORDS:
+        if keyword in text:
+            return department
+    return None
+
+
+def policy_where(
+    recommended_queue: Optional[str] = None,
+    intent: Optional[str] = None,
+    department: Optional[str] = None,
+) -> Optional[dict[str, Any]]:
+    """Chroma where filter for a department scope, or None for an unscoped search.
+    An explicit department wins (used as-is when it is not a known keyword);
+    otherwise the queue's and the intent's departments are both in scope."""
+    explicit = " ".join((department or "").lower().split())
+    if explicit:
+        departments = [department_for(explicit) or explicit]
+    else:
+        departments = [d for d in (department_for(recommended_queue), department_for(intent)) if d]
+    if not departments:
+        return None
+    return {"department": {"$in": list(dict.fromkeys(departments)) + [GENERAL_DEPARTMENT]}}
+
+
+def in_department(metadata: Optional[dict]) -> bool:
+    """True for a chunk of a specific department (not a "general" one)."""
+    return (metadata or {}).get("department") != GENERAL_DEPARTMENT
+
+
+def policy_where_for(triage_result: Optional[dict]) -> Optional[dict[str, Any]]:
+    """policy_where() from a TriageResult dict (recommended_queue and intent)."""
+    triage_result = triage_result or {}
+    return policy_where(triage_result.get("recommended_queue"), triage_result.get("intent"))
+
+
+def where_key(where: Optional[dict]) -> str:
+    """Stable string for a filter (cache keys)."""
+    return json.dumps(where, sort_keys=True) if where else ""
+
+
+def matches(metadata: Optional[dict], where: Optional[dict]) -> bool:
+    """True if metadata satisfies a (subset of) Chroma where filter."""
+    if not where:
+        return True
+    metadata = metadata or {}
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(matches(metadata, c) for c in condition):
+                return False
+        elif key == "$or":
+            if not any(matches(metadata, c) for c in condition):
+                return False
+        elif isinstance(condition, dict):
+            value = metadata.get(key)
+            for op, operand in condition.items():
+                if op == "$eq" and value != operand:
+                    return False
+                if op == "$ne" and value == operand:
+                    return False
+                if op == "$in" and value not in operand:
+                    return False
+                if op == "$nin" and value in operand:
+                    return False
+        elif metadata.get(key) != condition:
+            return False
+    return True
+
+
+def chroma_query_scoped(coll, n: int, where: Optional[dict], overfetch: Optional[int] = None, **query) -> list[list[tuple[str, str]]]:
+    """(id, document) of the n nearest in-scope chunks per query from a Chroma
+    collection; query is query_texts=... or query_embeddings=...."""
+    overfetch = POLICY_SCOPE_OVERFETCH if overfetch is None else overfetch
+    count = coll.count()
+    queries = next(iter(query.values()))
+    if not where or overfetch <= 0:
+        res = coll.query(n_results=min(n, count), where=where or None, include=["documents"], **query)
+        return [list(zip(i, d)) for i, d in zip(res["ids"], res["documents"])]
+    res = coll.query(n_results=min(n * overfetch, count), include=["documents", "metadatas"], **query)
+    ranked = [
+        [(doc_id, doc) for doc_id, doc, meta in zip(ids, docs, metas) if matches(meta, where)][:n]
+        for ids, docs, metas in zip(res["ids"], res["documents"], res["metadatas"])
+    ]
+    short = [i for i, hits in enumerate(ranked) if len(hits) < n and len(res["ids"][i]) < count]
+    if short:
+        key = next(iter(query))
+        retry = coll.query(
+            n_results=min(n, count), where=where, include=["documents"], **{key: [queries[i] for i in short]}
+        )
+        for i, ids, docs in zip(short, retry["ids"], retry["documents"]):
+            ranked[i] = list(zip(ids, docs))
+    return ranked
@@ -0,0 +1,264 @@
+"""
+Vetted reply templates for LOW-urgency auto-replies.
+
+Every LOW message is sent by auto_communicate without staff review, and its
+draft used to come from a full Gemini call, although refill, appointment and
+billing replies hardly differ from patient to patient. draft_reply_node now
+tries a template first and only calls the LLM when none matches.
+
+A template is keyed by intent and by the id of the policy chunk it was
+vetted against. It matches when:
+
+  - the triage intent contains the template's intent keyword;
+  - a retrieved policy chunk (agents.policy_agent.policy_chunk_ids) has the
+    template's policy_id; the highest-ranked such chunk is used, because
+    "general" chunks such as the emergency policy are in every department
+    scope and may rank above it;
+  - that chunk's text still hashes to the template's policy_sha. An edited
+    policy makes the template stale, so the LLM drafts until the template
+    is re-vetted.
+
+Slots are filled from the triage result and the message: {greeting} (the
+patient's first name when known), {medication} (a dosed or well-known drug
+name in the message, else "your medication"), {department} (the recommended queue, else the
+template's department). Outstanding checklist items are appended as a
+request for the missing information.
+
+template_stats() reports the hit rate among LOW messages, why the rest
+missed, and the mean template vs LLM draft latency, from which it estimates
+the time saved per LOW message.
+
+Settings (environment):
+  REPLY_TEMPLATES        1 (default) | 0 = always draft with the LLM
+  REPLY_TEMPLATES_PATH   JSON list of extra templates ({intent, policy_id, policy_sha, department, text});
+                         an entry with the same intent and policy_id replaces a built-in one
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from agents.policy_agent import DEFAULT_POLICIES, policy_chunk_ids
+
+REPLY_TEMPLATES = os.environ.get("REPLY_TEMPLATES", "1") != "0"
+REPLY_TEMPLATES_PATH = os.environ.get("REPLY_TEMPLATES_PATH", "")
+
+
+def policy_sha(text: str) -> str:
+    """Short hash of a policy chunk's text (what a template was vetted against)."""
+    return hashlib.sha256(" ".join(text.split()).encode()).hexdigest()[:16]
+
+
+@dataclass(frozen=True)
+class ReplyTemplate:
+    intent: str       # keyword matched against the triage intent
+    policy_id: str    # store id of the policy chunk the text is grounded in
+    policy_sha: str   # policy_sha() of that chunk when the template was vetted ("" = not checked)
+    department: str   # {department} when the triage result has no recommended queue
+    text: str
+
+
+DEFAULT_TEMPLATES = [
+    ReplyTemplate(
+        intent="refill",
+        policy_id="policy_0",
+        policy_sha=policy_sha(DEFAULT_POLICIES[0]),
+        department="Pharmacy",
+        text=(
+            "{greeting}\n\nThank you for your refill request for {medication}. It has been passed to our {department} "
+            "team. For future refills, please send your request at least 48 hours before you run out and include the "
+            "medication name, dosage and your pharmacy.\n\nBest regards,\nYour care team"
+        ),
+    ),
+    ReplyTemplate(
+        intent="appointment",
+        policy_id="policy_1",
+        policy_sha=policy_sha(DEFAULT_POLICIES[1]),
+        department="Front Desk",
+        text=(
+            "{greeting}\n\nThank you for reaching out about an appointment. For non-urgent visits you can book directly "
+            "through the patient portal or call us during office hours; same-day slots may be limited. Our {department} "
+            "team will follow up if anything else is needed.\n\nBest regards,\nYour care team"
+        ),
+    ),
+    ReplyTemplate(
+        intent="billing",
+        policy_id="policy_3",
+        policy_sha=policy_sha(DEFAULT_POLICIES[3]),
+        department="Billing",
+        text=(
+            "{greeting}\n\nThank you for your billing question. It has been forwarded to our {department} department, "
+            "who will be in touch. To help them resolve it quickly, please have your account number and statement "
+            "ready.\n\nBest regards,\nYour care team"
+        ),
+    ),
+]
+
+# Common outpatient drugs (generic and brand) named without a dose; anything
+# else only fills {medication} when a dose anchors it ("Zoloft 50mg")
+KNOWN_MEDICATIONS = frozenset({
+    "albuterol", "allopurinol", "alprazolam", "amlodipine", "amoxicillin", "atorvastatin", "azithromycin",
+    "bupropion", "buspirone", "carvedilol", "cetirizine", "citalopram", "clopidogrel", "cyclobenzaprine",
+    "duloxetine", "eliquis", "escitalopram", "estradiol", "famotidine", "fluoxetine", "fluticasone",
+    "furosemide", "gabapentin", "glipizide", "hydrochlorothiazide", "hydrocodone", "ibuprofen", "insulin",
+    "jardiance", "lamotrigine", "levothyroxine", "lexapro", "lipitor", "lisinopril", "lithium", "loratadine",
+    "losartan", "meloxicam", "metformin", "methotrexate", "metoprolol", "montelukast", "naproxen",
+    "omeprazole", "ozempic", "pantoprazole", "pravastatin", "prednisone", "prozac", "rosuvastatin",
+    "sertraline", "simvastatin", "spironolactone", "synthroid", "tamsulosin", "tramadol", "trazodone",
+    "venlafaxine", "warfarin", "wellbutrin", "xarelto", "zoloft", "zyrtec",
+})
+# Words that can sit right before a dose without naming a drug ("lowered to 20mg")
+_NOT_MEDICATION = {
+    "a", "about", "an", "at", "by", "dose", "dosage", "from", "is", "my", "of", "on", "take", "taking", "the",
+    "to", "was", "with",
+}
+_DOSE = re.compile(r"\b([A-Za-z][A-Za-z-]{2,})\s*\d+(?:\.\d+)?\s*(?:mg|mcg|ml|units?)\b", re.IGNORECASE)
+_WORD = re.compile(r"[A-Za-z][A-Za-z-]+")
+
+
+def extract_medication(message: str) -> Optional[str]:
+    """A drug name from the message: a dosed name ("Zoloft 50mg") or a
+    KNOWN_MEDICATIONS entry ("lisinopril"), else None ("your medication")."""
+    for dosed in _DOSE.finditer(message):
+        if dosed.group(1).lower() not in _NOT_MEDICATION:
+            return dosed.group(0).strip()
+    for word in _WORD.findall(message):
+        if word.lower() in KNOWN_MEDICATIONS:
+            return word
+    return None
+
+
+def _load_templates() -> list[ReplyTemplate]:
+    templates = {(t.intent, t.policy_id): t for t in DEFAULT_TEMPLATES}
+    if REPLY_TEMPLATES_PATH:
+        with open(REPLY_TEMPLATES_PATH) as f:
+            for entry in json.load(f):
+                t = ReplyTemplate(
+                    intent=entry["intent"].lower(),
+                    policy_id=entry["policy_id"],
+                    policy_sha=entry.get("policy_sha", ""),
+                    department=entry.get("department", ""),
+                    text=entry["text"],
+                )
+                templates[(t.intent, t.policy_id)] = t
+    return list(templates.values())
+
+
+class TemplateStats:
+    """Hit / miss counts among LOW messages and template vs LLM draft latency."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.clear()
+
+    def clear(self) -> None:
+        self.hits = 0
+        self.misses: dict[str, int] = {}
+        self.template_s = 0.0
+        self.llm_drafts = 0
+        self.llm_s = 0.0
+
+    def hit(self, seconds: float) -> None:
+        with self._lock:
+            self.hits += 1
+            self.template_s += seconds
+
+    def miss(self, reason: str) -> None:
+        with self._lock:
+            self.misses[reason] = self.misses.get(reason, 0) + 1
+
+    def llm_draft(self, seconds: float) -> None:
+        with self._lock:
+            self.llm_drafts += 1
+            self.llm_s += seconds
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            total = self.hits + sum(self.misses.values())
+            template_ms = self.template_s / self.hits * 1e3 if self.hits else 0.0
+            llm_ms = self.llm_s / self.llm_drafts * 1e3 if self.llm_drafts else 0.0
+            hit_rate = self.hits / total if total else 0.0
+            return {
+                "low_messages": total,
+                "hits": self.hits,
+                "misses": dict(self.misses),
+                "hit_rate": hit_rate,
+                "mean_template_ms": template_ms,
+                "mean_llm_ms": llm_ms,
+                "saved_ms_per_low": hit_rate * (llm_ms - template_ms) if self.llm_drafts else 0.0,
+            }
+
+
+_templates: Optional[list[ReplyTemplate]] = None
+_stats = TemplateStats()
+
+
+def _get_templates() -> list[ReplyTemplate]:
+    global _templates
+    if _templates is None:
+        _templates = _load_templates()
+    return _templates
+
+
+def template_stats() -> dict[str, Any]:
+    """Template hit rate and latency saving for LOW messages."""
+    return _stats.stats()
+
+
+def match_template(
+    triage_result: dict, policy_chunks: list[str], chunk_ids: list[str],
+) -> tuple[Optional[ReplyTemplate], str]:
+    """(template, "") for the best-ranked vetted match, else (None, miss reason)."""
+    if not REPLY_TEMPLATES:
+        return None, "disabled"
+    if not policy_chunks or not any(chunk_ids):
+        return None, "no_policy"
+    intent = (triage_result.get("intent") or "").lower()
+    stale = False
+    for chunk, chunk_id in zip(policy_chunks, chunk_ids):
+        for t in _get_templates():
+            if t.intent in intent and t.policy_id == chunk_id:
+                if not t.policy_sha or t.policy_sha == policy_sha(chunk):
+                    return t, ""
+                stale = True
+    return None, "stale" if stale else "no_template"
+
+
+def fill_template(template: ReplyTemplate, message: str, triage_result: dict, patient_name: str = "") -> str:
+    """Template text with its slots filled for one patient."""
+    first_name = (patient_name or "").split()[0] if (patient_name or "").strip() else ""
+    reply = template.text.format(
+        greeting=f"Hello {first_name}," if first_name else "Hello,",
+        medication=extract_medication(message) or "your medication",
+        department=triage_result.get("recommended_queue") or template.department,
+    )
+    checklist = [item.strip() for item in triage_result.get("checklist") or [] if item and item.strip()]
+    if checklist:
+        body, sep, signature = reply.rpartition("\n\nBest regards,")
+        reply = f"{body}\n\nSo we can help, please also reply with: {'; '.join(checklist)}.{sep}{signature}"
+    return reply
+
+
+def low_urgency_template_reply(
+    message: str, triage_result: dict, policy_chunks: list[str], patient_name: str = "",
+) -> Optional[str]:
+    """A filled template reply for a LOW message, or None (draft with the LLM).
+    Records the hit or miss in template_stats()."""
+    start = time.perf_counter()
+    chunk_ids = policy_chunk_ids(policy_chunks) if REPLY_TEMPLATES else []
+    template, reason = match_template(triage_result, policy_chunks, chunk_ids)
+    if template is None:
+        _stats.miss(reason)
+        return None
+    reply = fill_template(template, message, triage_result, patient_name)
+    _stats.hit(time.perf_counter() - start)
+    return reply
+
+
+def record_llm_draft(seconds: float) -> None:
+    """Time of an LLM draft for a LOW message that no template matched."""
+    _stats.llm_draft(seconds)
@@ -69,6 +69,45 @@ def _get_genai_client():
         return None
 
 
+def _unconfigured_result() -> SafetyResult:
+    return SafetyResult(
+        is_potential_emergency=False,
+        reason="LLM not configured; screening unavailable.",
+        triggered_by="none",
+    )
+
+
+def _unavailable_result() -> SafetyResult:
+    # LLM failure — do NOT default to True (avoids false positives from outages)
+    return SafetyResult(
+        is_potential_emergency=False,
+        reason="LLM screening unavailable.",
+        triggered_by="none",
+    )
+
+
+def _generation_config() -> dict:
+    from schemas.schemas import SafetyResult as _SR
+    return {
+        "response_mime_type": "application/json",
+        "response_schema": _SR,
+    }
+
+
+def _to_safety_result(response) -> SafetyResult | None:
+    """Convert a structured Gemini response into a SafetyResult (None if unparsed)."""
+    if not response.parsed:
+        return None
+    out = response.parsed
+    return SafetyResult(
+        is_potential_emergency=out.is_potential_emergency,
+        reason=out.reason or (
+            "Flagged by LLM." if out.is_potential_emergency else "No emergency signals detected."
+        ),
+        triggered_by="llm" if out.is_potential_emergency else "none",
+    )
+
+
 def _llm_call(prompt: str) -> SafetyResult:
     """
     Run a single Gemini structured-output call with the given prompt.
@@ -77,39 +116,40 @@ def _llm_call(prompt: str) -> SafetyResult:
     """
     client = _get_genai_client()
     if not client:
-        return SafetyResult(
-            is_potential_emergency=False,
-            reason="LLM not configured; screening unavailable.",
-            triggered_by="none",
-        )
+        return _unconfigured_result()
     try:
-        from schemas.schemas import SafetyResult as _SR
         response = client.models.generate_content(
             model=_LLM_MODEL,
             contents=prompt,
-            config={
-                "response_mime_type": "application/json",
-                "response_schema": _SR,
-            },
+            config=_generation_config(),
         )
-        if response.parsed:
-            out = response.parsed
-            return SafetyResult(
-                is_potential_emergency=out.is_potential_emergency,
-                reason=out.reason or (
-                    "Flagged by LLM." if out.is_potential_emergency else "No emergency signals detected."
-                ),
-                triggered_by="llm" if out.is_potential_emergency else "none",
-            )
+        result = _to_safety_result(response)
+        if result:
+            return result
     except Exception:
         pass
 
-    # LLM failure — do NOT default to True (avoids false positives from outages)
-    return SafetyResult(
-        is_potential_emergency=False,
-        reason="LLM screening unavailable.",
-        triggered_by="none",
-    )
+    return _unavailable_result()
+
+
+async def _allm_call(prompt: str) -> SafetyResult:
+    """Async variant of _llm_call using the Gemini client's aio surface."""
+    client = _get_genai_client()
+    if not client:
+        return _unconfigured_result()
+    try:
+        response = await client.aio.models.generate_content(
+            model=_LLM_MODEL,
+            contents=prompt,
+            config=_generation_config(),
+        )
+        result = _to_safety_result(response)
+        if result:
+            return result
+    except Exception:
+        pass
+
+    return _unavailable_result()
 
 
 # ---------------------------------------------------------------------------
@@ -138,3 +178,18 @@ def screen_for_emergency(patient_message: str) -> SafetyResult:
 
     prompt = _SCREENING_PROMPT.format(text=text[:2000])
     return _llm_call(prompt)
+
+
+@traceable
+async def ascreen_for_emergency(patient_message: str) -> SafetyResult:
+    """Async variant of screen_for_emergency — same prompt and outcome logic."""
+    text = (patient_message or "").strip()
+    if not text:
+        return SafetyResult(
+            is_potential_emergency=False,
+            reason="Empty message.",
+            triggered_by="none",
+        )
+
+    prompt = _SCREENING_PROMPT.format(text=text[:2000])
+    return await _allm_call(prompt)
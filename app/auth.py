@@ -8,6 +8,8 @@ from typing import Optional
 
 from dotenv import load_dotenv
 
+from graph.lazy_init import LazyInit
+
 load_dotenv()
 
 _SUPABASE_URL = os.environ.get("SUPABASE_URL")
@@ -16,21 +18,23 @@ _SUPABASE_ANON_KEY = os.environ.get("SUPABASE_ANON_KEY")
 # In-memory demo store when Supabase is not configured (email -> {password, full_name, patient_id, user_id})
 _demo_users: dict = {}
 
-# Lazy Supabase client
-_supabase = None
+
+def _new_supabase():
+    if not (_SUPABASE_URL and _SUPABASE_ANON_KEY):
+        return None
+    try:
+        from supabase import create_client
+    except ImportError:
+        return None  # env set but package not installed; fall back to demo
+    return create_client(_SUPABASE_URL, _SUPABASE_ANON_KEY)
+
+
+# Lazy Supabase client (None = demo mode), created once per process
+_supabase = LazyInit(_new_supabase, name="Supabase auth client")
 
 
 def _get_supabase():
-    global _supabase
-    if _supabase is None and _SUPABASE_URL and _SUPABASE_ANON_KEY:
-        try:
-            from supabase import create_client
-            _supabase = create_client(_SUPABASE_URL, _SUPABASE_ANON_KEY)
-        except ImportError:
-            _supabase = False  # env set but package not installed; fall back to demo
-    if _supabase is False:
-        return None
-    return _supabase
+    return _supabase.get()
 
 
 def is_supabase_configured() -> bool:
@@ -0,0 +1,673 @@
+"""
+Durable background job queue for triage workflows.
+
+The patient portal enqueues a job and tails its progress events instead of
+running the LangGraph workflow inline in the Streamlit script thread. Workers
+(in-process threads via start_worker_pool, or `python scripts/triage_worker.py`)
+claim jobs, drive the graph, append progress events and write the final
+triage result to the message store.
+
+Storage: SQLite at ./data/jobs.db (override with TRIAGE_JOBS_DB).
+  jobs        – one row per unit of work (start a thread / resume after a
+                checklist answer) with status, timestamps and a lease.
+  job_events  – ordered progress events (token frames, status, interrupt,
+                done, error) that the portal tails by job id.
+
+Durability: a claimed job holds a lease (lease_s) that a heartbeat thread
+extends while the worker runs it (hold_lease), so a graph step that is slow
+without emitting events keeps its job. If a worker crashes, the lease
+expires and another worker re-claims the job. Event, result and completion
+writes are conditional on the job still belonging to the worker; a worker
+that lost its lease gets LeaseLost instead of writing over the new owner.
+The message store write is keyed by thread_id, so a result stored just
+before the lease ran out is not stored again by the new owner. Results
+must reach Supabase: a standalone worker's in-memory store is invisible
+to the staff dashboard, so a failed insert fails the attempt and the job
+is retried. Only the in-process pool (start_worker_pool) shares the
+dashboard's process and keeps the in-memory fallback.
+The new owner continues from the thread's last checkpoint, so completed
+nodes are not re-run. "start" jobs run ephemerally (graph.workflow,
+TRIAGE_EPHEMERAL_RUNS) and have no durable checkpoint until they pause, so a
+crashed start re-runs the thread from the beginning. Jobs are retried up to
+max_attempts before failing.
+
+Scheduling (TRIAGE_QUEUE_SCHEDULING, default "priority"): a new thread is
+first enqueued as a cheap "screen" stage that runs screen_for_emergency and
+assigns a provisional urgency; the job is then re-queued as an "agent" stage
+ordered by urgency (EMERGENCY first). Waiting jobs gain one urgency level
+every TRIAGE_QUEUE_AGING_S seconds so LOW work is never starved. "fifo"
+skips the screen stage and runs jobs in arrival order.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from functools import partial
+from typing import Any, Callable, Iterator, Optional
+
+JOBS_DB_PATH = os.environ.get(
+    "TRIAGE_JOBS_DB",
+    os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        "data",
+        "jobs.db",
+    ),
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    thread_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    enqueued_at REAL NOT NULL,
+    started_at REAL,
+    finished_at REAL,
+    lease_expires_at REAL,
+    worker_id TEXT,
+    error TEXT,
+    stage TEXT NOT NULL DEFAULT 'agent',
+    urgency TEXT,
+    priority INTEGER NOT NULL DEFAULT 2,
+    scheduled_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status, enqueued_at);
+CREATE TABLE IF NOT EXISTS job_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    job_id TEXT NOT NULL,
+    thread_id TEXT NOT NULL,
+    type TEXT NOT NULL,
+    content TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_job_events_job ON job_events(job_id, id);
+"""
+
+# Columns added after the first release of the jobs table: (name, DDL)
+_MIGRATIONS = [
+    ("stage", "ALTER TABLE jobs ADD COLUMN stage TEXT NOT NULL DEFAULT 'agent'"),
+    ("urgency", "ALTER TABLE jobs ADD COLUMN urgency TEXT"),
+    ("priority", "ALTER TABLE jobs ADD COLUMN priority INTEGER NOT NULL DEFAULT 2"),
+    ("scheduled_at", "ALTER TABLE jobs ADD COLUMN scheduled_at REAL"),
+]
+
+# Events that end a job from the portal's point of view
+TERMINAL_EVENTS = {"interrupt", "done", "error"}
+
+QUEUE_SCHEDULING = os.environ.get("TRIAGE_QUEUE_SCHEDULING", "priority")
+QUEUE_AGING_S = float(os.environ.get("TRIAGE_QUEUE_AGING_S", "60"))
+
+# Screen-stage jobs sort after confirmed EMERGENCY work (rank 0) and ahead of
+# everything else: they are one short LLM call and are how emergencies get
+# discovered in the first place.
+_SCREEN_PRIORITY = 0.5
+
+# Keyword hints for the provisional urgency of messages the screen did not
+# flag. The triage agent assigns the real urgency; this only orders the queue.
+_HIGH_HINTS = (
+    "severe", "worse", "worsening", "fever", "bleeding", "infection", "swelling",
+    "vomiting", "dizzy", "faint", "short of breath", "can't sleep", "pain",
+)
+_LOW_HINTS = (
+    "refill", "appointment", "reschedule", "cancel", "billing", "invoice",
+    "insurance", "records", "form", "portal", "password", "parking",
+)
+
+
+class LeaseLost(RuntimeError):
+    """The job's lease expired and another worker (or a promote) took it over."""
+
+
+class JobQueue:
+    """SQLite-backed job table with leases, retries and progress events."""
+
+    def __init__(
+        self,
+        path: str = JOBS_DB_PATH,
+        lease_s: float = 60.0,
+        max_attempts: int = 3,
+        scheduling: str = QUEUE_SCHEDULING,
+        aging_s: float = QUEUE_AGING_S,
+    ):
+        if scheduling not in ("priority", "fifo"):
+            raise ValueError(f"Unknown scheduling policy: {scheduling!r}")
+        self.path = path
+        self.lease_s = lease_s
+        self.max_attempts = max_attempts
+        self.scheduling = scheduling
+        self.aging_s = max(aging_s, 1e-6)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with self._connect() as conn:
+            existing = {r["name"] for r in conn.execute("PRAGMA table_info(jobs)")}
+            if existing:
+                for column, ddl in _MIGRATIONS:
+                    if column not in existing:
+                        conn.execute(ddl)
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Short-lived autocommit connection (safe to use from any thread)."""
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            yield conn
+        finally:
+            conn.close()
+
+    # --- Producer side ---
+
+    def enqueue(self, kind: str, thread_id: str, payload: dict) -> str:
+        """Add a job ("start" or "resume_chat") and return its id.
+
+        Under priority scheduling a "start" job begins in the screen stage;
+        a "resume_chat" job inherits the urgency already assigned to its thread.
+        """
+        job_id = str(uuid.uuid4())
+        stage = "screen" if self.scheduling == "priority" and kind == "start" else "agent"
+        with self._connect() as conn:
+            urgency = None
+            if kind != "start":
+                row = conn.execute(
+                    "SELECT urgency FROM jobs WHERE thread_id = ? AND urgency IS NOT NULL "
+                    "ORDER BY enqueued_at DESC LIMIT 1",
+                    (thread_id,),
+                ).fetchone()
+                urgency = row["urgency"] if row else None
+            conn.execute(
+                "INSERT INTO jobs (id, thread_id, kind, payload, status, enqueued_at, stage, urgency, priority) "
+                "VALUES (?, ?, ?, ?, 'queued', ?, ?, ?, ?)",
+                (job_id, thread_id, kind, json.dumps(payload), time.time(),
+                 stage, urgency, _urgency_rank(urgency)),
+            )
+        return job_id
+
+    def get_job(self, job_id: str) -> Optional[dict]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return _job_dict(row) if row else None
+
+    def tail_events(self, job_id: str, after_id: int = 0) -> list[dict]:
+        """Return events for job_id with id > after_id, oldest first."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT id, type, content FROM job_events WHERE job_id = ? AND id > ? ORDER BY id",
+                (job_id, after_id),
+            ).fetchall()
+        return [dict(r) for r in rows]
+
+    def queue_position(self, job_id: str) -> Optional[int]:
+        """1-based position of a queued job in claim order (None once claimed)."""
+        now = time.time()
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT id FROM jobs WHERE status = 'queued' ORDER BY {self._order_by()}",
+                self._order_params(now),
+            ).fetchall()
+        for n, row in enumerate(rows, start=1):
+            if row["id"] == job_id:
+                return n
+        return None
+
+    # --- Worker side ---
+
+    def _order_by(self) -> str:
+        if self.scheduling == "fifo":
+            return "enqueued_at"
+        # Effective priority: stage/urgency rank minus one level per aging_s waited
+        return (
+            f"(CASE WHEN stage = 'screen' THEN {_SCREEN_PRIORITY} ELSE priority END) "
+            "- (? - enqueued_at) / ?, enqueued_at"
+        )
+
+    def _order_params(self, now: float) -> tuple:
+        return () if self.scheduling == "fifo" else (now, self.aging_s)
+
+    def claim(self, worker_id: str) -> Optional[dict]:
+        """Atomically claim the next runnable job (queued, or running with an
+        expired lease after a worker crash) in scheduling order. Returns the
+        job or None."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                # Jobs whose worker died on their final attempt will not be retried
+                conn.execute(
+                    "UPDATE jobs SET status = 'failed', finished_at = ?, "
+                    "error = COALESCE(error, 'worker lease expired') "
+                    "WHERE status = 'running' AND lease_expires_at < ? AND attempts >= ?",
+                    (now, now, self.max_attempts),
+                )
+                row = conn.execute(
+                    "SELECT * FROM jobs WHERE status = 'queued' "
+                    "OR (status = 'running' AND lease_expires_at < ?) "
+                    f"ORDER BY {self._order_by()} LIMIT 1",
+                    (now, *self._order_params(now)),
+                ).fetchone()
+                if row is None:
+                    conn.execute("COMMIT")
+                    return None
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', attempts = attempts + 1, worker_id = ?, "
+                    "started_at = COALESCE(started_at, ?), lease_expires_at = ?, "
+                    "scheduled_at = CASE WHEN stage = 'agent' THEN COALESCE(scheduled_at, ?) "
+                    "ELSE scheduled_at END WHERE id = ?",
+                    (worker_id, now, now + self.lease_s, now, row["id"]),
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        job = _job_dict(row)
+        job["attempts"] += 1
+        job["worker_id"] = worker_id
+        return job
+
+    def promote(self, job: dict, urgency: str, payload: Optional[dict] = None) -> None:
+        """Finish a job's screen stage: re-queue it as agent work at `urgency`.
+
+        The job keeps its enqueued_at (so aging and wait metrics cover the whole
+        request) and gets a fresh attempt budget for the agent stage. The
+        claiming worker's complete() becomes a no-op.
+        """
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE jobs SET status = 'queued', stage = 'agent', urgency = ?, priority = ?, "
+                "payload = ?, attempts = 0, worker_id = NULL, lease_expires_at = NULL "
+                "WHERE id = ? AND worker_id = ?",
+                (urgency, _urgency_rank(urgency), json.dumps(payload if payload is not None else job["payload"]),
+                 job["id"], job["worker_id"]),
+            )
+
+    def append_event(self, job: dict, event_type: str, content: str = "") -> None:
+        """Record a progress event and extend the job's lease. Raises LeaseLost
+        (and writes nothing) if the job no longer belongs to this worker."""
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT worker_id FROM jobs WHERE id = ?", (job["id"],)).fetchone()
+                if row is None or row["worker_id"] != job["worker_id"]:
+                    raise LeaseLost(f"job {job['id']} is no longer held by {job['worker_id']}")
+                conn.execute(
+                    "INSERT INTO job_events (job_id, thread_id, type, content, created_at) VALUES (?, ?, ?, ?, ?)",
+                    (job["id"], job["thread_id"], event_type, content, now),
+                )
+                conn.execute(
+                    "UPDATE jobs SET lease_expires_at = ? WHERE id = ? AND status = 'running'",
+                    (now + self.lease_s, job["id"]),
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+    def heartbeat(self, job: dict) -> bool:
+        """Extend a running job's lease; False once the worker no longer holds it."""
+        with self._connect() as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET lease_expires_at = ? WHERE id = ? AND worker_id = ? AND status = 'running'",
+                (time.time() + self.lease_s, job["id"], job["worker_id"]),
+            )
+        return cur.rowcount > 0
+
+    def holds(self, job: dict) -> bool:
+        """True while the job is running under this worker's lease."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT 1 FROM jobs WHERE id = ? AND worker_id = ? AND status = 'running' AND lease_expires_at >= ?",
+                (job["id"], job["worker_id"], time.time()),
+            ).fetchone()
+        return row is not None
+
+    @contextmanager
+    def hold_lease(self, job: dict, interval: Optional[float] = None) -> Iterator[None]:
+        """Heartbeat the job's lease every interval (default lease_s / 3) from a
+        background thread while the block runs, so a long step without events
+        does not let another worker claim the job."""
+        interval = self.lease_s / 3 if interval is None else interval
+        stop = threading.Event()
+
+        def _beat() -> None:
+            while not stop.wait(interval):
+                try:
+                    if not self.heartbeat(job):
+                        return
+                except sqlite3.Error:
+                    continue  # busy database: try again on the next beat
+
+        thread = threading.Thread(target=_beat, name=f"lease-{job['id'][:8]}", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+    def complete(self, job: dict) -> bool:
+        """Mark the job done; False if it no longer belonged to this worker."""
+        with self._connect() as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET status = 'done', finished_at = ?, lease_expires_at = NULL "
+                "WHERE id = ? AND worker_id = ?",
+                (time.time(), job["id"], job["worker_id"]),
+            )
+        return cur.rowcount > 0
+
+    def fail(self, job: dict, error: str) -> bool:
+        """Record a failed attempt. Re-queues the job while attempts remain;
+        returns True if it will be retried (False too if the job no longer
+        belonged to this worker)."""
+        retry = job["attempts"] < self.max_attempts
+        with self._connect() as conn:
+            cur = conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, finished_at = ?, lease_expires_at = NULL "
+                "WHERE id = ? AND worker_id = ?",
+                ("queued" if retry else "failed", error, None if retry else time.time(),
+                 job["id"], job["worker_id"]),
+            )
+        return cur.rowcount > 0 and retry
+
+    # --- Metrics ---
+
+    def stats(self, window: int = 500) -> dict[str, Any]:
+        """Queue depth plus wait/service time over the last `window` finished jobs.
+
+        by_urgency breaks down queued depth and scheduling delay (enqueue to
+        start of agent work) per urgency level.
+        """
+        with self._connect() as conn:
+            counts = {
+                r["status"]: r["n"]
+                for r in conn.execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status")
+            }
+            queued_by_urgency = {
+                r["u"]: r["n"]
+                for r in conn.execute(
+                    "SELECT COALESCE(urgency, 'UNSCREENED') AS u, COUNT(*) AS n "
+                    "FROM jobs WHERE status = 'queued' GROUP BY u"
+                )
+            }
+            rows = conn.execute(
+                "SELECT enqueued_at, started_at, finished_at, scheduled_at, urgency FROM jobs "
+                "WHERE status = 'done' ORDER BY finished_at DESC LIMIT ?",
+                (window,),
+            ).fetchall()
+            oldest = conn.execute(
+                "SELECT MIN(enqueued_at) AS t FROM jobs WHERE status = 'queued'"
+            ).fetchone()["t"]
+        waits = [r["started_at"] - r["enqueued_at"] for r in rows if r["started_at"]]
+        services = [r["finished_at"] - r["started_at"] for r in rows if r["started_at"] and r["finished_at"]]
+        delays: dict[str, list[float]] = {}
+        for r in rows:
+            if r["scheduled_at"]:
+                delays.setdefault(r["urgency"] or "UNSCREENED", []).append(r["scheduled_at"] - r["enqueued_at"])
+        by_urgency = {
+            u: {"queued": queued_by_urgency.get(u, 0), "scheduling_delay_s": _summary(delays.get(u, []))}
+            for u in sorted(set(queued_by_urgency) | set(delays), key=_urgency_rank)
+        }
+        return {
+            "queued": counts.get("queued", 0),
+            "running": counts.get("running", 0),
+            "done": counts.get("done", 0),
+            "failed": counts.get("failed", 0),
+            "oldest_queued_age_s": (time.time() - oldest) if oldest else 0.0,
+            "wait_s": _summary(waits),
+            "service_s": _summary(services),
+            "by_urgency": by_urgency,
+        }
+
+
+def _urgency_rank(urgency: Optional[str]) -> int:
+    from app.messages_store import URGENCY_ORDER
+    return URGENCY_ORDER.get((urgency or "").upper(), URGENCY_ORDER["NORMAL"])
+
+
+def _provisional_urgency(message: str, safety: dict) -> str:
+    """Queue-ordering urgency from the emergency screen plus keyword hints."""
+    if safety.get("is_potential_emergency"):
+        return "EMERGENCY"
+    text = (message or "").lower()
+    if any(hint in text for hint in _HIGH_HINTS):
+        return "HIGH"
+    if any(hint in text for hint in _LOW_HINTS):
+        return "LOW"
+    return "NORMAL"
+
+
+def _job_dict(row) -> dict:
+    job = dict(row)
+    job["payload"] = json.loads(job["payload"])
+    return job
+
+
+def _summary(values: list[float]) -> dict[str, float]:
+    if not values:
+        return {"mean": 0.0, "p50": 0.0, "p95": 0.0}
+    ordered = sorted(values)
+    return {
+        "mean": sum(ordered) / len(ordered),
+        "p50": ordered[len(ordered) // 2],
+        "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+    }
+
+
+# ---------------------------------------------------------------------------
+# Job handler: drive the graph and publish progress
+# ---------------------------------------------------------------------------
+
+def _job_inputs(app, job: dict, config: dict):
+    """Pick the graph input for a job attempt.
+
+    First attempts start the thread (or resume the checklist interrupt).
+    Retries after a crash continue from the last checkpoint with None so
+    nodes that already completed are not re-run.
+    """
+    from langgraph.types import Command
+    from graph.workflow import _initial_state
+
+    payload = job["payload"]
+    snapshot = app.get_state(config) if job["attempts"] > 1 else None
+    waiting_on_patient = bool(snapshot and any(getattr(t, "interrupts", None) for t in snapshot.tasks))
+
+    if job["kind"] == "resume_chat":
+        if snapshot is None or waiting_on_patient:
+            return Command(resume=payload.get("answer", ""))
+        return None
+    if snapshot is not None and snapshot.next:
+        return None
+    return _initial_state(
+        (payload.get("message") or "").strip(),
+        payload.get("patient_id", ""),
+        payload.get("patient_email", ""),
+        payload.get("file_uri", ""),
+        payload.get("file_mime_type", ""),
+        payload.get("file_name", ""),
+        safety_result=payload.get("safety_result"),
+        patient_name=payload.get("full_name", ""),
+    )
+
+
+def _run_screen_stage(queue: JobQueue, job: dict) -> None:
+    """Run the emergency screen and re-queue the job at its provisional urgency.
+
+    The verdict travels in the payload so safety_node reuses it instead of
+    screening the same text twice.
+    """
+    from agents.safety_agent import screen_for_emergency
+
+    message = (job["payload"].get("message") or "").strip()
+    safety = screen_for_emergency(message).model_dump()
+    urgency = _provisional_urgency(message, safety)
+    queue.promote(job, urgency, {**job["payload"], "safety_result": safety})
+
+
+def run_triage_job(queue: JobQueue, job: dict, durable: bool = True) -> None:
+    """Default job handler: stream the workflow for job["thread_id"], publish
+    coalesced progress events, and store the result when the thread finishes.
+    With durable=False (in-process pool) the result may fall back to the
+    in-memory message store."""
+    if job.get("stage") == "screen":
+        _run_screen_stage(queue, job)
+        return
+
+    from app.streaming import coalesce_tokens, stream_graph
+    from graph.warmup import get_warmup
+    from graph.workflow import (
+        EPHEMERAL_RUNS,
+        _compiled,
+        _get_compiled,
+        _get_ephemeral_saver,
+        _results_from_final,
+        ephemeral_app,
+        finish_ephemeral_run,
+    )
+
+    if not _compiled.ready:
+        # Tell the patient why the first job after a restart is slow
+        warmup = get_warmup()
+        queue.append_event(job, "status", warmup.message() if warmup else "Warming up")
+    app = _get_compiled()
+    # New threads checkpoint in memory and reach SQLite only if they pause;
+    # resumes continue the promoted durable thread.
+    ephemeral = EPHEMERAL_RUNS and job["kind"] == "start"
+    run_app = ephemeral_app(app) if ephemeral else app
+    config = {"configurable": {"thread_id": job["thread_id"]}}
+    inputs = _job_inputs(run_app, job, config)
+
+    try:
+        for event in coalesce_tokens(stream_graph(run_app, inputs, config), interval=0.1):
+            if event["type"] == "done":
+                break
+            if event["type"] == "error":
+                raise RuntimeError(event["content"])
+            if event["type"] == "interrupt" and ephemeral:
+                finish_ephemeral_run(job["thread_id"], app)
+            queue.append_event(job, event["type"], event["content"])
+            if event["type"] == "interrupt":
+                return
+    except BaseException:
+        if ephemeral:
+            _get_ephemeral_saver().discard(job["thread_id"])
+        raise
+
+    state = run_app.get_state(config)
+    final = dict(state.values) if state and state.values else {}
+    if ephemeral:
+        finish_ephemeral_run(job["thread_id"], app)
+    _safety, triage_result = _results_from_final(final, job["thread_id"])
+
+    payload = job["payload"]
+    if not queue.holds(job):
+        # Another worker re-claimed the job: let it store the result
+        raise LeaseLost(f"job {job['id']} lost its lease before storing the result")
+    from app.messages_store import save_messages_bulk
+    save_messages_bulk([{
+        "user_id": payload.get("user_id", ""),
+        "patient_id": payload.get("patient_id", ""),
+        "full_name": payload.get("full_name", ""),
+        "email": payload.get("patient_email", ""),
+        "content": payload.get("content") or payload.get("message", ""),
+        "triage_result": triage_result,
+        "thread_id": job["thread_id"],
+    }], durable=durable)
+
+    summary = {
+        "urgency": triage_result.get("urgency", ""),
+        "summary": triage_result.get("summary", ""),
+        "is_emergency": bool(final.get("is_emergency")),
+    }
+    queue.append_event(job, "done", json.dumps(summary))
+
+
+# ---------------------------------------------------------------------------
+# Worker pool
+# ---------------------------------------------------------------------------
+
+class WorkerPool:
+    """Threads that claim and execute jobs until stopped."""
+
+    def __init__(
+        self,
+        queue: JobQueue,
+        workers: int = 2,
+        handler: Callable[[JobQueue, dict], None] = run_triage_job,
+        poll_interval: float = 0.2,
+    ):
+        self.queue = queue
+        self.handler = handler
+        self.poll_interval = poll_interval
+        self._stop = threading.Event()
+        self._threads = [
+            threading.Thread(target=self._run, name=f"triage-worker-{i}", daemon=True)
+            for i in range(workers)
+        ]
+
+    def start(self) -> "WorkerPool":
+        for t in self._threads:
+            t.start()
+        return self
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        for t in self._threads:
+            t.join(timeout)
+
+    def _run(self) -> None:
+        worker_id = f"{os.getpid()}-{threading.current_thread().name}-{uuid.uuid4().hex[:6]}"
+        while not self._stop.is_set():
+            job = self.queue.claim(worker_id)
+            if job is None:
+                self._stop.wait(self.poll_interval)
+                continue
+            try:
+                with self.queue.hold_lease(job):
+                    self.handler(self.queue, job)
+                self.queue.complete(job)
+            except LeaseLost:
+                pass  # the job's new owner reports its outcome
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                if not self.queue.fail(job, error):
+                    try:
+                        self.queue.append_event(job, "error", f"Triage failed: {error}")
+                    except Exception:
+                        pass
+
+
+_queue: Optional[JobQueue] = None
+_pool: Optional[WorkerPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """Process-wide JobQueue on JOBS_DB_PATH."""
+    global _queue
+    with _pool_lock:
+        if _queue is None:
+            _queue = JobQueue()
+        return _queue
+
+
+def start_worker_pool(workers: Optional[int] = None) -> Optional[WorkerPool]:
+    """Start the in-process worker pool once (TRIAGE_JOB_WORKERS, default 2).
+
+    With 0 workers nothing is started and jobs wait for an external
+    `scripts/triage_worker.py` process.
+    """
+    global _pool
+    if workers is None:
+        workers = int(os.environ.get("TRIAGE_JOB_WORKERS", "2"))
+    queue = get_job_queue()
+    with _pool_lock:
+        if _pool is None and workers > 0:
+            # Same process as the dashboard: the in-memory message fallback is visible to staff
+            _pool = WorkerPool(queue, workers=workers, handler=partial(run_triage_job, durable=False)).start()
+        return _pool
@@ -96,6 +96,63 @@ def save_message(
         })
 
 
+class MessageStoreUnavailable(RuntimeError):
+    """Raised by save_messages_bulk(durable=True) when rows cannot reach Supabase."""
+
+
+def save_messages_bulk(rows: list[dict], durable: bool = False) -> int:
+    """Save many messages in one insert (bulk inbox import).
+
+    Each row has the same keys as save_message's arguments. Returns the number
+    of rows written; falls back to the in-memory store like save_message.
+    With durable=True (non-interactive callers such as the CLI importer, whose
+    process exits before anyone reads the demo store) there is no fallback:
+    MessageStoreUnavailable is raised when Supabase is not configured or the
+    insert fails.
+
+    Rows with a "thread_id" (one per triage run, set by the job queue) are
+    idempotent: a thread already stored is skipped, so a job re-delivered to
+    another worker after its lease expired cannot add the message twice.
+    Needs the messages.thread_id unique index from supabase_schema.sql.
+    """
+    if not rows:
+        return 0
+    keyed = any(r.get("thread_id") for r in rows)
+    records = [
+        {
+            "user_id": r.get("user_id", ""),
+            "patient_id": r.get("patient_id", ""),
+            "full_name": r.get("full_name", ""),
+            "email": r.get("email", ""),
+            "content": r.get("content", ""),
+            "triage_result": r.get("triage_result") or {},
+            **({"thread_id": r.get("thread_id") or None} if keyed else {}),
+        }
+        for r in rows
+    ]
+    sb = _get_staff_supabase_client() or get_supabase_client()
+    if sb:
+        try:
+            if keyed:
+                sb.table("messages").upsert(records, on_conflict="thread_id", ignore_duplicates=True).execute()
+            else:
+                sb.table("messages").insert(records).execute()
+            return len(records)
+        except Exception as e:
+            if durable:
+                raise MessageStoreUnavailable(f"Supabase bulk insert failed: {e}") from e
+            print(f"[messages_store] Supabase bulk insert failed, using in-memory fallback: {e}")
+    elif durable:
+        raise MessageStoreUnavailable("Supabase is not configured (SUPABASE_URL / key)")
+    now = __import__("datetime").datetime.utcnow().isoformat()
+    stored = {m.get("thread_id") for m in _demo_messages if m.get("thread_id")}
+    for rec in records:
+        if rec.get("thread_id") in stored:
+            continue
+        _demo_messages.append({"id": str(uuid.uuid4()), **rec, "created_at": now})
+    return len(records)
+
+
 def get_all_messages_for_staff(active_only: bool = True) -> list[dict]:
     """Return messages for staff view, sorted by urgency (EMERGENCY first) then by created_at (newest first).
     Ensures each message has an 'id' (UUID from DB or generated for demo).
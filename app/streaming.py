@@ -3,6 +3,7 @@ Safe-Stream Bridge for TriageAI.
 
 Wraps LangGraph's sync ``app.stream(stream_mode='messages')`` into a
 generator that yields simple dicts the Streamlit chat UI can consume.
+``astream_graph`` is the async counterpart over ``app.astream``.
 
 Yields:
     {"type": "token",     "content": "..."}   — streamed text chunk
@@ -10,9 +11,19 @@ Yields:
     {"type": "interrupt", "content": "..."}   — checklist follow-up question
     {"type": "done",      "content": ""}      — stream finished normally
     {"type": "error",     "content": "..."}   — unrecoverable error
+
+``coalesce_tokens`` batches consecutive token events into frames so the UI
+re-renders once per frame instead of once per token.
 """
+import os
+import time
+
 from langchain_core.messages import AIMessage, AIMessageChunk, ToolMessage
 
+# Frame window for token coalescing — flush at most every N seconds or N chars
+STREAM_FRAME_INTERVAL_S = float(os.environ.get("STREAM_FRAME_INTERVAL_S", "0.05"))
+STREAM_FRAME_MAX_CHARS = int(os.environ.get("STREAM_FRAME_MAX_CHARS", "200"))
+
 # Human-friendly labels for tool calls and graph nodes
 _TOOL_LABELS = {
     "get_patient_history": "Fetching patient history",
@@ -45,6 +56,55 @@ def _get_node_label(node_name):
     return _NODE_LABELS.get(node_name, "")
 
 
+# Nodes whose AI text tokens are internal and should NOT be shown to the patient.
+_INTERNAL_NODES = {"triage_agent", "synthesis", "draft_reply"}
+
+
+def _chunk_events(chunk, metadata, last_node):
+    """Map one ``(chunk, metadata)`` pair to UI events.
+
+    Returns (events, last_node) so callers can track node transitions.
+    """
+    events = []
+
+    # Track node transitions for status updates
+    current_node = metadata.get("langgraph_node", "")
+    if current_node and current_node != last_node:
+        last_node = current_node
+        node_label = _get_node_label(current_node)
+        if node_label:
+            events.append({"type": "status", "content": node_label})
+
+    # Tool-call status — the AI is requesting a tool
+    if isinstance(chunk, (AIMessage, AIMessageChunk)):
+        if hasattr(chunk, "tool_calls") and chunk.tool_calls:
+            for tc in chunk.tool_calls:
+                tool_name = tc.get("name", "tool")
+                events.append({"type": "status", "content": _get_tool_label(tool_name)})
+        # Streamed text tokens — skip internal nodes (raw JSON assessments)
+        elif current_node not in _INTERNAL_NODES and hasattr(chunk, "content") and isinstance(chunk.content, str) and chunk.content.strip():
+            events.append({"type": "token", "content": chunk.content})
+
+    # Tool results — show a brief status that data came back
+    elif isinstance(chunk, ToolMessage):
+        tool_name = getattr(chunk, "name", "tool")
+        events.append({"type": "status", "content": f"Received results from {_get_tool_label(tool_name).lower()}"})
+
+    return events, last_node
+
+
+def _interrupt_event(snapshot):
+    """Return an interrupt event for the first pending interrupt, else None."""
+    if snapshot and snapshot.tasks:
+        for task in snapshot.tasks:
+            if hasattr(task, "interrupts") and task.interrupts:
+                return {
+                    "type": "interrupt",
+                    "content": str(task.interrupts[0].value),
+                }
+    return None
+
+
 def stream_graph(app, inputs, config):
     """Sync generator wrapping ``app.stream(stream_mode='messages')``.
 
@@ -57,35 +117,12 @@ def stream_graph(app, inputs, config):
     the synthesis node — not for the patient.  Patient-facing content comes
     from checklist interrupts and the final triage summary rendered by the UI.
     """
-    # Nodes whose AI text tokens are internal and should NOT be shown to the patient.
-    _INTERNAL_NODES = {"triage_agent", "synthesis", "draft_reply"}
-
     last_node = None
 
     try:
         for chunk, metadata in app.stream(inputs, config, stream_mode="messages"):
-            # Track node transitions for status updates
-            current_node = metadata.get("langgraph_node", "")
-            if current_node and current_node != last_node:
-                last_node = current_node
-                node_label = _get_node_label(current_node)
-                if node_label:
-                    yield {"type": "status", "content": node_label}
-
-            # Tool-call status — the AI is requesting a tool
-            if isinstance(chunk, (AIMessage, AIMessageChunk)):
-                if hasattr(chunk, "tool_calls") and chunk.tool_calls:
-                    for tc in chunk.tool_calls:
-                        tool_name = tc.get("name", "tool")
-                        yield {"type": "status", "content": _get_tool_label(tool_name)}
-                # Streamed text tokens — skip internal nodes (raw JSON assessments)
-                elif current_node not in _INTERNAL_NODES and hasattr(chunk, "content") and isinstance(chunk.content, str) and chunk.content.strip():
-                    yield {"type": "token", "content": chunk.content}
-
-            # Tool results — show a brief status that data came back
-            elif isinstance(chunk, ToolMessage):
-                tool_name = getattr(chunk, "name", "tool")
-                yield {"type": "status", "content": f"Received results from {_get_tool_label(tool_name).lower()}"}
+            events, last_node = _chunk_events(chunk, metadata, last_node)
+            yield from events
 
     except Exception as e:
         yield {"type": "error", "content": f"Workflow stream failed: {e}"}
@@ -93,16 +130,76 @@ def stream_graph(app, inputs, config):
 
     # Check for interrupts after stream exhausts
     try:
-        snapshot = app.get_state(config)
-        if snapshot and snapshot.tasks:
-            for task in snapshot.tasks:
-                if hasattr(task, "interrupts") and task.interrupts:
-                    yield {
-                        "type": "interrupt",
-                        "content": str(task.interrupts[0].value),
-                    }
-                    return
+        event = _interrupt_event(app.get_state(config))
+        if event:
+            yield event
+            return
     except Exception:
         pass
 
     yield {"type": "done", "content": ""}
+
+
+async def astream_graph(app, inputs, config):
+    """Async generator counterpart of ``stream_graph`` over ``app.astream``.
+
+    Yields the same event dicts; used with the async workflow entry points
+    (``astream_triage_workflow`` / ``aresume_chat``).
+    """
+    last_node = None
+
+    try:
+        async for chunk, metadata in app.astream(inputs, config, stream_mode="messages"):
+            events, last_node = _chunk_events(chunk, metadata, last_node)
+            for event in events:
+                yield event
+
+    except Exception as e:
+        yield {"type": "error", "content": f"Workflow stream failed: {e}"}
+        return
+
+    try:
+        event = _interrupt_event(await app.aget_state(config))
+        if event:
+            yield event
+            return
+    except Exception:
+        pass
+
+    yield {"type": "done", "content": ""}
+
+
+def coalesce_tokens(events, interval=None, max_chars=None, clock=time.monotonic):
+    """Batch token events from ``stream_graph`` into time/size-bounded frames.
+
+    Consecutive ``token`` events are buffered and emitted as a single token
+    event once ``interval`` seconds have passed since the frame started or the
+    buffer reaches ``max_chars``. Any non-token event (status, interrupt,
+    done, error) flushes the pending frame first so ordering is preserved.
+    """
+    interval = STREAM_FRAME_INTERVAL_S if interval is None else interval
+    max_chars = STREAM_FRAME_MAX_CHARS if max_chars is None else max_chars
+
+    buffer: list[str] = []
+    buffered_chars = 0
+    frame_start = 0.0
+
+    for event in events:
+        if event["type"] != "token":
+            if buffer:
+                yield {"type": "token", "content": "".join(buffer)}
+                buffer, buffered_chars = [], 0
+            yield event
+            continue
+
+        if not buffer:
+            frame_start = clock()
+        buffer.append(event["content"])
+        buffered_chars += len(event["content"])
+
+        if buffered_chars >= max_chars or clock() - frame_start >= interval:
+            yield {"type": "token", "content": "".join(buffer)}
+            buffer, buffered_chars = [], 0
+
+    if buffer:
+        yield {"type": "token", "content": "".join(buffer)}
@@ -3,9 +3,11 @@ TriageAI Streamlit app: login/register, patient chat, staff view, and HITL appro
 Messages are tied to patient identity (patient_id, full_name) for personalization and staff identification.
 Sprint 5: Streaming chat interface with multimodal vision and conversational interrupts.
 """
-import base64
+import json
 import os
 import sys
+import time
+import uuid
 
 # Ensure the project root is on sys.path so all package imports resolve correctly.
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -23,7 +25,7 @@ import streamlit as st
 from dotenv import load_dotenv
 
 from app.auth import register, login, get_current_user, is_supabase_configured
-from app.streaming import stream_graph
+from app.streaming import stream_graph, coalesce_tokens
 from graph.state import get_patient_context, set_patient_context, clear_patient_context
 from app.messages_store import (
     save_message,
@@ -58,10 +60,44 @@ def _run_workflow(msg: str, patient_id: str = "", patient_email: str = ""):
 def _policy_available():
     try:
         from agents.policy_agent import get_relevant_policy, generate_draft_reply, generate_next_steps
-        return get_relevant_policy, generate_draft_reply, generate_next_steps
+        from agents.policy_scope import policy_where_for
+
+        def _scoped_policy(message, triage_result):
+            # Scope to the case's department (recommended queue / intent)
+            return get_relevant_policy(message, triage_result.get("summary", ""), where=policy_where_for(triage_result))
+
+        return _scoped_policy, generate_draft_reply, generate_next_steps
     except ImportError:
         return None
 
+def _start_warmup():
+    """Start the process-wide warm-up once (graph, vector store, embedding model, LLM client)."""
+    try:
+        from graph.warmup import start_warmup
+        return start_warmup()
+    except ImportError:
+        return None
+
+
+def _start_retention():
+    """Start the process-wide checkpoint retention thread once."""
+    try:
+        from graph.retention import start_retention_task
+        return start_retention_task()
+    except ImportError:
+        return None
+
+
+def _wait_for_warmup():
+    """Show which warm-up step is running instead of stalling silently."""
+    warmup = _start_warmup()
+    if warmup is None or warmup.ready:
+        return
+    banner = st.empty()
+    while not warmup.wait(0.5):
+        banner.info(f"⏳ {warmup.message()}...")
+    banner.empty()
+
 # Page config
 st.set_page_config(page_title="TriageAI Patient Portal", page_icon="🏥", layout="centered")
 
@@ -145,19 +181,28 @@ def render_login_register():
 
 
 def _process_uploaded_file(uploaded_file):
-    """Encode an uploaded file as a base64 data URI."""
-    raw = uploaded_file.read()
-    b64 = base64.b64encode(raw).decode("utf-8")
+    """Write an uploaded file to the blob store and return its reference.
+
+    Only the small "blob:sha256:..." ref goes into session state, job payloads
+    and graph checkpoints; the bytes are read back only for vision calls.
+    """
+    from graph.blob_store import get_blob_store
+
+    raw = uploaded_file.getvalue()
     mime = uploaded_file.type or "application/octet-stream"
     return {
-        "uri": f"data:{mime};base64,{b64}",
+        "uri": get_blob_store().put(raw),
         "mime": mime,
         "name": uploaded_file.name,
     }
 
 
 def _stream_and_display(app, inputs, config, patient):
-    """Drive stream_graph() and render tokens progressively."""
+    """Drive stream_graph() and render tokens progressively.
+
+    Tokens are coalesced into ~50ms frames so each markdown re-render (and
+    websocket delta) covers a batch of tokens rather than a single one.
+    """
     from graph.workflow import get_workflow_state
 
     full_response = ""
@@ -165,7 +210,7 @@ def _stream_and_display(app, inputs, config, patient):
         text_area = st.empty()
         status_area = st.empty()
 
-        for event in stream_graph(app, inputs, config):
+        for event in coalesce_tokens(stream_graph(app, inputs, config)):
             if event["type"] == "token":
                 full_response += event["content"]
                 text_area.markdown(full_response + " **|**")
@@ -246,6 +291,104 @@ def _stream_and_display(app, inputs, config, patient):
     st.rerun()
 
 
+def _use_job_queue() -> bool:
+    """Background jobs by default; TRIAGE_JOB_MODE=inline runs the graph in the script thread."""
+    return os.environ.get("TRIAGE_JOB_MODE", "queue").lower() != "inline"
+
+
+def _job_payload(patient, **extra) -> dict:
+    return {
+        "user_id": patient.user_id,
+        "patient_id": patient.patient_id,
+        "full_name": patient.full_name,
+        "patient_email": patient.email,
+        "content": st.session_state.chat_messages[0]["content"] if st.session_state.chat_messages else "",
+        **extra,
+    }
+
+
+def _tail_and_display(job_id, timeout_s: float = 300.0):
+    """Tail a background job's progress events and render them like the inline stream.
+
+    The workflow runs on a worker; this loop only polls the job table, so a
+    dropped session does not lose the triage — the worker stores the result.
+    """
+    from app.job_queue import TERMINAL_EVENTS, get_job_queue
+
+    queue = get_job_queue()
+    full_response = ""
+    last_id = 0
+    terminal = None
+    deadline = time.monotonic() + timeout_s
+    next_position_check = 0.0
+
+    with st.chat_message("assistant"):
+        text_area = st.empty()
+        status_area = st.empty()
+        status_area.markdown(
+            "<div style='color:#888; font-size:0.85em;'>&#9679; Queued...</div>",
+            unsafe_allow_html=True,
+        )
+
+        while terminal is None and time.monotonic() < deadline:
+            events = queue.tail_events(job_id, after_id=last_id)
+            for event in events:
+                last_id = event["id"]
+                if event["type"] == "token":
+                    full_response += event["content"]
+                    text_area.markdown(full_response + " **|**")
+                elif event["type"] == "status":
+                    status_area.markdown(
+                        f"<div style='color:#888; font-size:0.85em;'>&#9679; {event['content']}...</div>",
+                        unsafe_allow_html=True,
+                    )
+                elif event["type"] in TERMINAL_EVENTS:
+                    terminal = event
+                    break
+            if terminal is None and not events:
+                # Until the first event arrives, show where the job sits in the queue
+                if last_id == 0 and time.monotonic() >= next_position_check:
+                    next_position_check = time.monotonic() + 1.0
+                    position = queue.queue_position(job_id)
+                    if position:
+                        status_area.markdown(
+                            f"<div style='color:#888; font-size:0.85em;'>&#9679; Queued (position {position})...</div>",
+                            unsafe_allow_html=True,
+                        )
+                time.sleep(0.1)
+
+        if full_response:
+            text_area.markdown(full_response)
+        status_area.empty()
+
+    if terminal is None:
+        st.info("Your message is still being processed. The result will appear in your message history.")
+    elif terminal["type"] == "interrupt":
+        st.session_state.pending_interrupt = terminal["content"]
+        st.session_state.chat_messages.append({"role": "assistant", "content": terminal["content"]})
+        st.rerun()
+        return
+    elif terminal["type"] == "error":
+        st.error(terminal["content"])
+        return
+    else:
+        result = json.loads(terminal["content"] or "{}")
+        if result.get("is_emergency"):
+            st.warning(
+                "This message was flagged as a potential emergency. "
+                "Staff will prioritize it. If this is a life-threatening "
+                "emergency, please call 911 or go to the nearest ER."
+            )
+        if result.get("summary") or result.get("urgency"):
+            st.toast(f"Triage complete — {result.get('urgency', '')}: {result.get('summary', '')}", icon="\u2705")
+
+    st.session_state.chat_thread_id = None
+    st.session_state.pending_interrupt = None
+    st.session_state.uploaded_file_data = None
+    st.session_state.chat_messages = []
+    st.rerun()
+
+
 def render_patient_portal():
     """Streaming chat interface for the patient (Sprint 5)."""
     patient = get_patient_context(st.session_state)
@@ -275,6 +418,10 @@ def render_patient_portal():
     for msg in st.session_state.chat_messages:
         st.chat_message(msg["role"]).markdown(msg["content"])
 
+    warmup = _start_warmup()
+    if warmup is not None and not warmup.ready:
+        st.info(f"⏳ {warmup.message()}... your first message may take a little longer.")
+
     # --- Show pending interrupt as a prompt ---
     if st.session_state.pending_interrupt:
         st.info("The AI needs more information. Please reply below.")
@@ -287,12 +434,34 @@ def render_patient_portal():
         st.chat_message("user").markdown(user_input)
         st.session_state.chat_messages.append({"role": "user", "content": user_input})
 
-        if st.session_state.pending_interrupt:
+        if _use_job_queue():
+            # Enqueue for a background worker and tail its progress events
+            from app.job_queue import get_job_queue, start_worker_pool
+            start_worker_pool()
+            queue = get_job_queue()
+            thread_id = st.session_state.chat_thread_id
+            if st.session_state.pending_interrupt and thread_id:
+                st.session_state.pending_interrupt = None
+                job_id = queue.enqueue("resume_chat", thread_id, _job_payload(patient, answer=user_input))
+            else:
+                thread_id = str(uuid.uuid4())
+                st.session_state.chat_thread_id = thread_id
+                file_data = st.session_state.uploaded_file_data or {}
+                job_id = queue.enqueue("start", thread_id, _job_payload(
+                    patient,
+                    message=user_input,
+                    file_uri=file_data.get("uri", ""),
+                    file_mime_type=file_data.get("mime", ""),
+                    file_name=file_data.get("name", ""),
+                ))
+            _tail_and_display(job_id)
+        elif st.session_state.pending_interrupt:
             # Resume from checklist interrupt
             thread_id = st.session_state.chat_thread_id
             st.session_state.pending_interrupt = None
             if thread_id:
                 try:
+                    _wait_for_warmup()
                     from graph.workflow import resume_chat
                     app, command, config = resume_chat(thread_id, user_input)
                     _stream_and_display(app, command, config, patient)
@@ -301,6 +470,7 @@ def render_patient_portal():
         else:
             # New workflow
             try:
+                _wait_for_warmup()
                 from graph.workflow import stream_triage_workflow
                 file_data = st.session_state.uploaded_file_data or {}
                 app, initial, config, thread_id = stream_triage_workflow(
@@ -349,6 +519,17 @@ def _urgency_emoji(urgency: str) -> str:
     return "🟡"  # NORMAL or default
 
 
+def _close_thread(thread_id: str, hitl_status: str) -> None:
+    """Record a staff resolution on the workflow thread so retention can prune it."""
+    if not thread_id:
+        return
+    try:
+        from graph.workflow import close_workflow
+        close_workflow(thread_id, hitl_status)
+    except Exception:
+        pass  # the message store is the source of truth for the staff view
+
+
 def render_staff_view():
     """Staff view: two-pane dashboard (active queue left, detail view right)."""
     messages = get_all_messages_for_staff(active_only=True)
@@ -440,7 +621,7 @@ def render_staff_view():
             policy_fns = _policy_available()
             if policy_fns:
                 get_relevant_policy, generate_draft_reply, _gen_steps = policy_fns
-                policy_chunks = get_relevant_policy(content, tr.get("summary", ""))
+                policy_chunks = get_relevant_policy(content, tr)
                 existing_draft = generate_draft_reply(content, tr, policy_chunks)
 
         edited_draft = st.text_area(
@@ -454,12 +635,20 @@ def render_staff_view():
         policy_fns = _policy_available()
         if policy_fns:
             get_relevant_policy, _gdr, generate_next_steps = policy_fns
-            policy_chunks = get_relevant_policy(content, tr.get("summary", ""))
+            policy_chunks = get_relevant_policy(content, tr)
             steps = generate_next_steps(content, tr, policy_chunks)
             if steps:
                 st.markdown("**Suggested next steps**")
                 for s in steps:
                     st.markdown(f"- {s}")
+            from agents.embeddings import embedding_stats
+            from agents.policy_agent import policy_cache_stats
+            cache = policy_cache_stats()
+            caption = f"Policy cache: {cache['hit_rate']:.0%} hits ({cache['hits']}/{cache['hits'] + cache['misses']} lookups)"
+            embed = embedding_stats()
+            if embed.get("calls"):
+                caption += f" · embed {embed['mean_embed_ms']:.1f}ms/query (model loaded in {embed['load_s']:.1f}s)"
+            st.caption(caption)
 
         # Action buttons
         btn_col1, btn_col2, btn_col3 = st.columns(3)
@@ -495,6 +684,7 @@ def render_staff_view():
                 er_body = "Your case has been reviewed. Please proceed to the ER as directed by staff."
                 new_tr = {**(tr or {}), "status": "Resolved/Routed", "hitl_status": "approved", "staff_reply": er_body}
                 if update_message_triage_result(selected.get("id"), new_tr):
+                    _close_thread(thread_id, "approved")
                     send_resolution_email(email, "Urgent: Proceed to ER", er_body)
                     st.success("Routed to ER and patient emailed!")
                     st.session_state.selected_message_id = None
@@ -505,6 +695,7 @@ def render_staff_view():
             if st.button("Dismiss", key="staff_dismiss"):
                 dismissed_tr = {**tr, "hitl_status": "dismissed", "status": "Resolved/Routed"}
                 update_message_triage_result(selected.get("id"), dismissed_tr)
+                _close_thread(thread_id, "dismissed")
                 st.info("Message dismissed.")
                 st.session_state.selected_message_id = None
                 st.rerun()
@@ -582,11 +773,14 @@ def render_pending_approvals():
                 if st.button("Dismiss", key=f"dismiss_{m.get('id', idx)}"):
                     dismissed_tr = {**tr, "hitl_status": "dismissed", "status": "Resolved/Routed"}
                     update_message_triage_result(m.get("id"), dismissed_tr)
+                    _close_thread(thread_id, "dismissed")
                     st.info("Message dismissed.")
                     st.rerun()
 
 
 def main():
+    _start_warmup()  # in the background, while the user logs in
+    _start_retention()  # prunes checkpoints in inline and queue mode alike
     patient = get_patient_context(st.session_state)
     if patient is None:
         render_login_register()
@@ -0,0 +1,202 @@
+"""
+Bulk triage for inbox imports (clinic onboarding backlogs).
+
+run_triage_batch / arun_triage_batch push an iterable of portal messages
+through arun_triage_workflow on one event loop with bounded concurrency:
+
+  - Backpressure: items are pulled lazily from the input iterable into a
+    bounded queue, so a 100k-line file is never held in memory.
+  - Isolation: an exception on one item is recorded and the batch continues.
+  - Resume: completed item ids are appended to a JSONL progress file after
+    their results are stored; a re-run skips them.
+  - Bulk writes: results are written to the message store in batches via
+    save_messages_bulk(durable=True) instead of one insert per message. A
+    batch that does not reach Supabase is recorded as failed ("not stored"),
+    never "ok", so a --resume run triages it again.
+
+Input items are dicts with at least "message" and optionally "id",
+"patient_id", "patient_email"/"email", "user_id", "full_name".
+"""
+import asyncio
+import csv
+import json
+import os
+import time
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+
+def read_inbox(path: str) -> Iterator[dict]:
+    """Stream items from a JSONL or CSV inbox export, one at a time.
+
+    Items without an "id" get their 1-based row number so progress tracking
+    is stable across re-runs of the same file.
+    """
+    if path.lower().endswith(".csv"):
+        with open(path, newline="") as f:
+            for n, row in enumerate(csv.DictReader(f), start=1):
+                row.setdefault("id", str(n))
+                if not row.get("id"):
+                    row["id"] = str(n)
+                yield row
+        return
+
+    with open(path) as f:
+        for n, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            item = json.loads(line)
+            item.setdefault("id", str(n))
+            yield item
+
+
+def _load_completed(progress_path: Optional[str]) -> set[str]:
+    """Return ids already completed successfully in a previous run."""
+    done: set[str] = set()
+    if not progress_path or not os.path.exists(progress_path):
+        return done
+    with open(progress_path) as f:
+        for line in f:
+            try:
+                rec = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # torn final line from an interrupted run
+            if rec.get("status") == "ok":
+                done.add(str(rec.get("id")))
+    return done
+
+
+def _append_progress(progress_path: Optional[str], records: list[dict]) -> None:
+    if not progress_path or not records:
+        return
+    with open(progress_path, "a") as f:
+        for rec in records:
+            f.write(json.dumps(rec) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _store_row(item: dict, triage_result: dict) -> dict:
+    return {
+        "user_id": item.get("user_id", ""),
+        "patient_id": item.get("patient_id", ""),
+        "full_name": item.get("full_name", ""),
+        "email": item.get("patient_email") or item.get("email", ""),
+        "content": item.get("message", ""),
+        "triage_result": triage_result,
+    }
+
+
+async def arun_triage_batch(
+    items: Iterable[dict],
+    concurrency: int = 8,
+    progress_path: Optional[str] = None,
+    save: bool = True,
+    store_batch_size: int = 50,
+    on_progress: Optional[Callable[[dict], None]] = None,
+    item_timeout: Optional[float] = None,
+) -> dict[str, Any]:
+    """Triage many messages with bounded concurrency. Returns run statistics.
+
+    on_progress receives the running stats dict after every completed item
+    (ok or failed); stats["msgs_per_min"] is throughput since the run started.
+    """
+    from graph.workflow import arun_triage_workflow
+
+    completed = _load_completed(progress_path)
+    queue: asyncio.Queue = asyncio.Queue(maxsize=max(1, concurrency) * 2)
+    pending_rows: list[dict] = []
+    pending_progress: list[dict] = []
+    flush_lock = asyncio.Lock()
+    stats: dict[str, Any] = {
+        "ok": 0,
+        "failed": 0,
+        "skipped": 0,
+        "stored": 0,
+        "elapsed_s": 0.0,
+        "msgs_per_min": 0.0,
+        "errors": [],
+    }
+    start = time.monotonic()
+
+    async def _flush(force: bool = False) -> None:
+        async with flush_lock:
+            if not pending_progress or (not force and len(pending_progress) < store_batch_size):
+                return
+            rows, progress = list(pending_rows), list(pending_progress)
+            pending_rows.clear()
+            pending_progress.clear()
+            if save and rows:
+                from app.messages_store import save_messages_bulk
+                try:
+                    stats["stored"] += await asyncio.to_thread(save_messages_bulk, rows, durable=True)
+                except Exception as e:
+                    error = f"not stored: {type(e).__name__}: {e}"
+                    for rec in progress:
+                        if rec["status"] == "ok":
+                            rec.update(status="error", error=error)
+                            stats["ok"] -= 1
+                            stats["failed"] += 1
+                            if len(stats["errors"]) < 100:
+                                stats["errors"].append({"id": rec["id"], "error": error})
+            # Progress is recorded only after results are stored, so an
+            # interrupted import re-triages anything that was not persisted.
+            await asyncio.to_thread(_append_progress, progress_path, progress)
+
+    def _report() -> None:
+        elapsed = time.monotonic() - start
+        stats["elapsed_s"] = elapsed
+        done = stats["ok"] + stats["failed"]
+        stats["msgs_per_min"] = done / elapsed * 60 if elapsed > 0 else 0.0
+        if on_progress:
+            on_progress(stats)
+
+    async def _worker() -> None:
+        while True:
+            item = await queue.get()
+            if item is None:
+                queue.task_done()
+                return
+            item_id = str(item.get("id", ""))
+            try:
+                run = arun_triage_workflow(
+                    item.get("message", ""),
+                    patient_id=item.get("patient_id", ""),
+                    patient_email=item.get("patient_email") or item.get("email", ""),
+                )
+                _safety, triage = await asyncio.wait_for(run, timeout=item_timeout)
+                pending_rows.append(_store_row(item, triage))
+                pending_progress.append({"id": item_id, "status": "ok", "thread_id": triage.get("thread_id", "")})
+                stats["ok"] += 1
+            except Exception as e:
+                pending_progress.append({"id": item_id, "status": "error", "error": f"{type(e).__name__}: {e}"})
+                stats["failed"] += 1
+                if len(stats["errors"]) < 100:
+                    stats["errors"].append({"id": item_id, "error": str(e)})
+            finally:
+                queue.task_done()
+            _report()
+            await _flush()
+
+    workers = [asyncio.create_task(_worker()) for _ in range(max(1, concurrency))]
+    try:
+        for item in items:
+            if str(item.get("id", "")) in completed:
+                stats["skipped"] += 1
+                continue
+            await queue.put(item)  # blocks when workers are saturated
+        for _ in workers:
+            await queue.put(None)
+        await asyncio.gather(*workers)
+    finally:
+        for w in workers:
+            w.cancel()
+        await _flush(force=True)
+        _report()
+
+    return stats
+
+
+def run_triage_batch(items: Iterable[dict], **kwargs) -> dict[str, Any]:
+    """Sync wrapper around arun_triage_batch (same arguments and return value)."""
+    return asyncio.run(arun_triage_batch(items, **kwargs))
@@ -0,0 +1,123 @@
+"""
+Content-addressed store for patient attachments.
+
+Uploads used to travel as base64 data URIs inside TriageWorkflowState, so a
+5MB photo was re-serialized into every checkpoint of the thread (and into the
+job payload and Streamlit session). Attachments are now written once to
+./data/blobs/<aa>/<sha256> (override with TRIAGE_BLOB_DIR) and state carries
+only a reference:
+
+    blob:sha256:<hex digest>
+
+Identical uploads share one file. Reads memory-map the file, and the data URI
+a vision call needs is built only at that call (materialize_data_uri).
+Legacy data URIs in older checkpoints pass through unchanged.
+"""
+import base64
+import hashlib
+import mmap
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+BLOB_DIR = os.environ.get(
+    "TRIAGE_BLOB_DIR",
+    os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        "data",
+        "blobs",
+    ),
+)
+
+BLOB_REF_PREFIX = "blob:sha256:"
+
+
+def is_blob_ref(uri: Optional[str]) -> bool:
+    return bool(uri) and uri.startswith(BLOB_REF_PREFIX)
+
+
+class BlobStore:
+    """Write-once files keyed by SHA-256 of their content."""
+
+    def __init__(self, root: str = BLOB_DIR):
+        self.root = root
+
+    def _path(self, digest: str) -> str:
+        if len(digest) != 64 or any(c not in "0123456789abcdef" for c in digest):
+            raise ValueError(f"Invalid blob digest: {digest!r}")
+        return os.path.join(self.root, digest[:2], digest)
+
+    def _digest(self, ref: str) -> str:
+        if not is_blob_ref(ref):
+            raise ValueError(f"Not a blob reference: {ref!r}")
+        return ref[len(BLOB_REF_PREFIX):]
+
+    def put(self, data: bytes) -> str:
+        """Store data (no-op if already present) and return its reference."""
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # Write to a temp file and rename so readers never see a partial blob
+            fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), prefix=".tmp-")
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(tmp, path)
+            except BaseException:
+                if os.path.exists(tmp):
+                    os.unlink(tmp)
+                raise
+        return BLOB_REF_PREFIX + digest
+
+    def exists(self, ref: str) -> bool:
+        return os.path.exists(self._path(self._digest(ref)))
+
+    def size(self, ref: str) -> int:
+        return os.path.getsize(self._path(self._digest(ref)))
+
+    @contextmanager
+    def open(self, ref: str) -> Iterator[memoryview]:
+        """Memory-mapped, read-only view of a blob."""
+        with open(self._path(self._digest(ref)), "rb") as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                yield memoryview(b"")
+                return
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                view = memoryview(mm)
+                try:
+                    yield view
+                finally:
+                    view.release()
+
+    def materialize_data_uri(self, ref: str, mime: str) -> str:
+        """Build the base64 data URI for a blob (only for the LLM call itself)."""
+        with self.open(ref) as view:
+            b64 = base64.b64encode(view).decode("ascii")
+        return f"data:{mime or 'application/octet-stream'};base64,{b64}"
+
+
+_store: Optional[BlobStore] = None
+
+
+def get_blob_store() -> BlobStore:
+    """Process-wide BlobStore on BLOB_DIR."""
+    global _store
+    if _store is None:
+        _store = BlobStore()
+    return _store
+
+
+def to_blob_ref(file_uri: Optional[str]) -> Optional[str]:
+    """Store a base64 data URI and return its blob ref; other values pass through."""
+    if not file_uri or not file_uri.startswith("data:") or ";base64," not in file_uri:
+        return file_uri
+    return get_blob_store().put(base64.b64decode(file_uri.split(";base64,", 1)[1]))
+
+
+def resolve_file_uri(file_uri: Optional[str], mime: str = "") -> Optional[str]:
+    """Data URI for a state file_uri: materializes blob refs, passes legacy URIs through."""
+    if is_blob_ref(file_uri):
+        return get_blob_store().materialize_data_uri(file_uri, mime)
+    return file_uri
@@ -0,0 +1,132 @@
+"""
+Compact checkpoint serializer.
+
+LangGraph's JsonPlusSerializer msgpack-encodes every message with its full
+model_dump(): Gemini response_metadata (safety ratings, finish reasons,
+grounding), usage blocks and every default-valued field, repeated in every
+checkpoint of the thread. CompactSerializer writes the same msgpack format
+with three changes:
+
+  - Messages are dumped with exclude_defaults, so empty fields are omitted
+    (they are restored by the message constructor on load).
+  - Provider metadata we never read back is dropped: usage_metadata and all
+    response_metadata except the keys langchain-google-genai consults when
+    replaying history (model_provider, output_version).
+  - Payloads of at least CHECKPOINT_ZSTD_MIN_BYTES are zstd-compressed and
+    stored with a "+zstd" type suffix.
+
+Loading accepts both formats, so existing checkpoints stay readable.
+zstandard is a hard requirement: every process sharing the checkpoint
+database must be able to read what any other one wrote. The msgpack
+helpers come from langgraph.checkpoint.serde.jsonplus, which is not public
+API; requirements.txt pins langgraph-checkpoint to the minor version this
+was written against.
+
+Settings (environment):
+  CHECKPOINT_SERDE            compact | default (default compact)
+  CHECKPOINT_ZSTD_MIN_BYTES   compression threshold (default 2048, 0 = off)
+  CHECKPOINT_ZSTD_LEVEL       zstd level (default 3)
+"""
+import os
+import threading
+from typing import Any
+
+import ormsgpack
+import zstandard
+from langchain_core.messages import BaseMessage
+from langgraph.checkpoint.serde.jsonplus import (
+    EXT_PYDANTIC_V2,
+    JsonPlusSerializer,
+    _msgpack_default,
+    _msgpack_enc,
+    _option,
+)
+
+CHECKPOINT_SERDE = os.environ.get("CHECKPOINT_SERDE", "compact").lower()
+CHECKPOINT_ZSTD_MIN_BYTES = int(os.environ.get("CHECKPOINT_ZSTD_MIN_BYTES", "2048"))
+CHECKPOINT_ZSTD_LEVEL = int(os.environ.get("CHECKPOINT_ZSTD_LEVEL", "3"))
+
+_ZSTD_SUFFIX = "+zstd"
+
+# response_metadata keys langchain-google-genai reads back when converting
+# stored AIMessages into the next request
+_KEPT_RESPONSE_METADATA = ("model_provider", "output_version")
+
+
+def _compact_message_dump(message: BaseMessage, strip_metadata: bool) -> dict:
+    dump = message.model_dump(exclude_defaults=True)
+    if strip_metadata:
+        dump.pop("usage_metadata", None)
+        kept = {k: v for k, v in (dump.pop("response_metadata", None) or {}).items()
+                if k in _KEPT_RESPONSE_METADATA}
+        if kept:
+            dump["response_metadata"] = kept
+    return dump
+
+
+class CompactSerializer(JsonPlusSerializer):
+    """JsonPlusSerializer with compact message encoding and zstd compression."""
+
+    def __init__(
+        self,
+        *,
+        zstd_min_bytes: int = CHECKPOINT_ZSTD_MIN_BYTES,
+        zstd_level: int = CHECKPOINT_ZSTD_LEVEL,
+        strip_metadata: bool = True,
+        **kwargs,
+    ):
+        super().__init__(**kwargs)
+        self.zstd_min_bytes = zstd_min_bytes
+        self.zstd_level = zstd_level
+        self.strip_metadata = strip_metadata
+        # zstd (de)compressor objects are not thread-safe; keep one per thread
+        self._local = threading.local()
+
+    def _default(self, obj: Any):
+        if isinstance(obj, BaseMessage):
+            return ormsgpack.Ext(
+                EXT_PYDANTIC_V2,
+                _msgpack_enc((
+                    obj.__class__.__module__,
+                    obj.__class__.__name__,
+                    _compact_message_dump(obj, self.strip_metadata),
+                    "model_validate_json",
+                )),
+            )
+        return _msgpack_default(obj)
+
+    def _compressor(self):
+        c = getattr(self._local, "compressor", None)
+        if c is None:
+            c = self._local.compressor = zstandard.ZstdCompressor(level=self.zstd_level)
+        return c
+
+    def _decompressor(self):
+        d = getattr(self._local, "decompressor", None)
+        if d is None:
+            d = self._local.decompressor = zstandard.ZstdDecompressor()
+        return d
+
+    def dumps_typed(self, obj: Any) -> tuple[str, bytes]:
+        if obj is None or isinstance(obj, (bytes, bytearray)):
+            return super().dumps_typed(obj)
+        try:
+            type_, data = "msgpack", ormsgpack.packb(obj, default=self._default, option=_option)
+        except ormsgpack.MsgpackEncodeError:
+            type_, data = super().dumps_typed(obj)
+        if 0 < self.zstd_min_bytes <= len(data):
+            return type_ + _ZSTD_SUFFIX, self._compressor().compress(data)
+        return type_, data
+
+    def loads_typed(self, data: tuple[str, bytes]) -> Any:
+        type_, data_ = data
+        if type_.endswith(_ZSTD_SUFFIX):
+            type_, data_ = type_[: -len(_ZSTD_SUFFIX)], self._decompressor().decompress(data_)
+        return super().loads_typed((type_, data_))
+
+
+def default_serde():
+    """Serializer for the app's checkpoint stores (None = LangGraph default)."""
+    if CHECKPOINT_SERDE == "default":
+        return None
+    return CompactSerializer()
@@ -0,0 +1,314 @@
+"""
+Concurrency-safe SQLite checkpoint store for the triage graph.
+
+The stock SqliteSaver shares one connection behind one threading.Lock, so
+every checkpoint read and write in the process is serialized. PooledSqliteSaver
+keeps the same schema and query code but checks a connection out of a bounded
+pool for each operation:
+
+  - WAL journaling, so readers never block the writer (and vice versa).
+  - synchronous=NORMAL by default: durable across application crashes; the
+    last commits may roll back on power loss, which only re-runs a node.
+  - busy_timeout, so concurrent writers wait on SQLite's lock instead of
+    failing with "database is locked".
+  - Writes start with BEGIN IMMEDIATE: the write lock is taken up front, and
+    the time spent waiting for it is recorded as lock wait.
+
+AsyncPooledSqliteSaver exposes the async checkpointer API over the same pool
+by running each operation in a worker thread, so sync and async graphs can
+share one store and their thread ids stay interchangeable.
+
+Settings (environment):
+  CHECKPOINT_POOL_SIZE        max open connections (default 8)
+  CHECKPOINT_BUSY_TIMEOUT_MS  SQLite busy timeout (default 5000)
+  CHECKPOINT_SYNCHRONOUS      OFF | NORMAL | FULL (default NORMAL)
+
+Checkpoints are encoded with graph.checkpoint_serde.CompactSerializer unless
+CHECKPOINT_SERDE=default.
+
+EphemeralSaver is the in-memory store for runs that usually never pause
+(LOW-urgency threads, eval and batch runs): the run checkpoints in memory and
+only its latest checkpoint is copied to the durable store if it stops at an
+interrupt (see graph.workflow.finish_ephemeral_run).
+"""
+import asyncio
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Iterator, Optional
+
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+CHECKPOINT_POOL_SIZE = int(os.environ.get("CHECKPOINT_POOL_SIZE", "8"))
+CHECKPOINT_BUSY_TIMEOUT_MS = int(os.environ.get("CHECKPOINT_BUSY_TIMEOUT_MS", "5000"))
+CHECKPOINT_SYNCHRONOUS = os.environ.get("CHECKPOINT_SYNCHRONOUS", "NORMAL").upper()
+
+
+class _Metrics:
+    """Rolling write-latency and lock-wait samples (seconds)."""
+
+    def __init__(self, window: int = 5000):
+        self._lock = threading.Lock()
+        self.write_s: deque = deque(maxlen=window)
+        self.lock_wait_s: deque = deque(maxlen=window)
+
+    def record(self, lock_wait: float, write: float) -> None:
+        with self._lock:
+            self.lock_wait_s.append(lock_wait)
+            self.write_s.append(write)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            writes, waits = list(self.write_s), list(self.lock_wait_s)
+        return {"writes": len(writes), "write_s": _summary(writes), "lock_wait_s": _summary(waits)}
+
+    def reset(self) -> None:
+        with self._lock:
+            self.write_s.clear()
+            self.lock_wait_s.clear()
+
+
+def _summary(values: list[float]) -> dict[str, float]:
+    if not values:
+        return {"mean": 0.0, "p50": 0.0, "p95": 0.0, "max": 0.0}
+    ordered = sorted(values)
+    return {
+        "mean": sum(ordered) / len(ordered),
+        "p50": ordered[len(ordered) // 2],
+        "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "max": ordered[-1],
+    }
+
+
+class PooledSqliteSaver(SqliteSaver):
+    """SqliteSaver over a bounded pool of WAL-mode connections."""
+
+    def __init__(
+        self,
+        path: str,
+        *,
+        pool_size: int = CHECKPOINT_POOL_SIZE,
+        busy_timeout_ms: int = CHECKPOINT_BUSY_TIMEOUT_MS,
+        synchronous: str = CHECKPOINT_SYNCHRONOUS,
+        serde=None,
+    ):
+        if synchronous not in ("OFF", "NORMAL", "FULL"):
+            raise ValueError(f"Unsupported synchronous mode: {synchronous!r}")
+        self.path = path
+        self.pool_size = max(1, pool_size)
+        self.busy_timeout_ms = busy_timeout_ms
+        self.synchronous = synchronous
+        self.metrics = _Metrics()
+        self._pool: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._opened = 0
+        self._open_lock = threading.Lock()
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if serde is None:
+            from graph.checkpoint_serde import default_serde
+            serde = default_serde()
+        # SqliteSaver.__init__ stores `conn`; here it is a per-thread property
+        super().__init__(None, serde=serde)
+        with self._checkout():
+            self.setup()
+
+    # SqliteSaver reads self.conn directly (setup, list); resolve it to the
+    # connection the current thread has checked out.
+    @property
+    def conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            raise RuntimeError("PooledSqliteSaver.conn used outside a checked-out connection")
+        return conn
+
+    @conn.setter
+    def conn(self, value) -> None:
+        pass
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout_ms / 1000, check_same_thread=False)
+        # Takes effect only on a new database; lets retention release pages
+        # incrementally (graph/retention.py)
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        return conn
+
+    @contextmanager
+    def _checkout(self) -> Iterator[sqlite3.Connection]:
+        """Bind a pooled connection to this thread (re-entrant)."""
+        held = getattr(self._local, "conn", None)
+        if held is not None:
+            yield held
+            return
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            with self._open_lock:
+                can_open = self._opened < self.pool_size
+                if can_open:
+                    self._opened += 1
+            if can_open:
+                try:
+                    conn = self._open()
+                except Exception:
+                    with self._open_lock:
+                        self._opened -= 1
+                    raise
+            else:
+                conn = self._pool.get()
+        self._local.conn = conn
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            self._pool.put(conn)
+
+    @contextmanager
+    def cursor(self, transaction: bool = True) -> Iterator[sqlite3.Cursor]:
+        """Cursor on a pooled connection. transaction=True marks a write:
+        it takes the write lock up front and records lock wait + latency."""
+        requested = time.perf_counter()
+        with self._checkout() as conn:
+            if not transaction:
+                cur = conn.cursor()
+                try:
+                    yield cur
+                finally:
+                    cur.close()
+                return
+            if conn.in_transaction:
+                # Nested write on a connection that already holds the lock
+                yield conn.cursor()
+                return
+            conn.execute("BEGIN IMMEDIATE")
+            locked = time.perf_counter()
+            cur = conn.cursor()
+            try:
+                yield cur
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+            finally:
+                cur.close()
+            self.metrics.record(locked - requested, time.perf_counter() - requested)
+
+    def close(self) -> None:
+        """Close idle pooled connections (connections in use are left alone)."""
+        while True:
+            try:
+                conn = self._pool.get_nowait()
+            except queue.Empty:
+                return
+            conn.close()
+            with self._open_lock:
+                self._opened -= 1
+
+
+class AsyncPooledSqliteSaver(PooledSqliteSaver):
+    """Async checkpointer API over PooledSqliteSaver.
+
+    Each call runs the sync implementation in a worker thread with its own
+    pooled connection, so concurrent coroutines are not serialized behind a
+    single aiosqlite connection and lock.
+    """
+
+    async def aget_tuple(self, config):
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config,
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before=None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator:
+        items = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for item in items:
+            yield item
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, task_path: str = ""):
+        return await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        return await asyncio.to_thread(self.delete_thread, thread_id)
+
+    async def aget_delta_channel_history(self, *, config, channels):
+        return await asyncio.to_thread(
+            lambda: self.get_delta_channel_history(config=config, channels=channels)
+        )
+
+
+class EphemeralSaver(InMemorySaver):
+    """In-memory checkpointer whose threads are either promoted to a durable
+    store (the run paused) or discarded (the run finished)."""
+
+    def __init__(self, *, serde=None):
+        super().__init__(serde=serde)
+        self._counts_lock = threading.Lock()
+        self.counts = {"checkpoints": 0, "promoted": 0, "discarded": 0}
+
+    def _count(self, key: str) -> None:
+        with self._counts_lock:
+            self.counts[key] += 1
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        self._count("checkpoints")
+        return super().put(config, checkpoint, metadata, new_versions)
+
+    def _promotion(self, thread_id: str):
+        """(config, checkpoint, metadata, writes by task) for the durable copy."""
+        config = {"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}
+        tup = self.get_tuple(config)
+        if tup is None:
+            return None
+        by_task: dict[str, list] = defaultdict(list)
+        for task_id, channel, value in tup.pending_writes or []:
+            by_task[task_id].append((channel, value))
+        # No parent: the durable thread starts at the paused checkpoint
+        return config, tup.checkpoint, tup.metadata, by_task
+
+    def promote(self, thread_id: str, target) -> bool:
+        """Copy the thread's latest checkpoint and its pending writes
+        (interrupt payloads) to target, then drop the in-memory thread."""
+        promotion = self._promotion(thread_id)
+        if promotion is None:
+            return False
+        config, checkpoint, metadata, by_task = promotion
+        saved = target.put(config, checkpoint, metadata, checkpoint["channel_versions"])
+        for task_id, writes in by_task.items():
+            target.put_writes(saved, writes, task_id)
+        self.delete_thread(thread_id)
+        self._count("promoted")
+        return True
+
+    async def apromote(self, thread_id: str, target) -> bool:
+        """Async counterpart of promote (target's async API)."""
+        promotion = self._promotion(thread_id)
+        if promotion is None:
+            return False
+        config, checkpoint, metadata, by_task = promotion
+        saved = await target.aput(config, checkpoint, metadata, checkpoint["channel_versions"])
+        for task_id, writes in by_task.items():
+            await target.aput_writes(saved, writes, task_id)
+        self.delete_thread(thread_id)
+        self._count("promoted")
+        return True
+
+    def discard(self, thread_id: str) -> None:
+        if thread_id in self.storage:
+            self.delete_thread(thread_id)
+            self._count("discarded")
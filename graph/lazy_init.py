@@ -0,0 +1,128 @@
+"""
+Thread-safe once-only initialization for process-wide singletons.
+
+The compiled graph, MCP tools, Chroma client/collection and Supabase
+clients used to be module globals filled check-then-set, so a burst of
+concurrent first requests compiled the graph (and started MCP servers)
+several times. LazyInit wraps the factory:
+
+  - get() runs the factory once under a lock; concurrent first callers
+    wait for that one run and share its result;
+  - a failure is cached: until its backoff expires, get() raises
+    LazyInitError (from the original error) without calling the factory
+    again; the backoff doubles per consecutive failure, up to a cap;
+  - state is explicit: pending, initializing, ready, failed, or retrying
+    (a new attempt after a failure);
+  - reset() drops the value so the next get() builds it again;
+  - aget() awaits the (blocking) factory in a worker thread, off the loop.
+
+The factory must not call get() on its own LazyInit (that deadlocks).
+
+Settings (environment):
+  LAZY_INIT_RETRY_S       backoff after the first failure (default 5)
+  LAZY_INIT_MAX_RETRY_S   backoff cap (default 300)
+"""
+import asyncio
+import os
+import threading
+import time
+from typing import Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+LAZY_INIT_RETRY_S = float(os.environ.get("LAZY_INIT_RETRY_S", "5"))
+LAZY_INIT_MAX_RETRY_S = float(os.environ.get("LAZY_INIT_MAX_RETRY_S", "300"))
+
+PENDING = "pending"
+INITIALIZING = "initializing"
+READY = "ready"
+FAILED = "failed"
+RETRYING = "retrying"
+
+
+class LazyInitError(RuntimeError):
+    """Raised by LazyInit.get() while a cached failure is in its backoff window."""
+
+
+class LazyInit(Generic[T]):
+    """Process-wide value built once by factory, with cached failures."""
+
+    def __init__(
+        self,
+        factory: Callable[[], T],
+        *,
+        name: str,
+        retry_s: Optional[float] = None,
+        max_retry_s: Optional[float] = None,
+    ):
+        self.factory = factory
+        self.name = name
+        self.retry_s = LAZY_INIT_RETRY_S if retry_s is None else retry_s
+        self.max_retry_s = LAZY_INIT_MAX_RETRY_S if max_retry_s is None else max_retry_s
+        self.state = PENDING
+        self.error: Optional[BaseException] = None
+        self.failures = 0
+        self.attempts = 0
+        self._value: Optional[T] = None
+        self._retry_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self.state == READY
+
+    def get(self) -> T:
+        """The value, building it on first use (raises on a failed build)."""
+        if self.state == READY:
+            return self._value
+        with self._lock:
+            if self.state == READY:
+                return self._value
+            if self.state == FAILED and time.monotonic() < self._retry_at:
+                raise LazyInitError(
+                    f"{self.name} unavailable (retry in {self._retry_at - time.monotonic():.0f}s): "
+                    f"{type(self.error).__name__}: {self.error}"
+                ) from self.error
+            self.state = RETRYING if self.failures else INITIALIZING
+            self.attempts += 1
+            try:
+                value = self.factory()
+            except Exception as e:
+                self.failures += 1
+                self.error = e
+                self._retry_at = time.monotonic() + min(self.max_retry_s, self.retry_s * 2 ** (self.failures - 1))
+                self.state = FAILED
+                raise
+            self._value = value
+            self.error = None
+            self.failures = 0
+            self.state = READY
+            return value
+
+    async def aget(self) -> T:
+        """get() for async callers; a build runs in a worker thread."""
+        if self.state == READY:
+            return self._value
+        return await asyncio.to_thread(self.get)
+
+    def peek(self) -> Optional[T]:
+        """The value if ready, else None (never builds)."""
+        return self._value if self.state == READY else None
+
+    def reset(self) -> None:
+        """Forget the value or cached failure (waits for a build in progress)."""
+        with self._lock:
+            self._value = None
+            self.error = None
+            self.failures = 0
+            self.state = PENDING
+
+    def status(self) -> dict:
+        return {
+            "name": self.name,
+            "state": self.state,
+            "attempts": self.attempts,
+            "failures": self.failures,
+            "error": f"{type(self.error).__name__}: {self.error}" if self.error else None,
+            "retry_in_s": max(0.0, self._retry_at - time.monotonic()) if self.state == FAILED else 0.0,
+        }
@@ -0,0 +1,158 @@
+"""
+In-process fast path for a local Chroma MCP server.
+
+mcp_config.json runs chroma-mcp-server over stdio against ./data/vector_store,
+the same persistent store agents.policy_agent already opens in-process. Going
+through MCP therefore loads the index and the embedding model a second time
+in another process, and every query pays JSON-RPC over stdio.
+
+When a configured server is local — stdio transport, --client-type
+persistent, a --data-dir that resolves to policy_agent.VECTOR_STORE_PATH and
+the default embedding function — local_query_documents_tool() serves
+chroma_query_documents from the in-process client instead:
+
+  - same tool name and argument schema (collection_name, query_texts,
+    n_results), so the agent prompt and tool routing are unchanged;
+  - same JSON result: ids, documents, metadatas (with source_collection),
+    distances, merged with the derived_learnings_v1 collection when it
+    exists, as the server does.
+
+The server's other tools (collection and document management) are not
+exposed for local servers; the triage agent only queries. Remote servers
+(other transports or stores) keep going through graph.mcp_pool.
+
+Settings (environment):
+  MCP_LOCAL_FASTPATH   1 = serve local Chroma servers in-process (default), 0 = always MCP
+"""
+import json
+import os
+from typing import Any, Optional
+
+from langchain_core.tools import StructuredTool
+from pydantic import BaseModel, ConfigDict, Field
+
+MCP_LOCAL_FASTPATH = os.environ.get("MCP_LOCAL_FASTPATH", "1") != "0"
+
+# Collection chroma-mcp-server merges into every chroma_query_documents result
+LEARNINGS_COLLECTION = "derived_learnings_v1"
+
+# Server embedding functions that are chromadb's default (ONNX MiniLM-L6-v2)
+_DEFAULT_EMBEDDINGS = ("default", "fast")
+
+_QUERY_DESCRIPTION = (
+    "Query documents using semantic search. Queries the specified 'collection_name' AND the "
+    f"'{LEARNINGS_COLLECTION}' collection. Results are merged, and each item's metadata includes a "
+    "'source_collection' field. Returns IDs, documents, metadatas, and distances. "
+    "Requires: `collection_name`, `query_texts`. Optional: `n_results`."
+)
+
+
+class QueryDocumentsInput(BaseModel):
+    """Input model for basic querying (no filters). Uses default includes."""
+
+    collection_name: str = Field(..., description="Name of the collection to query.")
+    query_texts: list[str] = Field(..., description="List of query strings for semantic search.")
+    n_results: int = Field(10, ge=1, description="Maximum number of results per query.")
+
+    model_config = ConfigDict(extra="forbid")
+
+
+def _arg(args: list, flag: str) -> Optional[str]:
+    for i, value in enumerate(args):
+        if value == flag and i + 1 < len(args):
+            return args[i + 1]
+        if value.startswith(flag + "="):
+            return value.split("=", 1)[1]
+    return None
+
+
+def local_vector_store(connection: dict) -> Optional[str]:
+    """The in-process store path if connection is a chroma-mcp-server over
+    stdio on the same persistent store with default embeddings, else None."""
+    from agents.policy_agent import VECTOR_STORE_PATH
+
+    if connection.get("transport") != "stdio":
+        return None
+    if os.path.basename(connection.get("command", "")) != "chroma-mcp-server":
+        return None
+    args = list(connection.get("args") or [])
+    env = connection.get("env") or {}
+    if _arg(args, "--client-type") != "persistent":
+        return None
+    embeddings = _arg(args, "--embedding-function") or env.get("CHROMA_EMBEDDING_FUNCTION", "default")
+    if embeddings not in _DEFAULT_EMBEDDINGS:
+        return None
+    data_dir = _arg(args, "--data-dir")
+    if not data_dir:
+        return None
+    # Relative paths resolve against the server's working directory (ours
+    # unless the connection sets cwd)
+    data_dir = os.path.join(connection.get("cwd") or os.getcwd(), data_dir)
+    if os.path.realpath(data_dir) != os.path.realpath(VECTOR_STORE_PATH):
+        return None
+    return VECTOR_STORE_PATH
+
+
+def query_documents(
+    client,
+    collection_name: str,
+    query_texts: list[str],
+    n_results: int = 10,
+    embedding_function=None,
+) -> dict[str, Any]:
+    """chroma_query_documents on an in-process client (the server's result shape)."""
+    merged: dict[str, list] = {key: [[] for _ in query_texts] for key in ("ids", "documents", "metadatas", "distances")}
+    for name in (collection_name, LEARNINGS_COLLECTION):
+        try:
+            kwargs = {"embedding_function": embedding_function} if embedding_function is not None else {}
+            collection = client.get_collection(name, **kwargs)
+        except Exception:
+            continue  # the server skips missing collections too
+        results = collection.query(
+            query_texts=query_texts,
+            n_results=n_results,
+            include=["documents", "metadatas", "distances"],
+        )
+        for i in range(len(query_texts)):
+            metas = results["metadatas"][i] or []
+            for j, doc_id in enumerate(results["ids"][i]):
+                meta = dict(metas[j] or {}) if j < len(metas) else {}
+                meta["source_collection"] = name
+                merged["ids"][i].append(doc_id)
+                merged["documents"][i].append(results["documents"][i][j])
+                merged["metadatas"][i].append(meta)
+                merged["distances"][i].append(float(results["distances"][i][j]))
+    return {
+        "ids": merged["ids"],
+        "embeddings": None,
+        "documents": merged["documents"],
+        "metadatas": merged["metadatas"],
+        "distances": merged["distances"],
+    }
+
+
+def local_query_documents_tool(client=None, embedding_function=None) -> StructuredTool:
+    """chroma_query_documents served from the in-process Chroma client
+    (default: agents.policy_agent's client on VECTOR_STORE_PATH, embedding
+    with agents.embeddings' backend)."""
+    def _client():
+        if client is not None:
+            return client
+        from agents.policy_agent import _get_client
+        return _get_client()
+
+    def _embedding_function():
+        if embedding_function is not None:
+            return embedding_function
+        from agents.embeddings import get_embedding_function
+        return get_embedding_function()
+
+    def _run(collection_name: str, query_texts: list[str], n_results: int = 10) -> str:
+        return json.dumps(query_documents(_client(), collection_name, query_texts, n_results, _embedding_function()))
+
+    return StructuredTool.from_function(
+        func=_run,
+        name="chroma_query_documents",
+        description=_QUERY_DESCRIPTION,
+        args_schema=QueryDocumentsInput,
+    )
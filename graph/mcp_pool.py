@@ -0,0 +1,372 @@
+"""
+Persistent MCP session pool for the triage graph's discovered tools.
+
+MultiServerMCPClient.get_tools() returns tools that open a new session for
+every call. With the stdio transport in mcp_config.json that means spawning
+a fresh chroma-mcp-server per chroma_query_documents, which reloads the
+persistent store and the embedding model each time. MCPSessionPool keeps a
+few warm server processes per configured server instead:
+
+  - Sessions live on a dedicated event-loop thread, so tools work from the
+    sync graph (Streamlit, job workers) and from any async graph's loop.
+  - Each session serves at most MCP_SESSION_CONCURRENCY calls at a time;
+    calls go to the least-loaded healthy session.
+  - A health task pings every session each MCP_HEALTH_INTERVAL_S. A session
+    whose ping or call fails at the transport level (crashed or hung
+    process) is restarted, and the failed call is retried once on another
+    session. Tool errors reported by the server are returned as-is.
+  - close() (also registered with atexit) ends every session, which
+    terminates the server processes.
+  - start(wait=False) returns at once and starts the processes in the
+    background; calls wait for them. Together with graph.mcp_tool_cache
+    this lets the graph compile from cached tool schemas without waiting
+    on the servers.
+
+Settings (environment):
+  MCP_POOL_SIZE            warm processes per server (default 2, 0 = per-call sessions)
+  MCP_SESSION_CONCURRENCY  in-flight calls per session (default 4)
+  MCP_CALL_TIMEOUT_S       per-call timeout (default 30)
+  MCP_HEALTH_INTERVAL_S    health-check interval (default 30, 0 = off)
+"""
+import asyncio
+import atexit
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Optional
+
+from langchain_core.tools import BaseTool
+from langchain_mcp_adapters.sessions import create_session
+from langchain_mcp_adapters.tools import convert_mcp_tool_to_langchain_tool
+from mcp.shared.exceptions import McpError
+from mcp.types import CONNECTION_CLOSED
+
+MCP_POOL_SIZE = int(os.environ.get("MCP_POOL_SIZE", "2"))
+MCP_SESSION_CONCURRENCY = int(os.environ.get("MCP_SESSION_CONCURRENCY", "4"))
+MCP_CALL_TIMEOUT_S = float(os.environ.get("MCP_CALL_TIMEOUT_S", "30"))
+MCP_HEALTH_INTERVAL_S = float(os.environ.get("MCP_HEALTH_INTERVAL_S", "30"))
+
+_PING_TIMEOUT_S = 5.0
+
+
+class _ServerSession:
+    """One warm server process and its initialized ClientSession.
+
+    The session is entered and exited inside a single task (_run), as the
+    anyio-based MCP transports require.
+    """
+
+    def __init__(self, server: str, index: int, connection: dict, concurrency: int):
+        self.server = server
+        self.index = index
+        self.connection = connection
+        self.limit = asyncio.Semaphore(max(1, concurrency))
+        self.restart_lock = asyncio.Lock()
+        self.session = None
+        self.server_info = None
+        self.inflight = 0
+        self.starts = 0
+        self._stop: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def healthy(self) -> bool:
+        return self.session is not None and self._task is not None and not self._task.done()
+
+    async def start(self, timeout: float) -> None:
+        ready = asyncio.get_running_loop().create_future()
+        self._stop = asyncio.Event()
+        self._task = asyncio.create_task(self._run(ready), name=f"mcp-{self.server}-{self.index}")
+        self.starts += 1
+        await asyncio.wait_for(asyncio.shield(ready), timeout)
+
+    async def _run(self, ready: asyncio.Future) -> None:
+        try:
+            async with create_session(self.connection) as session:
+                init = await session.initialize()
+                self.server_info = init.serverInfo
+                self.session = session
+                ready.set_result(None)
+                await self._stop.wait()
+        except BaseException as e:
+            if not ready.done():
+                ready.set_exception(e)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+        finally:
+            self.session = None
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        self.session = None
+        if self._task is None or self._task.done():
+            return
+        self._stop.set()
+        try:
+            await asyncio.wait_for(asyncio.shield(self._task), timeout)
+        except Exception:
+            self._task.cancel()
+            try:
+                await self._task
+            except BaseException:
+                pass
+
+
+class MCPSessionPool:
+    """Warm MCP sessions per server, served from a background event loop."""
+
+    def __init__(
+        self,
+        connections: dict[str, dict],
+        *,
+        size: int = MCP_POOL_SIZE,
+        concurrency: int = MCP_SESSION_CONCURRENCY,
+        call_timeout_s: float = MCP_CALL_TIMEOUT_S,
+        health_interval_s: float = MCP_HEALTH_INTERVAL_S,
+        start_timeout_s: float = 60.0,
+    ):
+        self.connections = connections
+        self.size = max(1, size)
+        self.concurrency = concurrency
+        self.call_timeout_s = call_timeout_s
+        self.health_interval_s = health_interval_s
+        self.start_timeout_s = start_timeout_s
+        self.counts = {"calls": 0, "errors": 0, "retries": 0, "restarts": 0}
+        self.call_s: deque = deque(maxlen=5000)
+        self._sessions: dict[str, list[_ServerSession]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._health: Optional[asyncio.Task] = None
+        self._start_future = None
+        self._background: set = set()
+        self._closed = False
+
+    # -- lifecycle ---------------------------------------------------------
+
+    def start(self, wait: bool = True) -> "MCPSessionPool":
+        """Start the loop thread and every server process. wait=True blocks
+        until all are ready; wait=False returns at once (see wait_ready)."""
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="mcp-session-pool", daemon=True)
+        self._thread.start()
+        self._start_future = self._submit(self._start_all())
+        if wait:
+            try:
+                self._start_future.result()
+            except BaseException:
+                self.close()
+                raise
+        atexit.register(self.close)
+        return self
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def wait_ready(self, timeout: Optional[float] = None) -> None:
+        """Block until every process has started (raises on failure or timeout)."""
+        self._start_future.result(timeout)
+
+    async def _start_all(self) -> None:
+        for server, connection in self.connections.items():
+            self._sessions[server] = [
+                _ServerSession(server, i, connection, self.concurrency) for i in range(self.size)
+            ]
+        if self.health_interval_s > 0:
+            self._health = asyncio.create_task(self._health_loop())
+        await asyncio.gather(*(
+            s.start(self.start_timeout_s) for sessions in self._sessions.values() for s in sessions
+        ))
+
+    async def _ensure_started(self) -> None:
+        try:
+            await asyncio.wrap_future(self._start_future)
+        except Exception:
+            pass  # sessions that failed to start are restarted on demand (_pick)
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Stop every session (terminating its process) and the loop thread."""
+        if self._closed or self._loop is None:
+            return
+        self._closed = True
+        try:
+            self._submit(self._stop_all()).result(timeout)
+        except Exception:
+            pass
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout)
+        atexit.unregister(self.close)
+
+    async def _stop_all(self) -> None:
+        if self._health is not None:
+            self._health.cancel()
+        await asyncio.gather(
+            *(s.stop() for sessions in self._sessions.values() for s in sessions),
+            return_exceptions=True,
+        )
+
+    def _submit(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    # -- health ------------------------------------------------------------
+
+    async def _restart(self, session: _ServerSession) -> None:
+        """Replace a failed session's process (concurrent callers share one restart)."""
+        async with session.restart_lock:
+            if session.healthy:
+                return
+            await session.stop()
+            self.counts["restarts"] += 1
+            await session.start(self.start_timeout_s)
+
+    async def _check(self, session: _ServerSession) -> None:
+        try:
+            if not session.healthy:
+                raise RuntimeError("session not running")
+            await asyncio.wait_for(session.session.send_ping(), _PING_TIMEOUT_S)
+        except Exception:
+            session.session = None
+            try:
+                await self._restart(session)
+            except Exception:
+                pass  # retried on the next pass or the next call
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.health_interval_s)
+            await asyncio.gather(*(
+                self._check(s) for sessions in self._sessions.values() for s in sessions
+            ))
+
+    # -- calls -------------------------------------------------------------
+
+    async def _pick(self, server: str, exclude: Optional[_ServerSession] = None) -> _ServerSession:
+        if server not in self._sessions:
+            raise ValueError(f"Unknown MCP server {server!r}")
+        candidates = [s for s in self._sessions[server] if s.healthy and s is not exclude]
+        if candidates:
+            return min(candidates, key=lambda s: s.inflight)
+        session = next((s for s in self._sessions[server] if s is not exclude), self._sessions[server][0])
+        await self._restart(session)
+        return session
+
+    async def _call(self, server: str, name: str, args: dict):
+        await self._ensure_started()
+        start = time.perf_counter()
+        self.counts["calls"] += 1
+        failed = None
+        for attempt in range(2):
+            session = await self._pick(server, exclude=failed)
+            async with session.limit:
+                session.inflight += 1
+                try:
+                    if session.session is None:
+                        raise RuntimeError("session restarted while waiting")
+                    result = await asyncio.wait_for(
+                        session.session.call_tool(name, args), self.call_timeout_s)
+                except Exception as e:
+                    if isinstance(e, McpError) and e.error.code != CONNECTION_CLOSED:
+                        self.counts["errors"] += 1
+                        raise  # the server answered: the process is fine
+                    # Crashed or hung process: restart it, retry once elsewhere
+                    session.session = None
+                    task = asyncio.create_task(self._check(session))
+                    self._background.add(task)
+                    task.add_done_callback(self._background.discard)
+                    if attempt:
+                        self.counts["errors"] += 1
+                        raise
+                    self.counts["retries"] += 1
+                    failed = session
+                    continue
+                finally:
+                    session.inflight -= 1
+            self.call_s.append(time.perf_counter() - start)
+            return result
+
+    def call_tool(self, server: str, name: str, args: dict):
+        """Call a tool from any thread (blocks until the result arrives)."""
+        return self._submit(self._call(server, name, args)).result()
+
+    async def acall_tool(self, server: str, name: str, args: dict):
+        """Call a tool from any event loop."""
+        return await asyncio.wrap_future(self._submit(self._call(server, name, args)))
+
+    # -- LangChain tools ---------------------------------------------------
+
+    async def _list_tools(self) -> list[tuple[str, Any]]:
+        await self._ensure_started()
+        listed = []
+        for server in self._sessions:
+            session = await self._pick(server)
+            result = await session.session.list_tools()
+            listed.extend((server, tool) for tool in result.tools)
+        return listed
+
+    def list_tools(self, timeout: Optional[float] = None) -> list[tuple[str, Any]]:
+        """(server name, mcp Tool) for every server, waiting for startup."""
+        return self._submit(self._list_tools()).result(timeout)
+
+    def server_info(self) -> dict[str, dict]:
+        """Name and version each server reported at initialize (started servers only)."""
+        info = {}
+        for server, sessions in self._sessions.items():
+            started = next((s.server_info for s in sessions if s.server_info is not None), None)
+            if started is not None:
+                info[server] = {"name": started.name, "version": started.version}
+        return info
+
+    def get_tools(self) -> list[BaseTool]:
+        """LangChain tools for every server, with both sync and async entry points."""
+        return self.tools_for(self.list_tools())
+
+    def tools_for(self, listed: list[tuple[str, Any]]) -> list[BaseTool]:
+        """LangChain tools served by this pool for already-known (server, mcp Tool) schemas."""
+        tools = []
+        for server, mcp_tool in listed:
+            tool = convert_mcp_tool_to_langchain_tool(
+                None,
+                mcp_tool,
+                connection=self.connections[server],  # unused: the interceptor serves the call
+                server_name=server,
+                tool_interceptors=[self._interceptor],
+            )
+            tools.append(tool.model_copy(update={"func": _sync_entry(tool.coroutine)}))
+        return tools
+
+    async def _interceptor(self, request, handler):
+        return await self.acall_tool(request.server_name, request.name, request.args)
+
+    def stats(self) -> dict[str, Any]:
+        ordered = sorted(self.call_s)
+        return {
+            **self.counts,
+            "call_p50_s": ordered[len(ordered) // 2] if ordered else 0.0,
+            "call_p95_s": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] if ordered else 0.0,
+            "sessions": {
+                server: [{"healthy": s.healthy, "inflight": s.inflight, "starts": s.starts} for s in sessions]
+                for server, sessions in self._sessions.items()
+            },
+        }
+
+
+def _sync_entry(coroutine):
+    """Sync tool function for ToolNode in the sync graph. The coroutine only
+    hands the call to the pool's loop, so a short-lived loop is enough."""
+    def run(**kwargs):
+        return asyncio.run(coroutine(**kwargs))
+    return run
+
+
+_pool: Optional[MCPSessionPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_mcp_pool(connections: dict[str, dict], wait: bool = True) -> MCPSessionPool:
+    """Process-wide pool for the given connections (started on first use;
+    wait=False starts the processes in the background)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool.closed:
+            _pool = MCPSessionPool(connections).start(wait=wait)
+        return _pool
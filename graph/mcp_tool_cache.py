@@ -0,0 +1,117 @@
+"""
+On-disk cache of discovered MCP tool schemas, for fast cold start.
+
+Compiling the graph needs the MCP tools' names and argument schemas. Without
+a cache, the first request after a restart starts every server process and
+runs initialize + tools/list before triage can begin, and a broken server
+holds it up until the error surfaces.
+
+The cache keeps each server's tool schemas (mcp.types.Tool as JSON) with a
+fingerprint of its connection config and the name/version the server
+reported at initialize:
+
+  - load_cached_tools(): schemas for every configured server whose
+    connection fingerprint matches, else None (config changed or no cache);
+  - refresh_tool_cache(): re-discovers on the live pool and rewrites the
+    entries whose server version or schemas differ.
+
+graph.workflow compiles from the cache while the pool starts in the
+background, then refreshes it; on a miss it waits at most
+MCP_DISCOVERY_TIMEOUT_S for live discovery before falling back to the local
+tools.
+
+Settings (environment):
+  MCP_TOOL_CACHE            cache file (default ./data/mcp_tool_cache.json, "" = disabled)
+  MCP_DISCOVERY_TIMEOUT_S   wait for live discovery without a cache (default 10)
+"""
+import hashlib
+import json
+import logging
+import os
+from typing import Any, Optional
+
+from mcp.types import Tool
+
+logger = logging.getLogger(__name__)
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MCP_TOOL_CACHE = os.environ.get("MCP_TOOL_CACHE", os.path.join(_PROJECT_ROOT, "data", "mcp_tool_cache.json"))
+MCP_DISCOVERY_TIMEOUT_S = float(os.environ.get("MCP_DISCOVERY_TIMEOUT_S", "10"))
+
+_CACHE_VERSION = 1
+
+
+def connection_fingerprint(connection: dict) -> str:
+    """Stable hash of a server's connection config."""
+    return hashlib.sha256(json.dumps(connection, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def _read(path: str) -> dict:
+    try:
+        with open(path) as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != _CACHE_VERSION:
+        return {}
+    return data.get("servers") or {}
+
+
+def load_cached_tools(connections: dict[str, dict], path: Optional[str] = None) -> Optional[list[tuple[str, Tool]]]:
+    """(server name, mcp Tool) for every server, or None if any server has no
+    entry for its current connection config."""
+    path = MCP_TOOL_CACHE if path is None else path
+    if not path or not connections:
+        return None
+    servers = _read(path)
+    listed = []
+    for server, connection in connections.items():
+        entry = servers.get(server)
+        if not entry or entry.get("fingerprint") != connection_fingerprint(connection):
+            return None
+        try:
+            listed.extend((server, Tool.model_validate(tool)) for tool in entry["tools"])
+        except Exception:
+            return None
+    return listed
+
+
+def save_tool_cache(
+    connections: dict[str, dict],
+    listed: list[tuple[str, Any]],
+    server_info: dict[str, dict],
+    path: Optional[str] = None,
+) -> list[str]:
+    """Write the schemas for the given servers; returns the servers whose
+    cached version or schemas changed."""
+    path = MCP_TOOL_CACHE if path is None else path
+    if not path:
+        return []
+    servers = _read(path)
+    changed = []
+    for server, connection in connections.items():
+        entry = {
+            "fingerprint": connection_fingerprint(connection),
+            "server": server_info.get(server),
+            "tools": [tool.model_dump(mode="json", exclude_none=True) for name, tool in listed if name == server],
+        }
+        if servers.get(server) != entry:
+            servers[server] = entry
+            changed.append(server)
+    if changed:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"version": _CACHE_VERSION, "servers": servers}, f, indent=2)
+        os.replace(tmp, path)
+    return changed
+
+
+def refresh_tool_cache(pool, connections: dict[str, dict], path: Optional[str] = None) -> list[str]:
+    """Re-discover tools on a (possibly still starting) pool and update the
+    cache; returns the servers whose schemas or version changed."""
+    changed = save_tool_cache(connections, pool.list_tools(), pool.server_info(), path)
+    if changed:
+        logger.info("MCP tool cache refreshed for %s", ", ".join(changed))
+    return changed
@@ -6,12 +6,18 @@ Nodes:
   triage_agent_node  – Gemini with bound MCP tools; reasons and calls tools.
   synthesis_node     – Extracts final TriageResult from the conversation context.
 
+Async variants (asafety_node, atriage_agent_node, asynthesis_node, ...) share
+prompt construction with their sync counterparts and await the LLM instead of
+blocking a thread; they back the async workflow entry points.
+
 Tool wrappers:
   LangChain @tool wrappers around the MCP functions so ToolNode can route calls.
 """
+import asyncio
 import json
 import os
-from typing import Any
+import time
+from typing import Any, Optional
 
 from dotenv import load_dotenv
 from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
@@ -40,13 +46,26 @@ def get_patient_history(patient_id: str) -> str:
 
 
 @tool
-def search_hospital_policy(query: str) -> str:
+def search_hospital_policy(query: str = "", queries: Optional[list[str]] = None, department: str = "") -> str:
     """Search hospital/clinic policies using RAG (ChromaDB).
-    Input a query describing what policy to look up.
-    Returns relevant policy snippets."""
-    from mcp_tools.tools.rag_tools import search_hospital_policy as _search
-    chunks = _search(query, top_k=3)
-    return "\n---\n".join(chunks) if chunks else "No relevant policies found."
+    Input a query describing what policy to look up, or `queries` with one
+    query per topic (e.g. refill, billing, appointment) to look them all up
+    in one call. Optionally set `department` to the queue the case is going
+    to (e.g. Pharmacy, Billing, Nursing) to search only that department's
+    policies.
+    Returns relevant policy snippets, grouped by query when several are given."""
+    from mcp_tools.tools.rag_tools import search_hospital_policies
+    queries = [q for q in (queries or []) + [query] if q and q.strip()]
+    if not queries:
+        return "No relevant policies found."
+    results = search_hospital_policies(queries, top_k=3, department=department or None)
+    if len(queries) == 1:
+        return "\n---\n".join(results[0]) if results[0] else "No relevant policies found."
+    sections = [
+        f"[{q}]\n" + ("\n---\n".join(chunks) if chunks else "No additional policies found.")
+        for q, chunks in zip(queries, results)
+    ]
+    return "\n\n".join(sections)
 
 
 @tool
@@ -75,7 +94,7 @@ Your job is to have a thorough conversation with the patient to fully understand
 
 You have access to tools that let you:
 1. Look up the patient's medical history by their patient_id.
-2. Search clinic policies (refill rules, appointment booking, billing, emergency protocols, etc.) using the available policy search tool.
+2. Search clinic policies (refill rules, appointment booking, billing, emergency protocols, etc.) using the available policy search tool. One call can take several queries (one per intent).
 3. Check available appointment time slots.
 
 ## Workflow
@@ -113,13 +132,54 @@ Do NOT include the JSON in tool-calling responses — only in your final answer
 # Node: Safety (Gatekeeper)
 # ---------------------------------------------------------------------------
 
+def _visual_screen_message(file_uri: str, msg: str) -> HumanMessage:
+    prompt = (
+        "You are a medical safety screener. Examine this image for emergency "
+        "red flags: active bleeding, respiratory distress, cyanosis (blue lips/skin), "
+        "visible trauma/fractures, severe burns, or signs of anaphylaxis.\n\n"
+        f"Patient message: {msg}\n\n"
+        "If you see ANY emergency red flag, respond with EXACTLY: "
+        "EMERGENCY: <brief reason>\n"
+        "If the image does NOT show an emergency, respond with EXACTLY: SAFE"
+    )
+    content = [
+        {"type": "text", "text": prompt},
+        {"type": "image_url", "image_url": {"url": file_uri}},
+    ]
+    return HumanMessage(content=content)
+
+
+def _attachment_data_uri(file_uri: str, file_mime: str) -> str | None:
+    """Data URI for an attachment, read from the blob store only when a vision
+    call needs it (None if the blob is missing)."""
+    from graph.blob_store import resolve_file_uri
+
+    try:
+        return resolve_file_uri(file_uri, file_mime)
+    except (OSError, ValueError):
+        return None
+
+
+def _parse_visual_verdict(response) -> dict | None:
+    text = (response.content or "").strip()
+    if text.upper().startswith("EMERGENCY"):
+        reason = text.split(":", 1)[1].strip() if ":" in text else "Visual emergency detected"
+        return {
+            "is_potential_emergency": True,
+            "reason": reason,
+            "triggered_by": "visual_screen",
+        }
+    return None
+
+
 def _visual_safety_screen(file_uri: str, file_mime: str, msg: str) -> dict | None:
     """Use Gemini vision to check an attached image for emergency red flags.
 
     Returns a SafetyResult-like dict if emergency detected, else None.
     """
     api_key = os.environ.get("LLM_GEMINI_API_KEY") or os.environ.get("GOOGLE_API_KEY")
-    if not api_key:
+    image_uri = _attachment_data_uri(file_uri, file_mime)
+    if not api_key or not image_uri:
         return None
 
     try:
@@ -127,35 +187,47 @@ def _visual_safety_screen(file_uri: str, file_mime: str, msg: str) -> dict | Non
             model=_LLM_MODEL,
             google_api_key=api_key,
         )
-        prompt = (
-            "You are a medical safety screener. Examine this image for emergency "
-            "red flags: active bleeding, respiratory distress, cyanosis (blue lips/skin), "
-            "visible trauma/fractures, severe burns, or signs of anaphylaxis.\n\n"
-            f"Patient message: {msg}\n\n"
-            "If you see ANY emergency red flag, respond with EXACTLY: "
-            "EMERGENCY: <brief reason>\n"
-            "If the image does NOT show an emergency, respond with EXACTLY: SAFE"
+        response = llm.invoke([_visual_screen_message(image_uri, msg)])
+        return _parse_visual_verdict(response)
+    except Exception:
+        pass
+
+    return None
+
+
+async def _avisual_safety_screen(file_uri: str, file_mime: str, msg: str) -> dict | None:
+    """Async variant of _visual_safety_screen."""
+    api_key = os.environ.get("LLM_GEMINI_API_KEY") or os.environ.get("GOOGLE_API_KEY")
+    image_uri = await asyncio.to_thread(_attachment_data_uri, file_uri, file_mime) if api_key else None
+    if not api_key or not image_uri:
+        return None
+
+    try:
+        llm = ChatGoogleGenerativeAI(
+            model=_LLM_MODEL,
+            google_api_key=api_key,
         )
-        content = [
-            {"type": "text", "text": prompt},
-            {"type": "image_url", "image_url": {"url": file_uri}},
-        ]
-        response = llm.invoke([HumanMessage(content=content)])
-        text = (response.content or "").strip()
-
-        if text.upper().startswith("EMERGENCY"):
-            reason = text.split(":", 1)[1].strip() if ":" in text else "Visual emergency detected"
-            return {
-                "is_potential_emergency": True,
-                "reason": reason,
-                "triggered_by": "visual_screen",
-            }
+        response = await llm.ainvoke([_visual_screen_message(image_uri, msg)])
+        return _parse_visual_verdict(response)
     except Exception:
         pass
 
     return None
 
 
+def _prescreened(state: TriageWorkflowState):
+    """Text screen result seeded by the job queue's screen stage, if any."""
+    from schemas.schemas import SafetyResult
+
+    prior = state.get("safety_result")
+    if not prior:
+        return None
+    try:
+        return SafetyResult(**prior)
+    except Exception:
+        return None
+
+
 def safety_node(state: TriageWorkflowState) -> dict[str, Any]:
     """
     Run the two-layer safety screen (rules + LLM).
@@ -165,7 +237,9 @@ def safety_node(state: TriageWorkflowState) -> dict[str, Any]:
     from agents.safety_agent import screen_for_emergency
 
     msg = (state.get("message") or "").strip()
-    result = screen_for_emergency(msg)
+    # The priority job queue screens text before scheduling agent work;
+    # reuse that verdict instead of paying for a second LLM call.
+    result = _prescreened(state) or screen_for_emergency(msg)
 
     # Sprint 5: if text screen didn't flag emergency and an image is attached,
     # run visual safety screen
@@ -189,6 +263,30 @@ def safety_node(state: TriageWorkflowState) -> dict[str, Any]:
     }
 
 
+async def asafety_node(state: TriageWorkflowState) -> dict[str, Any]:
+    """Async variant of safety_node (text screen, then visual screen if needed)."""
+    from agents.safety_agent import ascreen_for_emergency
+
+    msg = (state.get("message") or "").strip()
+    result = _prescreened(state) or await ascreen_for_emergency(msg)
+
+    if not result.is_potential_emergency:
+        file_uri = state.get("file_uri")
+        file_mime = state.get("file_mime_type") or ""
+        if file_uri and file_mime.startswith("image/"):
+            visual = await _avisual_safety_screen(file_uri, file_mime, msg)
+            if visual and visual.get("is_potential_emergency"):
+                return {
+                    "safety_result": visual,
+                    "is_emergency": True,
+                }
+
+    return {
+        "safety_result": result.model_dump(),
+        "is_emergency": result.is_potential_emergency,
+    }
+
+
 # ---------------------------------------------------------------------------
 # Node: Triage Agent (Reasoning + Tool Calling)
 # ---------------------------------------------------------------------------
@@ -210,13 +308,12 @@ def _build_triage_model(tools=None):
     return llm.bind_tools(tools)
 
 
-def _triage_agent_node_impl(state: TriageWorkflowState, tools=None) -> dict[str, Any]:
-    """
-    Core triage agent logic. Invoke Gemini with the current message history.
-    The model may return tool_calls (routed to tool_node) or a final text response.
-    """
-    model = _build_triage_model(tools)
+def _triage_messages(state: TriageWorkflowState) -> list:
+    """Return the message list to send to the triage model.
 
+    On first invocation, seeds the conversation with the system prompt and a
+    context-enriched patient message (multimodal when an image is attached).
+    """
     messages = list(state.get("messages") or [])
 
     # On first invocation, seed the conversation with system prompt + patient message
@@ -240,10 +337,12 @@ def _triage_agent_node_impl(state: TriageWorkflowState, tools=None) -> dict[str,
         file_mime = state.get("file_mime_type") or ""
         context_text = f"{chr(10).join(context_parts)}\n\nPatient message:\n{msg}"
 
-        if file_uri and file_mime.startswith("image/"):
+        image_uri = _attachment_data_uri(file_uri, file_mime) if file_uri and file_mime.startswith("image/") else None
+
+        if image_uri:
             human_content = [
                 {"type": "text", "text": context_text},
-                {"type": "image_url", "image_url": {"url": file_uri}},
+                {"type": "image_url", "image_url": {"url": image_uri}},
                 {"type": "text", "text": "The patient attached an image. Describe what you observe and factor it into your triage assessment."},
             ]
             human_msg = HumanMessage(content=human_content)
@@ -256,8 +355,23 @@ def _triage_agent_node_impl(state: TriageWorkflowState, tools=None) -> dict[str,
 
         messages = [system_msg, human_msg]
 
-    response = model.invoke(messages)
+    return messages
+
 
+def _triage_agent_node_impl(state: TriageWorkflowState, tools=None) -> dict[str, Any]:
+    """
+    Core triage agent logic. Invoke Gemini with the current message history.
+    The model may return tool_calls (routed to tool_node) or a final text response.
+    """
+    model = _build_triage_model(tools)
+    response = model.invoke(_triage_messages(state))
+    return {"messages": [response]}
+
+
+async def _atriage_agent_node_impl(state: TriageWorkflowState, tools=None) -> dict[str, Any]:
+    """Async variant of _triage_agent_node_impl."""
+    model = _build_triage_model(tools)
+    response = await model.ainvoke(_triage_messages(state))
     return {"messages": [response]}
 
 
@@ -266,6 +380,11 @@ def triage_agent_node(state: TriageWorkflowState) -> dict[str, Any]:
     return _triage_agent_node_impl(state, tools=None)
 
 
+async def atriage_agent_node(state: TriageWorkflowState) -> dict[str, Any]:
+    """Async default triage agent node using TRIAGE_TOOLS (local fallback)."""
+    return await _atriage_agent_node_impl(state, tools=None)
+
+
 def _make_triage_agent_node(tools):
     """Closure factory: returns a triage_agent_node bound to a specific tool list.
 
@@ -276,6 +395,13 @@ def _make_triage_agent_node(tools):
     return _node
 
 
+def _make_atriage_agent_node(tools):
+    """Async closure factory counterpart of _make_triage_agent_node."""
+    async def _node(state: TriageWorkflowState) -> dict[str, Any]:
+        return await _atriage_agent_node_impl(state, tools=tools)
+    return _node
+
+
 # ---------------------------------------------------------------------------
 # Node: Synthesis (Extract TriageResult from conversation)
 # ---------------------------------------------------------------------------
@@ -290,7 +416,6 @@ def synthesis_node(state: TriageWorkflowState) -> dict[str, Any]:
     3. Merge safety flags.
     """
     messages = state.get("messages") or []
-    safety = state.get("safety_result") or {}
     original_message = state.get("message", "")
 
     # Collect the last AI message content
@@ -303,16 +428,33 @@ def synthesis_node(state: TriageWorkflowState) -> dict[str, Any]:
     if triage_result.get("intent") == "Unknown":
         triage_result = _structured_extraction(original_message, messages, last_ai_content)
 
-    # Merge safety flags — only override urgency for confirmed emergencies
-    # that short-circuited the graph (is_emergency=True). Cases that went
-    # through the triage agent already have a context-informed urgency.
+    return {"triage_result": _merge_safety_flags(state, triage_result)}
+
+
+async def asynthesis_node(state: TriageWorkflowState) -> dict[str, Any]:
+    """Async variant of synthesis_node."""
+    messages = state.get("messages") or []
+    original_message = state.get("message", "")
+
+    last_ai_content = _extract_ai_content(messages)
+    triage_result = _parse_triage_json(last_ai_content)
+    if triage_result.get("intent") == "Unknown":
+        triage_result = await _astructured_extraction(original_message, messages, last_ai_content)
+
+    return {"triage_result": _merge_safety_flags(state, triage_result)}
+
+
+def _merge_safety_flags(state: TriageWorkflowState, triage_result: dict) -> dict:
+    """Merge safety flags — only override urgency for confirmed emergencies
+    that short-circuited the graph (is_emergency=True). Cases that went
+    through the triage agent already have a context-informed urgency."""
     if state.get("is_emergency"):
+        safety = state.get("safety_result") or {}
         triage_result["urgency"] = "EMERGENCY"
         triage_result["safety_flagged"] = True
         triage_result["safety_reason"] = safety.get("reason", "")
         triage_result["safety_triggered_by"] = safety.get("triggered_by", "none")
-
-    return {"triage_result": triage_result}
+    return triage_result
 
 
 def _extract_ai_content(messages: list) -> str:
@@ -329,6 +471,32 @@ def _extract_ai_content(messages: list) -> str:
     return ""
 
 
+def _extraction_prompt(original_message: str, messages: list, agent_response: str) -> str:
+    # Build context from the conversation
+    tool_context_parts = []
+    for msg in messages:
+        # Collect tool results for context
+        if hasattr(msg, "type") and getattr(msg, "type", "") == "tool":
+            name = getattr(msg, "name", "tool")
+            content = msg.content if isinstance(msg.content, str) else str(msg.content)
+            tool_context_parts.append(f"[{name}]: {content[:500]}")
+
+    tool_context = "\n".join(tool_context_parts) if tool_context_parts else "No tools were called."
+
+    return f"""Based on the following patient message and gathered context, produce a triage assessment.
+
+Patient message:
+{original_message}
+
+Agent analysis and tool results:
+{agent_response[:2000]}
+
+Tool context:
+{tool_context[:2000]}
+
+Classify this message with intent, confidence, urgency, summary, checklist, and recommended_queue."""
+
+
 def _structured_extraction(original_message: str, messages: list, agent_response: str) -> dict:
     """
     Use Gemini with structured output to extract a TriageResult from the conversation.
@@ -343,34 +511,36 @@ def _structured_extraction(original_message: str, messages: list, agent_response
         from schemas.schemas import TriageResult
 
         client = genai.Client(api_key=api_key)
+        response = client.models.generate_content(
+            model=_LLM_MODEL,
+            contents=_extraction_prompt(original_message, messages, agent_response),
+            config={
+                "response_mime_type": "application/json",
+                "response_schema": TriageResult,
+            },
+        )
+        if response.parsed:
+            return response.parsed.model_dump()
+    except Exception:
+        pass
 
-        # Build context from the conversation
-        tool_context_parts = []
-        for msg in messages:
-            # Collect tool results for context
-            if hasattr(msg, "type") and getattr(msg, "type", "") == "tool":
-                name = getattr(msg, "name", "tool")
-                content = msg.content if isinstance(msg.content, str) else str(msg.content)
-                tool_context_parts.append(f"[{name}]: {content[:500]}")
-
-        tool_context = "\n".join(tool_context_parts) if tool_context_parts else "No tools were called."
-
-        prompt = f"""Based on the following patient message and gathered context, produce a triage assessment.
-
-Patient message:
-{original_message}
+    return _parse_triage_json(agent_response)
 
-Agent analysis and tool results:
-{agent_response[:2000]}
 
-Tool context:
-{tool_context[:2000]}
+async def _astructured_extraction(original_message: str, messages: list, agent_response: str) -> dict:
+    """Async variant of _structured_extraction."""
+    api_key = os.environ.get("LLM_GEMINI_API_KEY") or os.environ.get("GOOGLE_API_KEY")
+    if not api_key:
+        return _parse_triage_json("")  # fallback
 
-Classify this message with intent, confidence, urgency, summary, checklist, and recommended_queue."""
+    try:
+        from google import genai
+        from schemas.schemas import TriageResult
 
-        response = client.models.generate_content(
+        client = genai.Client(api_key=api_key)
+        response = await client.aio.models.generate_content(
             model=_LLM_MODEL,
-            contents=prompt,
+            contents=_extraction_prompt(original_message, messages, agent_response),
             config={
                 "response_mime_type": "application/json",
                 "response_schema": TriageResult,
@@ -388,20 +558,75 @@ Classify this message with intent, confidence, urgency, summary, checklist, and
 # Node: Draft Reply (generates a policy-grounded reply for staff review)
 # ---------------------------------------------------------------------------
 
+def _fallback_draft(triage_result: dict) -> str:
+    return f"Thank you for contacting us regarding: {triage_result.get('summary', 'your concern')}. A staff member will review your message shortly."
+
+
+def _is_low(triage_result: dict) -> bool:
+    return (triage_result.get("urgency") or "").upper() == "LOW"
+
+
+def _template_draft(state: TriageWorkflowState, triage_result: dict, policy_chunks: list[str]) -> Optional[str]:
+    """Vetted template reply for a LOW message (auto-sent, see
+    agents.reply_templates), or None to draft with the LLM."""
+    if not _is_low(triage_result):
+        return None
+    from agents.reply_templates import low_urgency_template_reply
+    return low_urgency_template_reply(
+        state.get("message", ""), triage_result, policy_chunks, state.get("patient_name", "")
+    )
+
+
 def draft_reply_node(state: TriageWorkflowState) -> dict[str, Any]:
     """
     Generate a policy-grounded draft reply for the patient message.
     Uses the policy agent's RAG to retrieve relevant policies and draft a reply.
+    LOW messages use a vetted reply template when one matches the intent and
+    the top policy chunk, skipping the LLM call.
     """
     message = state.get("message", "")
     triage_result = state.get("triage_result") or {}
 
     try:
         from agents.policy_agent import get_relevant_policy, generate_draft_reply
-        policy_chunks = get_relevant_policy(message, triage_result.get("summary", ""))
-        draft = generate_draft_reply(message, triage_result, policy_chunks)
+        from agents.policy_scope import policy_where_for
+        policy_chunks = get_relevant_policy(
+            message, triage_result.get("summary", ""), where=policy_where_for(triage_result)
+        )
+        draft = _template_draft(state, triage_result, policy_chunks)
+        if draft is None:
+            start = time.perf_counter()
+            draft = generate_draft_reply(message, triage_result, policy_chunks)
+            if _is_low(triage_result):
+                from agents.reply_templates import record_llm_draft
+                record_llm_draft(time.perf_counter() - start)
     except Exception:
-        draft = f"Thank you for contacting us regarding: {triage_result.get('summary', 'your concern')}. A staff member will review your message shortly."
+        draft = _fallback_draft(triage_result)
+
+    return {"draft_reply": draft}
+
+
+async def adraft_reply_node(state: TriageWorkflowState) -> dict[str, Any]:
+    """Async variant of draft_reply_node. Chroma retrieval runs in a worker
+    thread (CPU-bound, in-process); the Gemini call is awaited."""
+    message = state.get("message", "")
+    triage_result = state.get("triage_result") or {}
+
+    try:
+        from agents.policy_agent import get_relevant_policy, agenerate_draft_reply
+        from agents.policy_scope import policy_where_for
+        policy_chunks = await asyncio.to_thread(
+            get_relevant_policy, message, triage_result.get("summary", ""), 3, policy_where_for(triage_result)
+        )
+        draft = _template_draft(state, triage_result, policy_chunks)
+        if draft is None:
+            start = time.perf_counter()
+            draft = await agenerate_draft_reply(message, triage_result, policy_chunks)
+            if _is_low(triage_result):
+                from agents.reply_templates import record_llm_draft
+                record_llm_draft(time.perf_counter() - start)
+    except Exception:
+        draft = _fallback_draft(triage_result)
 
     return {"draft_reply": draft}
 
@@ -435,6 +660,12 @@ def communication_node(state: TriageWorkflowState) -> dict[str, Any]:
     }
 
 
+async def acommunication_node(state: TriageWorkflowState) -> dict[str, Any]:
+    """Async variant of communication_node. Resend's client is sync, so the
+    send runs in a worker thread instead of blocking the event loop."""
+    return await asyncio.to_thread(communication_node, state)
+
+
 # ---------------------------------------------------------------------------
 # Node: Checklist Gate (Sprint 5 — conversational interrupt for missing info)
 # ---------------------------------------------------------------------------
@@ -0,0 +1,267 @@
+"""
+Retention for the graph checkpoint store (data/checkpoints.db).
+
+Every node of every thread writes a full checkpoint and nothing deleted them.
+prune_checkpoints() classifies each thread by its latest checkpoint:
+
+  pending   – waiting on staff review or a patient answer: always kept intact.
+  finished  – hitl_status is "approved", "auto_completed" or "dismissed":
+                * younger than the grace period → compacted to the latest
+                  checkpoint (history and superseded writes are removed,
+                  get_state / resume keep working);
+                * older than the grace period → the thread is deleted.
+
+Work is done in keyset-paginated batches, each in its own short write
+transaction, so a pass can run next to live traffic. Freed pages are
+returned to the filesystem with PRAGMA incremental_vacuum when the database
+uses auto_vacuum=INCREMENTAL (new stores do; existing ones are converted once
+with convert_to_incremental_vacuum or `prune_checkpoints.py --convert`).
+
+Runs as a CLI (scripts/prune_checkpoints.py) or as a periodic background
+thread (start_retention_task, every CHECKPOINT_RETENTION_INTERVAL_S).
+
+Settings (environment):
+  CHECKPOINT_RETENTION_GRACE_DAYS   delete finished threads after (default 30)
+  CHECKPOINT_RETENTION_INTERVAL_S   background pass interval (default 3600, 0 = off)
+"""
+import os
+import random
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Any, Optional
+
+CHECKPOINT_RETENTION_GRACE_DAYS = float(os.environ.get("CHECKPOINT_RETENTION_GRACE_DAYS", "30"))
+CHECKPOINT_RETENTION_INTERVAL_S = float(os.environ.get("CHECKPOINT_RETENTION_INTERVAL_S", "3600"))
+
+# hitl_status values that mean nothing will resume the thread again
+FINISHED_STATUSES = {"approved", "auto_completed", "dismissed"}
+
+
+def _default_db() -> str:
+    from graph.workflow import _CHECKPOINT_DB
+    return _CHECKPOINT_DB
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA busy_timeout=30000")
+    return conn
+
+
+def _thread_status(serde, type_: str, blob: bytes) -> tuple[Optional[str], float]:
+    """(hitl_status, checkpoint timestamp) from a serialized checkpoint."""
+    checkpoint = serde.loads_typed((type_, blob))
+    status = (checkpoint.get("channel_values") or {}).get("hitl_status")
+    try:
+        ts = datetime.fromisoformat(checkpoint["ts"]).timestamp()
+    except Exception:
+        ts = time.time()  # unknown age: never old enough to delete
+    return status, ts
+
+
+def _latest_batch(conn: sqlite3.Connection, after: str, limit: int) -> list[tuple]:
+    """Latest root-namespace checkpoint per thread, for threads > after."""
+    return conn.execute(
+        "SELECT c.thread_id, c.checkpoint_id, c.type, c.checkpoint, t.n FROM ("
+        "  SELECT thread_id, MAX(checkpoint_id) AS cid, COUNT(*) AS n FROM checkpoints "
+        "  WHERE checkpoint_ns = '' AND thread_id > ? GROUP BY thread_id ORDER BY thread_id LIMIT ?"
+        ") t JOIN checkpoints c ON c.thread_id = t.thread_id AND c.checkpoint_ns = '' "
+        "AND c.checkpoint_id = t.cid ORDER BY c.thread_id",
+        (after, limit),
+    ).fetchall()
+
+
+def _auto_vacuum_mode(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+
+
+def convert_to_incremental_vacuum(path: Optional[str] = None) -> None:
+    """One-time switch of an existing store to auto_vacuum=INCREMENTAL.
+
+    Runs a full VACUUM (rewrites the file; blocks writers while it runs).
+    """
+    conn = _connect(path or _default_db())
+    try:
+        if _auto_vacuum_mode(conn) != 2:
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("VACUUM")
+    finally:
+        conn.close()
+
+
+def db_report(path: Optional[str] = None, samples: int = 200, seed: int = 0) -> dict[str, Any]:
+    """Size and read-latency snapshot: file bytes, row counts, and get_tuple
+    latency on a random sample of threads."""
+    from graph.checkpoint_store import PooledSqliteSaver
+
+    path = path or _default_db()
+    conn = _connect(path)
+    try:
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        freelist = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        checkpoints = conn.execute("SELECT COUNT(*) FROM checkpoints").fetchone()[0]
+        writes = conn.execute("SELECT COUNT(*) FROM writes").fetchone()[0]
+        threads = [r[0] for r in conn.execute("SELECT DISTINCT thread_id FROM checkpoints")]
+    finally:
+        conn.close()
+
+    saver = PooledSqliteSaver(path, pool_size=1)
+    latencies = []
+    for thread_id in random.Random(seed).sample(threads, min(samples, len(threads))):
+        start = time.perf_counter()
+        saver.get_tuple({"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}})
+        latencies.append(time.perf_counter() - start)
+    saver.close()
+    latencies.sort()
+    return {
+        "file_bytes": os.path.getsize(path),
+        "free_bytes": freelist * page_size,
+        "threads": len(threads),
+        "checkpoints": checkpoints,
+        "writes": writes,
+        "read_p50_s": latencies[len(latencies) // 2] if latencies else 0.0,
+        "read_p95_s": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else 0.0,
+    }
+
+
+def prune_checkpoints(
+    path: Optional[str] = None,
+    grace_s: Optional[float] = None,
+    batch_size: int = 500,
+    vacuum_pages: int = 2000,
+    dry_run: bool = False,
+    now: Optional[float] = None,
+) -> dict[str, Any]:
+    """One retention pass. Returns counts of what was kept, compacted and deleted.
+
+    vacuum_pages bounds how many free pages are released after each batch, so
+    the file shrinks gradually instead of in one long VACUUM.
+    """
+    from graph.checkpoint_serde import CompactSerializer
+
+    path = path or _default_db()
+    if grace_s is None:
+        grace_s = CHECKPOINT_RETENTION_GRACE_DAYS * 86400
+    now = time.time() if now is None else now
+    serde = CompactSerializer()  # reads both compact and default encodings
+    stats = {
+        "threads": 0, "pending": 0, "compacted": 0, "deleted": 0,
+        "checkpoints_removed": 0, "writes_removed": 0, "pages_freed": 0, "elapsed_s": 0.0,
+    }
+    start = time.monotonic()
+
+    conn = _connect(path)
+    try:
+        incremental = _auto_vacuum_mode(conn) == 2
+        after = ""
+        while True:
+            batch = _latest_batch(conn, after, batch_size)
+            if not batch:
+                break
+            after = batch[-1][0]
+            compact, delete = [], []
+            for thread_id, checkpoint_id, type_, blob, n in batch:
+                stats["threads"] += 1
+                status, ts = _thread_status(serde, type_, blob)
+                if status not in FINISHED_STATUSES:
+                    stats["pending"] += 1
+                elif now - ts >= grace_s:
+                    delete.append(thread_id)
+                elif n > 1:
+                    compact.append((thread_id, checkpoint_id))
+            stats["deleted"] += len(delete)
+            stats["compacted"] += len(compact)
+            if dry_run or not (compact or delete):
+                continue
+
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if delete:
+                    marks = ",".join("?" * len(delete))
+                    stats["checkpoints_removed"] += conn.execute(
+                        f"DELETE FROM checkpoints WHERE thread_id IN ({marks})", delete).rowcount
+                    stats["writes_removed"] += conn.execute(
+                        f"DELETE FROM writes WHERE thread_id IN ({marks})", delete).rowcount
+                for thread_id, checkpoint_id in compact:
+                    stats["checkpoints_removed"] += conn.execute(
+                        "DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = '' AND checkpoint_id <> ?",
+                        (thread_id, checkpoint_id)).rowcount
+                    stats["writes_removed"] += conn.execute(
+                        "DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns = '' AND checkpoint_id <> ?",
+                        (thread_id, checkpoint_id)).rowcount
+                    # The kept checkpoint becomes the root of the thread's history
+                    conn.execute(
+                        "UPDATE checkpoints SET parent_checkpoint_id = NULL "
+                        "WHERE thread_id = ? AND checkpoint_ns = '' AND checkpoint_id = ?",
+                        (thread_id, checkpoint_id))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            if incremental:
+                before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+                conn.execute(f"PRAGMA incremental_vacuum({int(vacuum_pages)})").fetchall()
+                stats["pages_freed"] += before - conn.execute("PRAGMA freelist_count").fetchone()[0]
+        if incremental and not dry_run:
+            # Release whatever is left in bounded steps
+            while conn.execute("PRAGMA freelist_count").fetchone()[0]:
+                before = conn.execute("PRAGMA freelist_count").fetchone()[0]
+                conn.execute(f"PRAGMA incremental_vacuum({int(vacuum_pages)})").fetchall()
+                stats["pages_freed"] += before - conn.execute("PRAGMA freelist_count").fetchone()[0]
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        conn.close()
+    stats["elapsed_s"] = time.monotonic() - start
+    return stats
+
+
+# ---------------------------------------------------------------------------
+# Background task
+# ---------------------------------------------------------------------------
+
+class RetentionTask:
+    """Daemon thread that runs prune_checkpoints every interval_s seconds."""
+
+    def __init__(self, path: Optional[str] = None, interval_s: float = CHECKPOINT_RETENTION_INTERVAL_S, **kwargs):
+        self.path = path
+        self.interval_s = interval_s
+        self.kwargs = kwargs
+        self.last_stats: Optional[dict] = None
+        self.last_error: Optional[str] = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="checkpoint-retention", daemon=True)
+
+    def start(self) -> "RetentionTask":
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_s):
+            try:
+                self.last_stats = prune_checkpoints(self.path, **self.kwargs)
+                self.last_error = None
+            except Exception as e:
+                self.last_error = f"{type(e).__name__}: {e}"
+
+
+_task: Optional[RetentionTask] = None
+_task_lock = threading.Lock()
+
+
+def start_retention_task(interval_s: Optional[float] = None) -> Optional[RetentionTask]:
+    """Start the process-wide retention thread once (0 disables it)."""
+    global _task
+    if interval_s is None:
+        interval_s = CHECKPOINT_RETENTION_INTERVAL_S
+    with _task_lock:
+        if _task is None and interval_s > 0:
+            _task = RetentionTask(interval_s=interval_s).start()
+        return _task
@@ -22,6 +22,7 @@ class TriageWorkflowState(TypedDict, total=False):
     # --- Inputs ---
     patient_id: str
     patient_email: str
+    patient_name: str           # optional; greeting in templated LOW replies
     message: str
 
     # Message history for the agentic loop (HumanMessage → AIMessage → ToolMessage …)
@@ -42,7 +43,7 @@ class TriageWorkflowState(TypedDict, total=False):
     hitl_status: Optional[str]  # "pending_review", "approved", "auto_completed"
 
     # --- Multimodal metadata (Sprint 5) ---
-    file_uri: Optional[str]         # base64 data URI e.g. "data:image/jpeg;base64,..."
+    file_uri: Optional[str]         # blob store ref "blob:sha256:<hex>" (legacy: base64 data URI)
     file_mime_type: Optional[str]   # "image/jpeg", "image/png", "application/pdf"
     file_name: Optional[str]        # original filename for display
 
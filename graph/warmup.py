@@ -0,0 +1,218 @@
+"""
+Startup warm-up and readiness gate.
+
+Without warm-up, the first patient after a deploy pays graph compilation,
+MCP discovery, opening the Chroma PersistentClient and loading the embedding
+model inside their own request. Warmup runs those steps once, in order, on a
+background thread:
+
+  graph         compile the sync graph (MCP discovery included)
+  embeddings    load the policy embedding model (agents.embeddings)
+  vector_store  open the hospital_policies collection
+  vector_query  one query: embeds and searches
+  llm           construct the Gemini clients (imports + client setup; no call)
+  supabase      one profiles select (only with WARMUP_SUPABASE=1)
+
+Each step records its status (ok / failed / skipped) and duration. The
+steps reuse the process-wide singletons (graph.lazy_init), so a request
+that arrives mid-warm-up waits for the same build rather than starting
+another. Callers use status() / ready to show a "warming up" state, and
+wait() to block until warm-up finishes. A failed step leaves the process
+"degraded" but still serving: the graph falls back to local tools and
+policy lookups return nothing, as without warm-up.
+
+Settings (environment):
+  TRIAGE_WARMUP     1 = warm up on start_warmup() (default), 0 = skip
+  WARMUP_SUPABASE   1 = include the Supabase ping (default 0)
+"""
+import os
+import threading
+import time
+from typing import Callable, Optional
+
+from graph.lazy_init import LazyInit
+
+TRIAGE_WARMUP = os.environ.get("TRIAGE_WARMUP", "1") != "0"
+WARMUP_SUPABASE = os.environ.get("WARMUP_SUPABASE", "0") == "1"
+
+STEP_LABELS = {
+    "graph": "compiling the triage graph",
+    "embeddings": "loading the embedding model",
+    "vector_store": "opening the policy store",
+    "vector_query": "searching the policy store",
+    "llm": "initializing the LLM client",
+    "supabase": "connecting to Supabase",
+}
+
+
+class WarmupSkipped(Exception):
+    """Raised by a step that does not apply (e.g. no API key configured)."""
+
+
+def _warm_graph() -> str:
+    from graph.workflow import _get_compiled
+    app = _get_compiled()
+    return f"{len(app.get_graph().nodes['tool_node'].data.tools_by_name)} tools"
+
+
+def _warm_embeddings() -> str:
+    from agents.embeddings import get_embedding_function
+    fn = get_embedding_function()
+    if not hasattr(fn, "load"):
+        raise WarmupSkipped("POLICY_EMBEDDINGS=chroma loads on every query")
+    load_s = fn.load()
+    start = time.perf_counter()
+    fn(["prescription refill"])
+    return f"loaded in {load_s:.2f}s, first embed {(time.perf_counter() - start) * 1e3:.1f}ms"
+
+
+def _warm_vector_store() -> str:
+    from agents.policy_agent import _collection, _get_collection
+    coll = _get_collection()
+    if coll is None:
+        raise RuntimeError(_collection.status()["error"] or "policy store unavailable")
+    return f"{coll.count()} documents"
+
+
+def _warm_vector_query() -> str:
+    from agents.policy_agent import _get_collection
+    coll = _get_collection()
+    if coll is None:
+        raise WarmupSkipped("policy store unavailable")
+    coll.query(query_texts=["prescription refill"], n_results=1)
+    return "ok"
+
+
+def _warm_llm() -> str:
+    if not (os.environ.get("LLM_GEMINI_API_KEY") or os.environ.get("GOOGLE_API_KEY")):
+        raise WarmupSkipped("no Gemini API key")
+    from agents.safety_agent import _get_genai_client
+    from graph.nodes import _build_triage_model
+    _get_genai_client()
+    _build_triage_model()
+    return "ok"
+
+
+def _warm_supabase() -> str:
+    from app.auth import get_supabase_client
+    client = get_supabase_client()
+    if client is None:
+        raise WarmupSkipped("Supabase not configured")
+    client.table("profiles").select("patient_id").limit(1).execute()
+    return "ok"
+
+
+def default_steps(supabase: Optional[bool] = None) -> list[tuple[str, Callable[[], str]]]:
+    steps = [
+        ("graph", _warm_graph),
+        ("embeddings", _warm_embeddings),
+        ("vector_store", _warm_vector_store),
+        ("vector_query", _warm_vector_query),
+        ("llm", _warm_llm),
+    ]
+    if WARMUP_SUPABASE if supabase is None else supabase:
+        steps.append(("supabase", _warm_supabase))
+    return steps
+
+
+class Warmup:
+    """Runs warm-up steps once and reports per-step status and timing."""
+
+    def __init__(self, steps: Optional[list[tuple[str, Callable[[], str]]]] = None):
+        self.steps = default_steps() if steps is None else steps
+        self.results: dict[str, dict] = {
+            name: {"status": "pending", "seconds": 0.0, "detail": ""} for name, _ in self.steps
+        }
+        self.current: Optional[str] = None
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._done = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def ready(self) -> bool:
+        """True once every step has run (whether or not it succeeded)."""
+        return self._done.is_set()
+
+    @property
+    def state(self) -> str:
+        if self.started_at is None:
+            return "cold"
+        if not self.ready:
+            return "warming"
+        if any(r["status"] == "failed" for r in self.results.values()):
+            return "degraded"
+        return "ready"
+
+    def run(self) -> dict:
+        """Run every step in the calling thread; returns status()."""
+        self.started_at = time.monotonic()
+        try:
+            for name, step in self.steps:
+                self.current = name
+                result = self.results[name]
+                result["status"] = "running"
+                start = time.perf_counter()
+                try:
+                    result["detail"] = step() or ""
+                    result["status"] = "ok"
+                except WarmupSkipped as e:
+                    result["status"], result["detail"] = "skipped", str(e)
+                except Exception as e:
+                    result["status"], result["detail"] = "failed", f"{type(e).__name__}: {e}"
+                result["seconds"] = time.perf_counter() - start
+        finally:
+            self.current = None
+            self.finished_at = time.monotonic()
+            self._done.set()
+        return self.status()
+
+    def start(self) -> "Warmup":
+        """Run the steps on a background thread."""
+        self._thread = threading.Thread(target=self.run, name="triage-warmup", daemon=True)
+        self._thread.start()
+        return self
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Block until warm-up finishes; False on timeout."""
+        return self._done.wait(timeout)
+
+    def message(self) -> str:
+        """One line for a "warming up" banner."""
+        if self.current:
+            return f"Warming up: {STEP_LABELS.get(self.current, self.current)}"
+        return "Warming up" if not self.ready else self.state.capitalize()
+
+    def status(self) -> dict:
+        end = self.finished_at or time.monotonic()
+        return {
+            "state": self.state,
+            "current_step": self.current,
+            "elapsed_s": end - self.started_at if self.started_at is not None else 0.0,
+            "steps": {name: dict(r) for name, r in self.results.items()},
+        }
+
+
+_warmup = LazyInit(lambda: Warmup().start(), name="warm-up")
+
+
+def start_warmup() -> Optional[Warmup]:
+    """Start the process-wide warm-up once (None when TRIAGE_WARMUP=0)."""
+    if not TRIAGE_WARMUP:
+        return None
+    return _warmup.get()
+
+
+def get_warmup() -> Optional[Warmup]:
+    """The process-wide warm-up if one was started, else None."""
+    return _warmup.peek()
+
+
+def readiness() -> dict:
+    """Readiness report for the app and workers. Without a warm-up, the
+    state reflects whether the graph has been built yet."""
+    warmup = get_warmup()
+    if warmup is not None:
+        return warmup.status()
+    from graph.workflow import _compiled
+    return {"state": "ready" if _compiled.ready else "cold", "current_step": None, "elapsed_s": 0.0, "steps": {}}
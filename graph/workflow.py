@@ -19,11 +19,30 @@ Persistence:
 
 Resume:
   Staff edits the draft_reply via update_state, then resumes with invoke(None, config).
+
+Ephemeral runs:
+  Most threads never pause (LOW urgency auto-communicates; eval and batch
+  runs never resume), so run_triage_workflow / arun_triage_workflow and
+  job-queue "start" jobs run on a copy of the compiled graph whose
+  checkpointer is an in-memory EphemeralSaver. finish_ephemeral_run copies
+  the thread's latest checkpoint to the SQLite store only if the run stopped
+  at an interrupt (checklist question or communication_node) and drops the
+  in-memory thread either way. TRIAGE_EPHEMERAL_RUNS=0 checkpoints every
+  node durably as before.
+
+Async entry points:
+  arun_triage_workflow / astream_triage_workflow / aresume_chat / aresume_workflow
+  drive a separately compiled graph built from the async node variants and an
+  AsyncPooledSqliteSaver on the same checkpoint DB, so one event loop can serve many
+  in-flight threads without a blocked OS thread per conversation. Thread ids
+  are interchangeable between the sync and async surfaces.
 """
 import asyncio
 import json
 import os
+import threading
 import uuid
+import weakref
 from typing import Any
 
 import nest_asyncio
@@ -37,6 +56,7 @@ except ValueError as e:
 
 from langchain_core.messages import AIMessage, HumanMessage
 
+from graph.lazy_init import LazyInit
 from graph.state import TriageWorkflowState
 from langgraph.types import Command
 
@@ -48,6 +68,12 @@ from graph.nodes import (
     communication_node,
     checklist_gate_node,
     _make_triage_agent_node,
+    asafety_node,
+    atriage_agent_node,
+    asynthesis_node,
+    adraft_reply_node,
+    acommunication_node,
+    _make_atriage_agent_node,
     LOCAL_TOOLS,
     TRIAGE_TOOLS,
 )
@@ -126,15 +152,32 @@ def _auto_communicate_node(state: TriageWorkflowState) -> dict[str, Any]:
     }
 
 
+async def _aauto_communicate_node(state: TriageWorkflowState) -> dict[str, Any]:
+    """Async variant — the sync email send runs in a worker thread."""
+    return await asyncio.to_thread(_auto_communicate_node, state)
+
+
 # ---------------------------------------------------------------------------
 # Build the graph with persistence and HITL interrupts
 # ---------------------------------------------------------------------------
 
-_compiled: Any = None
+# Process-wide sync graph (built once; see graph.lazy_init)
+_compiled = LazyInit(lambda: build_graph(), name="compiled graph")
 _checkpointer: Any = None
 
-# Module-level MCP singleton (populated by _init_mcp_tools)
-_mcp_tools: list | None = None
+EPHEMERAL_RUNS = os.environ.get("TRIAGE_EPHEMERAL_RUNS", "1") != "0"
+
+# Shared in-memory store for ephemeral runs (see finish_ephemeral_run), and
+# the ephemeral copy of each compiled graph
+_ephemeral_saver = LazyInit(lambda: _new_ephemeral_saver(), name="ephemeral checkpoint store")
+_ephemeral_apps: "weakref.WeakKeyDictionary[Any, Any]" = weakref.WeakKeyDictionary()
+
+# Async graphs are bound to the event loop that built them (MCP sessions are
+# opened on that loop), so cache one per loop.
+_acompiled: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Task]" = weakref.WeakKeyDictionary()
+
+# Module-level MCP singleton (built by _discover_mcp_tools)
+_mcp_tools = LazyInit(lambda: _discover_mcp_tools(), name="MCP tools")
 
 MCP_CONFIG_PATH = os.path.join(
     os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
@@ -143,24 +186,89 @@ MCP_CONFIG_PATH = os.path.join(
 
 
 async def _init_mcp_tools() -> list:
-    """Discover MCP tools from chroma-mcp-server via MultiServerMCPClient.
-
-    Reads mcp_config.json, launches the Chroma MCP server as a subprocess,
-    and returns the list of LangChain-wrapped tools it exposes.
-    Caches the result so the server is only started once per process.
+    """MCP tools for the graph, discovered once per process (concurrent first
+    callers share one discovery, run in a worker thread)."""
+    return await _mcp_tools.aget()
+
+
+def _discover_mcp_tools() -> list:
+    """Discover MCP tools from chroma-mcp-server.
+
+    Reads mcp_config.json and returns the LangChain-wrapped tools the
+    servers expose. A Chroma server on our own vector store is served
+    in-process (graph.mcp_local, chroma_query_documents only) unless
+    MCP_LOCAL_FASTPATH=0; other servers are served by a pool of warm server
+    processes (graph.mcp_pool). With MCP_POOL_SIZE=0, MultiServerMCPClient
+    tools are used instead, which start a new session per call.
+    _mcp_tools caches the result so discovery runs once per process.
+
+    Pooled tools come from the on-disk schema cache (graph.mcp_tool_cache)
+    when it matches the config: the pool starts in the background and the
+    graph compiles without waiting for it. Without a cache, discovery waits
+    at most MCP_DISCOVERY_TIMEOUT_S, then raises so build_graph falls back
+    to the local tools; a later request picks the MCP tools up once the
+    background discovery has filled the cache.
     """
-    global _mcp_tools
-    if _mcp_tools is not None:
-        return _mcp_tools
-
-    from langchain_mcp_adapters.client import MultiServerMCPClient
-
     with open(MCP_CONFIG_PATH) as f:
         config = json.load(f)
 
-    client = MultiServerMCPClient(config)
-    _mcp_tools = await client.get_tools()
-    return _mcp_tools
+    from graph.mcp_local import MCP_LOCAL_FASTPATH, local_query_documents_tool, local_vector_store
+    tools = []
+    if MCP_LOCAL_FASTPATH:
+        local = [name for name, conn in config.items() if local_vector_store(conn)]
+        if local:
+            tools.append(local_query_documents_tool())
+            config = {name: conn for name, conn in config.items() if name not in local}
+
+    from graph.mcp_pool import MCP_POOL_SIZE, get_mcp_pool
+    from graph.mcp_tool_cache import MCP_DISCOVERY_TIMEOUT_S, load_cached_tools
+    if config and MCP_POOL_SIZE > 0:
+        pool = get_mcp_pool(config, wait=False)
+        cached = load_cached_tools(config)
+        refresh = threading.Thread(
+            target=_refresh_mcp_tool_cache, args=(pool, config), name="mcp-tool-cache", daemon=True
+        )
+        if cached is not None:
+            tools.extend(pool.tools_for(cached))
+            refresh.start()
+        else:
+            try:
+                listed = pool.list_tools(MCP_DISCOVERY_TIMEOUT_S)
+            except BaseException:
+                refresh.start()
+                raise
+            from graph.mcp_tool_cache import save_tool_cache
+            save_tool_cache(config, listed, pool.server_info())
+            tools.extend(pool.tools_for(listed))
+    elif config:
+        from langchain_mcp_adapters.client import MultiServerMCPClient
+        loop = asyncio.new_event_loop()
+        try:
+            tools.extend(loop.run_until_complete(
+                asyncio.wait_for(MultiServerMCPClient(config).get_tools(), MCP_DISCOVERY_TIMEOUT_S)
+            ))
+        finally:
+            loop.close()
+    return tools
+
+
+def _refresh_mcp_tool_cache(pool, config: dict) -> None:
+    """Re-discover tools on the live pool (background thread). If the schemas
+    differ from the cache the graph was built from, rewrite the cache and drop
+    the compiled graphs so the next request rebuilds with the new tools."""
+    from graph.mcp_tool_cache import refresh_tool_cache
+    try:
+        changed = refresh_tool_cache(pool, config)
+    except Exception as e:
+        if pool.closed:
+            return  # shutting down
+        import warnings
+        warnings.warn(f"MCP tool discovery failed ({type(e).__name__}: {e}); keeping cached tools.")
+        return
+    if changed:
+        _mcp_tools.reset()
+        _compiled.reset()
+        _acompiled.clear()
 
 
 _CHECKPOINT_DB = os.path.join(
@@ -170,23 +278,23 @@ _CHECKPOINT_DB = os.path.join(
 )
 
 
-def _compile_graph(all_tools, triage_node_fn):
-    """Shared graph compilation logic used by both MCP and local-only builders."""
-    global _checkpointer
+def _build_state_graph(all_tools, triage_node_fn, *, use_async: bool = False):
+    """Wire nodes and edges. With use_async=True, I/O-bound nodes are the
+    async variants from graph.nodes; the graph topology is identical."""
     from langgraph.graph import StateGraph, END
     from langgraph.prebuilt import ToolNode
 
     graph = StateGraph(TriageWorkflowState)
 
     # --- Add nodes ---
-    graph.add_node("safety", safety_node)
+    graph.add_node("safety", asafety_node if use_async else safety_node)
     graph.add_node("triage_agent", triage_node_fn)
     graph.add_node("tool_node", ToolNode(all_tools))
     graph.add_node("checklist_gate", checklist_gate_node)
-    graph.add_node("synthesis", synthesis_node)
-    graph.add_node("draft_reply", draft_reply_node)
-    graph.add_node("communication_node", communication_node)
-    graph.add_node("auto_communicate", _auto_communicate_node)
+    graph.add_node("synthesis", asynthesis_node if use_async else synthesis_node)
+    graph.add_node("draft_reply", adraft_reply_node if use_async else draft_reply_node)
+    graph.add_node("communication_node", acommunication_node if use_async else communication_node)
+    graph.add_node("auto_communicate", _aauto_communicate_node if use_async else _auto_communicate_node)
 
     # --- Set entry point ---
     graph.set_entry_point("safety")
@@ -216,16 +324,22 @@ def _compile_graph(all_tools, triage_node_fn):
     )
     graph.add_edge("auto_communicate", END)
     graph.add_edge("communication_node", END)
+    return graph
+
+
+def _compile_graph(all_tools, triage_node_fn):
+    """Shared graph compilation logic used by both MCP and local-only builders."""
+    global _checkpointer
+    graph = _build_state_graph(all_tools, triage_node_fn)
 
     # --- Compile with persistence and HITL interrupt ---
-    # SqliteSaver persists thread state to disk so HITL thread_ids survive
-    # app restarts. Falls back to in-memory MemorySaver if sqlite unavailable.
+    # PooledSqliteSaver persists thread state to disk so HITL thread_ids survive
+    # app restarts, with WAL + pooled connections so concurrent sessions do not
+    # serialize on one connection. Falls back to in-memory MemorySaver if
+    # sqlite unavailable.
     try:
-        import sqlite3
-        from langgraph.checkpoint.sqlite import SqliteSaver
-        conn = sqlite3.connect(_CHECKPOINT_DB, check_same_thread=False)
-        _checkpointer = SqliteSaver(conn)
-        _checkpointer.setup()
+        from graph.checkpoint_store import PooledSqliteSaver
+        _checkpointer = PooledSqliteSaver(_CHECKPOINT_DB)
     except Exception:
         from langgraph.checkpoint.memory import MemorySaver
         import warnings
@@ -241,6 +355,28 @@ def _compile_graph(all_tools, triage_node_fn):
     )
 
 
+async def _acompile_graph(all_tools, triage_node_fn):
+    """Async counterpart of _compile_graph: async nodes + AsyncPooledSqliteSaver."""
+    graph = _build_state_graph(all_tools, triage_node_fn, use_async=True)
+
+    try:
+        from graph.checkpoint_store import AsyncPooledSqliteSaver
+        checkpointer = await asyncio.to_thread(AsyncPooledSqliteSaver, _CHECKPOINT_DB)
+    except Exception:
+        from langgraph.checkpoint.memory import MemorySaver
+        import warnings
+        warnings.warn(
+            "AsyncPooledSqliteSaver unavailable — falling back to MemorySaver (state lost on restart). "
+            "Install langgraph-checkpoint-sqlite to persist HITL threads.",
+            stacklevel=2,
+        )
+        checkpointer = MemorySaver()
+    return graph.compile(
+        checkpointer=checkpointer,
+        interrupt_before=["communication_node"],
+    )
+
+
 async def build_graph_async():
     """Build graph with MCP-discovered tools merged with LOCAL_TOOLS."""
     mcp_tools = await _init_mcp_tools()
@@ -283,6 +419,33 @@ def build_graph():
     return _build_graph_local_only()
 
 
+async def abuild_graph():
+    """Async counterpart of build_graph — MCP discovery is awaited directly on
+    the caller's event loop instead of being bridged through asyncio.run."""
+    import warnings
+
+    if os.path.exists(MCP_CONFIG_PATH):
+        try:
+            mcp_tools = await _init_mcp_tools()
+            all_tools = LOCAL_TOOLS + list(mcp_tools)
+            return await _acompile_graph(all_tools, _make_atriage_agent_node(all_tools))
+        except Exception as e:
+            warnings.warn(
+                f"MCP tool discovery failed ({type(e).__name__}: {e}). "
+                "Falling back to local-only tools (search_hospital_policy, "
+                "get_patient_history, get_available_slots).",
+                stacklevel=2,
+            )
+    else:
+        warnings.warn(
+            f"MCP config not found at {MCP_CONFIG_PATH}. "
+            "Using local-only tools.",
+            stacklevel=2,
+        )
+
+    return await _acompile_graph(TRIAGE_TOOLS, atriage_agent_node)
+
+
 # ---------------------------------------------------------------------------
 # Fallback (no LangGraph / import error)
 # ---------------------------------------------------------------------------
@@ -316,11 +479,146 @@ def _run_fallback(patient_message: str, patient_id: str = "") -> tuple[dict[str,
 # ---------------------------------------------------------------------------
 
 def _get_compiled():
-    """Lazy-build and cache the compiled graph."""
-    global _compiled
-    if _compiled is None:
-        _compiled = build_graph()
-    return _compiled
+    """Lazy-build and cache the compiled graph (once, even under concurrent first calls)."""
+    return _compiled.get()
+
+
+async def _aget_compiled():
+    """Lazy-build and cache the async graph for the running event loop.
+
+    Concurrent first callers on the same loop await one shared build task,
+    so the graph is compiled (and MCP discovered) once per loop.
+    """
+    loop = asyncio.get_running_loop()
+    task = _acompiled.get(loop)
+    if task is None or (task.done() and (task.cancelled() or task.exception() is not None)):
+        task = loop.create_task(abuild_graph())
+        _acompiled[loop] = task
+    return await task
+
+
+def _new_ephemeral_saver():
+    from graph.checkpoint_store import EphemeralSaver
+    return EphemeralSaver()
+
+
+def _get_ephemeral_saver():
+    return _ephemeral_saver.get()
+
+
+def ephemeral_app(app):
+    """Copy of a compiled graph that checkpoints to the in-memory EphemeralSaver."""
+    eph = _ephemeral_apps.get(app)
+    if eph is None:
+        eph = _ephemeral_apps[app] = app.copy(update={"checkpointer": _get_ephemeral_saver()})
+    return eph
+
+
+def finish_ephemeral_run(thread_id: str, app=None) -> bool:
+    """End an ephemeral run of thread_id on app (the durable graph, default
+    the cached sync graph).
+
+    If the run paused (a checklist interrupt or communication_node is next),
+    its latest checkpoint is promoted to app's checkpointer so resume_chat /
+    resume_workflow continue it; otherwise the in-memory thread is dropped.
+    Returns True if the thread was promoted. If promotion fails (e.g. the
+    SQLite store is locked or full) the error is raised, and the in-memory
+    copy is dropped all the same so no patient data stays behind.
+    """
+    if app is None:
+        app = _get_compiled()
+    saver = _get_ephemeral_saver()
+    config = {"configurable": {"thread_id": thread_id}}
+    try:
+        snapshot = ephemeral_app(app).get_state(config)
+        if snapshot and snapshot.next:
+            return saver.promote(thread_id, app.checkpointer)
+        return False
+    finally:
+        saver.discard(thread_id)
+
+
+async def afinish_ephemeral_run(thread_id: str, app=None) -> bool:
+    """Async counterpart of finish_ephemeral_run (default: this loop's async graph)."""
+    if app is None:
+        app = await _aget_compiled()
+    saver = _get_ephemeral_saver()
+    config = {"configurable": {"thread_id": thread_id}}
+    try:
+        snapshot = await ephemeral_app(app).aget_state(config)
+        if snapshot and snapshot.next:
+            return await saver.apromote(thread_id, app.checkpointer)
+        return False
+    finally:
+        saver.discard(thread_id)
+
+
+def _warn_not_promoted(thread_id: str, error: Exception) -> None:
+    # Triage already ran: its result (pending_review if the thread paused) is
+    # returned instead of re-running it, but the thread cannot be resumed
+    import warnings
+    warnings.warn(
+        f"Could not persist paused thread {thread_id} ({type(error).__name__}: {error}); "
+        "its result is returned but the thread cannot be resumed.",
+        stacklevel=3,
+    )
+
+
+def _initial_state(
+    msg: str,
+    patient_id: str = "",
+    patient_email: str = "",
+    file_uri: str = "",
+    file_mime_type: str = "",
+    file_name: str = "",
+    safety_result: dict | None = None,
+    patient_name: str = "",
+) -> TriageWorkflowState:
+    """Seed state with the patient message as the first HumanMessage.
+
+    safety_result carries a text screen already run by the job queue so
+    safety_node does not repeat it. A base64 data URI in file_uri is moved
+    to the blob store so checkpoints carry only its reference.
+    """
+    from graph.blob_store import to_blob_ref
+
+    state: TriageWorkflowState = {
+        "message": msg,
+        "patient_id": patient_id or "",
+        "patient_email": patient_email or "",
+        "messages": [HumanMessage(content=msg)],
+        "is_emergency": False,
+        "staff_approved": False,
+        "is_complete": False,
+        "file_uri": to_blob_ref(file_uri) or None,
+        "file_mime_type": file_mime_type or None,
+        "file_name": file_name or None,
+    }
+    if safety_result:
+        state["safety_result"] = safety_result
+    if patient_name:
+        state["patient_name"] = patient_name
+    return state
+
+
+def _results_from_final(final: dict, thread_id: str) -> tuple[dict[str, Any], dict[str, Any]]:
+    """Shape the final graph state into (safety_result, triage_result) for the UI."""
+    safety_result = final.get("safety_result") or {}
+    triage_result = final.get("triage_result") or {}
+
+    # Embed the thread_id and hitl_status into triage_result for the UI
+    triage_result["thread_id"] = thread_id
+
+    # Determine if workflow was interrupted (no hitl_status means it paused before communication_node)
+    hitl_status = final.get("hitl_status")
+    if hitl_status:
+        triage_result["hitl_status"] = hitl_status
+    else:
+        # Workflow was interrupted before communication_node (NORMAL/HIGH/EMERGENCY)
+        triage_result["hitl_status"] = "pending_review"
+        triage_result["draft_reply"] = final.get("draft_reply", "")
+
+    return safety_result, triage_result
 
 
 def run_triage_workflow(
@@ -328,6 +626,8 @@ def run_triage_workflow(
     patient_id: str = "",
     patient_email: str = "",
     thread_id: str = "",
+    ephemeral: bool | None = None,
+    patient_name: str = "",
 ) -> tuple[dict[str, Any], dict[str, Any]]:
     """
     Run the full agentic workflow with persistence and HITL support.
@@ -340,6 +640,10 @@ def run_triage_workflow(
 
     For NORMAL/HIGH/EMERGENCY urgency, the workflow pauses before communication_node.
     Staff should use resume_workflow() to continue after review.
+
+    ephemeral (default EPHEMERAL_RUNS) checkpoints in memory and persists the
+    thread only if it pauses. patient_name (optional) personalizes templated
+    LOW-urgency replies.
     """
     msg = (patient_message or "").strip()
 
@@ -354,38 +658,80 @@ def run_triage_workflow(
 
     config = {"configurable": {"thread_id": thread_id}}
 
-    # Seed the state with the patient message as the first HumanMessage
-    initial: TriageWorkflowState = {
-        "message": msg,
-        "patient_id": patient_id or "",
-        "patient_email": patient_email or "",
-        "messages": [HumanMessage(content=msg)],
-        "is_emergency": False,
-        "staff_approved": False,
-    }
+    initial = _initial_state(msg, patient_id, patient_email, patient_name=patient_name)
+    if ephemeral is None:
+        ephemeral = EPHEMERAL_RUNS
 
     try:
-        final = app.invoke(initial, config)
+        if ephemeral:
+            try:
+                final = ephemeral_app(app).invoke(initial, config)
+            except Exception:
+                _get_ephemeral_saver().discard(thread_id)
+                raise
+        else:
+            final = app.invoke(initial, config)
     except Exception:
         # If LangGraph fails entirely, fall back
         return _run_fallback(msg, patient_id)
 
-    safety_result = final.get("safety_result") or {}
-    triage_result = final.get("triage_result") or {}
+    if ephemeral:
+        try:
+            finish_ephemeral_run(thread_id, app)
+        except Exception as e:
+            _warn_not_promoted(thread_id, e)
 
-    # Embed the thread_id and hitl_status into triage_result for the UI
-    triage_result["thread_id"] = thread_id
+    return _results_from_final(final, thread_id)
 
-    # Determine if workflow was interrupted (no hitl_status means it paused before communication_node)
-    hitl_status = final.get("hitl_status")
-    if hitl_status:
-        triage_result["hitl_status"] = hitl_status
-    else:
-        # Workflow was interrupted before communication_node (NORMAL/HIGH/EMERGENCY)
-        triage_result["hitl_status"] = "pending_review"
-        triage_result["draft_reply"] = final.get("draft_reply", "")
 
-    return safety_result, triage_result
+async def arun_triage_workflow(
+    patient_message: str,
+    patient_id: str = "",
+    patient_email: str = "",
+    thread_id: str = "",
+    ephemeral: bool | None = None,
+    patient_name: str = "",
+) -> tuple[dict[str, Any], dict[str, Any]]:
+    """Async counterpart of run_triage_workflow (same return shape and
+    ephemeral option).
+
+    Runs on the async graph via ainvoke; the fallback path runs in a worker
+    thread because the Sprint 1 agents are sync.
+    """
+    msg = (patient_message or "").strip()
+
+    try:
+        app = await _aget_compiled()
+    except ImportError:
+        return await asyncio.to_thread(_run_fallback, msg, patient_id)
+
+    if not thread_id:
+        thread_id = str(uuid.uuid4())
+
+    config = {"configurable": {"thread_id": thread_id}}
+    initial = _initial_state(msg, patient_id, patient_email, patient_name=patient_name)
+    if ephemeral is None:
+        ephemeral = EPHEMERAL_RUNS
+
+    try:
+        if ephemeral:
+            try:
+                final = await ephemeral_app(app).ainvoke(initial, config)
+            except Exception:
+                _get_ephemeral_saver().discard(thread_id)
+                raise
+        else:
+            final = await app.ainvoke(initial, config)
+    except Exception:
+        return await asyncio.to_thread(_run_fallback, msg, patient_id)
+
+    if ephemeral:
+        try:
+            await afinish_ephemeral_run(thread_id, app)
+        except Exception as e:
+            _warn_not_promoted(thread_id, e)
+
+    return _results_from_final(final, thread_id)
 
 
 def get_workflow_state(thread_id: str) -> dict[str, Any] | None:
@@ -405,6 +751,19 @@ def get_workflow_state(thread_id: str) -> dict[str, Any] | None:
         return None
 
 
+async def aget_workflow_state(thread_id: str) -> dict[str, Any] | None:
+    """Async counterpart of get_workflow_state."""
+    try:
+        app = await _aget_compiled()
+        config = {"configurable": {"thread_id": thread_id}}
+        state = await app.aget_state(config)
+        if state and state.values:
+            return dict(state.values)
+        return None
+    except Exception:
+        return None
+
+
 def stream_triage_workflow(
     patient_message: str,
     patient_id: str = "",
@@ -413,33 +772,58 @@ def stream_triage_workflow(
     file_uri: str = "",
     file_mime_type: str = "",
     file_name: str = "",
+    ephemeral: bool = False,
 ):
     """
     Prepare a streaming triage workflow.
 
     Returns (app, initial_state, config, thread_id) — the caller drives
     app.stream(initial_state, config, stream_mode="messages").
+
+    With ephemeral=True the returned app checkpoints in memory; the caller
+    reads the final state from it and then calls finish_ephemeral_run(thread_id).
     """
     app = _get_compiled()
+    if ephemeral:
+        app = ephemeral_app(app)
     msg = (patient_message or "").strip()
 
     if not thread_id:
         thread_id = str(uuid.uuid4())
 
     config = {"configurable": {"thread_id": thread_id}}
+    initial = _initial_state(msg, patient_id, patient_email, file_uri, file_mime_type, file_name)
 
-    initial: TriageWorkflowState = {
-        "message": msg,
-        "patient_id": patient_id or "",
-        "patient_email": patient_email or "",
-        "messages": [HumanMessage(content=msg)],
-        "is_emergency": False,
-        "staff_approved": False,
-        "is_complete": False,
-        "file_uri": file_uri or None,
-        "file_mime_type": file_mime_type or None,
-        "file_name": file_name or None,
-    }
+    return app, initial, config, thread_id
+
+
+async def astream_triage_workflow(
+    patient_message: str,
+    patient_id: str = "",
+    patient_email: str = "",
+    thread_id: str = "",
+    file_uri: str = "",
+    file_mime_type: str = "",
+    file_name: str = "",
+    ephemeral: bool = False,
+):
+    """
+    Async counterpart of stream_triage_workflow.
+
+    Returns (app, initial_state, config, thread_id) — the caller drives
+    app.astream(initial_state, config, stream_mode="messages"), e.g. via
+    app.streaming.astream_graph, then afinish_ephemeral_run if ephemeral.
+    """
+    app = await _aget_compiled()
+    if ephemeral:
+        app = ephemeral_app(app)
+    msg = (patient_message or "").strip()
+
+    if not thread_id:
+        thread_id = str(uuid.uuid4())
+
+    config = {"configurable": {"thread_id": thread_id}}
+    initial = _initial_state(msg, patient_id, patient_email, file_uri, file_mime_type, file_name)
 
     return app, initial, config, thread_id
 
@@ -456,6 +840,13 @@ def resume_chat(thread_id: str, patient_answer: str):
     return app, Command(resume=patient_answer), config
 
 
+async def aresume_chat(thread_id: str, patient_answer: str):
+    """Async counterpart of resume_chat — the caller drives app.astream(...)."""
+    app = await _aget_compiled()
+    config = {"configurable": {"thread_id": thread_id}}
+    return app, Command(resume=patient_answer), config
+
+
 def resume_workflow(
     thread_id: str,
     edited_draft: str | None = None,
@@ -485,3 +876,37 @@ def resume_workflow(
     triage_result["hitl_status"] = final.get("hitl_status", "approved")
 
     return safety_result, triage_result
+
+
+def close_workflow(thread_id: str, hitl_status: str = "dismissed") -> None:
+    """
+    Mark a pending-review thread as resolved outside the graph (staff dismissed
+    it or routed the patient to the ER) without running communication_node.
+
+    The thread stays resumable, but checkpoint retention now treats it as
+    finished (see graph/retention.py).
+    """
+    app = _get_compiled()
+    config = {"configurable": {"thread_id": thread_id}}
+    app.update_state(config, {"hitl_status": hitl_status})
+
+
+async def aresume_workflow(
+    thread_id: str,
+    edited_draft: str | None = None,
+) -> tuple[dict[str, Any], dict[str, Any]]:
+    """Async counterpart of resume_workflow (same return shape)."""
+    app = await _aget_compiled()
+    config = {"configurable": {"thread_id": thread_id}}
+
+    if edited_draft is not None:
+        await app.aupdate_state(config, {"draft_reply": edited_draft})
+
+    final = await app.ainvoke(None, config)
+
+    safety_result = final.get("safety_result") or {}
+    triage_result = final.get("triage_result") or {}
+    triage_result["thread_id"] = thread_id
+    triage_result["hitl_status"] = final.get("hitl_status", "approved")
+
+    return safety_result, triage_result
@@ -5,28 +5,32 @@ Uses existing Supabase configuration; isolated for agent/MCP use.
 import os
 from typing import List
 
+from graph.lazy_init import LazyInit
+
 try:
     from dotenv import load_dotenv
     load_dotenv()
 except ImportError:
     pass
 
-_supabase = None
-
 
-def _get_supabase():
-    """Lazy Supabase client (service role preferred for staff-facing tools)."""
-    global _supabase
-    if _supabase is not None:
-        return _supabase
+def _new_supabase():
     url = os.environ.get("SUPABASE_URL")
     key = os.environ.get("SUPABASE_SERVICE_ROLE_KEY") or os.environ.get("SUPABASE_ANON_KEY")
     if not url or not key:
         return None
+    from supabase import create_client
+    return create_client(url, key)
+
+
+_supabase = LazyInit(_new_supabase, name="Supabase tools client")
+
+
+def _get_supabase():
+    """Lazy Supabase client (service role preferred for staff-facing tools).
+    None when not configured or unavailable (failures are retried with backoff)."""
     try:
-        from supabase import create_client
-        _supabase = create_client(url, key)
-        return _supabase
+        return _supabase.get()
     except Exception:
         return None
 
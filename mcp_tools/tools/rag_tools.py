@@ -7,19 +7,40 @@ module. This local wrapper is retained as a fallback for when the MCP server is
 unavailable — the graph builder will include search_hospital_policy from
 graph/nodes.py in TRIAGE_TOOLS automatically.
 
-Wraps get_relevant_policy from agents/policy_agent for agent/MCP use.
+Wraps get_relevant_policy (and get_relevant_policy_batch for several queries
+in one call) from agents/policy_agent for agent/MCP use.
 ChromaDB initialization is lazy-loaded in agents/policy_agent.
 """
-from typing import List
+from typing import List, Optional
 
 
-def search_hospital_policy(query: str, top_k: int = 3) -> List[str]:
+def search_hospital_policy(query: str, top_k: int = 3, department: Optional[str] = None) -> List[str]:
     """
     RAG search: wrap get_relevant_policy from policy_agent.
-    Input: query string. Returns top_k (default 3) chunks from ChromaDB.
+    Input: query string, optionally a department / queue name (e.g. "Pharmacy")
+    to search only that department's policies. Returns top_k (default 3)
+    chunks from ChromaDB.
     """
     try:
         from agents.policy_agent import get_relevant_policy
-        return get_relevant_policy(query, "", top_k=top_k)
+        from agents.policy_scope import policy_where
+        return get_relevant_policy(query, "", top_k=top_k, where=policy_where(department=department))
     except Exception:
         return []
+
+
+def search_hospital_policies(
+    queries: List[str], top_k: int = 3, department: Optional[str] = None,
+) -> List[List[str]]:
+    """
+    Batched RAG search: wrap get_relevant_policy_batch from policy_agent.
+    Input: list of query strings, optionally a department as in
+    search_hospital_policy. Returns one list of up to top_k chunks per query;
+    a chunk is listed only under the first query that retrieves it.
+    """
+    try:
+        from agents.policy_agent import get_relevant_policy_batch
+        from agents.policy_scope import policy_where
+        return get_relevant_policy_batch(queries, top_k=top_k, where=policy_where(department=department))
+    except Exception:
+        return [[] for _ in queries]
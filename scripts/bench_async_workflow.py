@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Concurrency benchmark — thread-per-request vs async workflow entry points.
+
+Runs the same set of messages through the triage workflow twice at equal
+concurrency: once with ``run_triage_workflow`` on a thread pool (one blocked
+OS thread per in-flight conversation) and once with ``arun_triage_workflow``
+driven from a single event loop. Reports wall time, throughput, latency
+percentiles and peak OS thread count for each mode.
+
+Usage:
+    python scripts/bench_async_workflow.py                        # 20 messages, concurrency 10
+    python scripts/bench_async_workflow.py --limit 100 --concurrency 50
+    python scripts/bench_async_workflow.py --mode async           # one mode only
+
+Requires LLM_GEMINI_API_KEY — this exercises the real graph end to end.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+DEFAULT_DATASET = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "tests",
+    "eval_dataset.json",
+)
+
+
+class _ThreadSampler:
+    """Samples threading.active_count() in the background to find the peak."""
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.peak = threading.active_count()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, threading.active_count())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+def _percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+def run_threaded(messages, concurrency):
+    from graph.workflow import run_triage_workflow
+
+    def _one(msg):
+        start = time.perf_counter()
+        run_triage_workflow(msg, patient_id="PAT-BENCH")
+        return time.perf_counter() - start
+
+    with _ThreadSampler() as sampler:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            latencies = list(pool.map(_one, messages))
+        wall = time.perf_counter() - start
+    return latencies, wall, sampler.peak
+
+
+def run_async(messages, concurrency):
+    from graph.workflow import arun_triage_workflow
+
+    async def _main():
+        sem = asyncio.Semaphore(concurrency)
+
+        async def _one(msg):
+            async with sem:
+                start = time.perf_counter()
+                await arun_triage_workflow(msg, patient_id="PAT-BENCH")
+                return time.perf_counter() - start
+
+        return await asyncio.gather(*(_one(m) for m in messages))
+
+    with _ThreadSampler() as sampler:
+        start = time.perf_counter()
+        latencies = asyncio.run(_main())
+        wall = time.perf_counter() - start
+    return list(latencies), wall, sampler.peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TriageAI thread vs async concurrency benchmark")
+    parser.add_argument("--dataset", default=DEFAULT_DATASET, help="Path to dataset JSON")
+    parser.add_argument("--limit", type=int, default=20, help="Messages per mode (default: 20)")
+    parser.add_argument("--concurrency", type=int, default=10, help="In-flight conversations (default: 10)")
+    parser.add_argument("--mode", choices=["both", "threads", "async"], default="both")
+    args = parser.parse_args()
+
+    with open(args.dataset) as f:
+        dataset = json.load(f)
+    messages = [item["message"] for item in dataset]
+    while len(messages) < args.limit:
+        messages += messages
+    messages = messages[:args.limit]
+
+    print(f"\n{'=' * 60}")
+    print("TriageAI concurrency benchmark")
+    print(f"{'=' * 60}")
+    print(f"Messages: {len(messages)} | Concurrency: {args.concurrency}\n")
+
+    modes = []
+    if args.mode in ("both", "threads"):
+        modes.append(("threads", run_threaded))
+    if args.mode in ("both", "async"):
+        modes.append(("async", run_async))
+
+    print(f"  {'mode':<10}{'wall_s':>9}{'msg/min':>10}{'p50_s':>8}{'p95_s':>8}{'peak_threads':>14}")
+    for name, runner in modes:
+        latencies, wall, peak = runner(messages, args.concurrency)
+        throughput = len(messages) / wall * 60 if wall else 0.0
+        print(f"  {name:<10}{wall:>9.1f}{throughput:>10.1f}"
+              f"{_percentile(latencies, 0.5):>8.1f}{_percentile(latencies, 0.95):>8.1f}{peak:>14}")
+    print(f"{'=' * 60}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Attachment checkpoint benchmark — base64 data URI vs blob store reference.
+
+Runs one triage-shaped thread (the workflow's node sequence over
+TriageWorkflowState, no LLM calls) per mode against a fresh checkpoint DB and
+reports checkpoint + pending-write bytes for the thread:
+
+  none      no attachment
+  data-uri  legacy: the base64 data URI itself lives in state
+  blob-ref  current: the file is in graph.blob_store and state holds its ref
+
+Usage:
+    python scripts/bench_attachments.py                   # 5MB attachment
+    python scripts/bench_attachments.py --size-mb 1
+"""
+import argparse
+import base64
+import os
+import sqlite3
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.messages import AIMessage
+from langgraph.graph import END, START, StateGraph
+
+from graph.blob_store import BlobStore
+from graph.checkpoint_store import PooledSqliteSaver
+from graph.state import TriageWorkflowState
+
+NODES = ["safety_node", "triage_agent_node", "synthesis_node", "draft_reply_node", "checklist_gate", "communication_node"]
+
+
+def _build_graph(checkpointer):
+    def _node(name):
+        def _run(state):
+            return {"messages": [AIMessage(content=f"{name} done")]}
+        return _run
+
+    graph = StateGraph(TriageWorkflowState)
+    prev = START
+    for name in NODES:
+        graph.add_node(name, _node(name))
+        graph.add_edge(prev, name)
+        prev = name
+    graph.add_edge(prev, END)
+    return graph.compile(checkpointer=checkpointer)
+
+
+def _thread_bytes(path: str, thread_id: str) -> tuple[int, int, int]:
+    conn = sqlite3.connect(path)
+    try:
+        n, cp = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(checkpoint)), 0) FROM checkpoints WHERE thread_id = ?",
+            (thread_id,),
+        ).fetchone()
+        wr = conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(value)), 0) FROM writes WHERE thread_id = ?", (thread_id,)
+        ).fetchone()[0]
+    finally:
+        conn.close()
+    return n, cp, wr
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TriageAI attachment checkpoint benchmark")
+    parser.add_argument("--size-mb", type=float, default=5.0, help="Attachment size in MB (default: 5)")
+    args = parser.parse_args()
+
+    raw = os.urandom(int(args.size_mb * 1024 * 1024))
+    data_uri = "data:image/jpeg;base64," + base64.b64encode(raw).decode("ascii")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        blobs = BlobStore(os.path.join(tmp, "blobs"))
+        path = os.path.join(tmp, "checkpoints.db")
+        app = _build_graph(PooledSqliteSaver(path))
+        modes = {"none": None, "data-uri": data_uri, "blob-ref": blobs.put(raw)}
+
+        print(f"\n{'=' * 64}")
+        print(f"Attachment checkpoint benchmark — {args.size_mb:g}MB image")
+        print(f"{'=' * 64}")
+        print(f"  {'mode':<10}{'checkpoints':>12}{'checkpoint_MB':>15}{'writes_MB':>11}{'total_MB':>10}")
+        for mode, file_uri in modes.items():
+            state = {"message": "Rash on my arm, photo attached", "messages": [], "file_uri": file_uri,
+                     "file_mime_type": "image/jpeg" if file_uri else None}
+            app.invoke(state, {"configurable": {"thread_id": mode}})
+            n, cp, wr = _thread_bytes(path, mode)
+            print(f"  {mode:<10}{n:>12}{cp / 1e6:>15.2f}{wr / 1e6:>11.2f}{(cp + wr) / 1e6:>10.2f}")
+        print(f"\n  Blob store on disk: {blobs.size(modes['blob-ref']) / 1e6:.2f}MB (written once)")
+        print(f"{'=' * 64}\n")
+
+
+if __name__ == "__main__":
+    main()
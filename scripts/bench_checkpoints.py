@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Checkpoint store benchmark — shared SqliteSaver vs PooledSqliteSaver.
+
+Runs N parallel triage-shaped threads (six nodes, each appending a ~1KB
+message to state, with a simulated LLM delay) against a fresh checkpoint
+database and reports checkpoint write latency and lock-wait time for:
+
+  shared  — the previous setup: one sqlite3 connection shared by every
+            thread behind SqliteSaver's lock, default rollback journal.
+  pooled  — graph.checkpoint_store.PooledSqliteSaver (WAL, synchronous=NORMAL,
+            busy_timeout, pooled connections).
+
+No LLM calls are made, so the numbers isolate the checkpoint layer.
+
+Usage:
+    python scripts/bench_checkpoints.py                       # 16 threads x 10 runs
+    python scripts/bench_checkpoints.py --threads 64 --runs 5 --node-ms 5
+    python scripts/bench_checkpoints.py --pool-size 4 --synchronous FULL
+"""
+import argparse
+import operator
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Annotated, TypedDict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.sqlite import SqliteSaver
+from langgraph.graph import END, START, StateGraph
+
+from graph.checkpoint_store import PooledSqliteSaver, _Metrics
+
+NODES = ["safety", "triage_agent", "tools", "synthesis", "draft_reply", "communication"]
+
+
+class _BenchState(TypedDict):
+    messages: Annotated[list, operator.add]
+    step: int
+
+
+class _TimedSqliteSaver(SqliteSaver):
+    """Stock SqliteSaver with the same write/lock-wait instrumentation."""
+
+    def __init__(self, conn):
+        super().__init__(conn)
+        self.metrics = _Metrics()
+
+    @contextmanager
+    def cursor(self, transaction: bool = True):
+        requested = time.perf_counter()
+        with self.lock:
+            locked = time.perf_counter()
+            self.setup()
+            cur = self.conn.cursor()
+            try:
+                yield cur
+            finally:
+                if transaction:
+                    self.conn.commit()
+                cur.close()
+        if transaction:
+            self.metrics.record(locked - requested, time.perf_counter() - requested)
+
+
+def _build_graph(checkpointer, node_s: float):
+    filler = "x" * 1000
+
+    def _node(name):
+        def _run(state):
+            time.sleep(node_s)
+            return {"messages": [AIMessage(content=f"{name}: {filler}")], "step": state["step"] + 1}
+        return _run
+
+    graph = StateGraph(_BenchState)
+    prev = START
+    for name in NODES:
+        graph.add_node(name, _node(name))
+        graph.add_edge(prev, name)
+        prev = name
+    graph.add_edge(prev, END)
+    return graph.compile(checkpointer=checkpointer)
+
+
+def run_mode(mode: str, args) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "checkpoints.db")
+        if mode == "shared":
+            saver = _TimedSqliteSaver(sqlite3.connect(path, check_same_thread=False))
+            saver.setup()
+            # SqliteSaver.setup enables WAL; the previous deployment ran on the
+            # rollback journal, so restore it for a like-for-like baseline.
+            saver.conn.execute("PRAGMA journal_mode=DELETE")
+        else:
+            saver = PooledSqliteSaver(path, pool_size=args.pool_size, synchronous=args.synchronous)
+        app = _build_graph(saver, args.node_ms / 1000)
+
+        def _worker(i):
+            for j in range(args.runs):
+                config = {"configurable": {"thread_id": f"bench-{i}-{j}"}}
+                app.invoke({"messages": [HumanMessage(content="refill please")], "step": 0}, config)
+                app.get_state(config)
+
+        threads = [threading.Thread(target=_worker, args=(i,)) for i in range(args.threads)]
+        start = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        wall = time.perf_counter() - start
+        stats = saver.metrics.snapshot()
+        if mode == "shared":
+            saver.conn.close()
+        else:
+            saver.close()
+    stats["wall_s"] = wall
+    stats["runs_per_s"] = args.threads * args.runs / wall if wall else 0.0
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TriageAI checkpoint store benchmark")
+    parser.add_argument("--threads", type=int, default=16, help="Parallel triage threads (default: 16)")
+    parser.add_argument("--runs", type=int, default=10, help="Workflow runs per thread (default: 10)")
+    parser.add_argument("--node-ms", type=float, default=10.0, help="Simulated work per node (default: 10ms)")
+    parser.add_argument("--pool-size", type=int, default=8, help="Pooled connections (default: 8)")
+    parser.add_argument("--synchronous", default="NORMAL", choices=["OFF", "NORMAL", "FULL"])
+    parser.add_argument("--mode", choices=["both", "shared", "pooled"], default="both")
+    args = parser.parse_args()
+
+    modes = ["shared", "pooled"] if args.mode == "both" else [args.mode]
+
+    print(f"\n{'=' * 78}")
+    print("Checkpoint store benchmark")
+    print(f"{'=' * 78}")
+    print(f"Threads: {args.threads} | runs/thread: {args.runs} | node work: {args.node_ms:.0f}ms | "
+          f"pool: {args.pool_size} | synchronous: {args.synchronous}\n")
+    print(f"  {'mode':<8}{'writes':>8}{'runs/s':>9}{'write p50':>11}{'write p95':>11}"
+          f"{'wait p50':>10}{'wait p95':>10}{'wait max':>10}")
+    for mode in modes:
+        s = run_mode(mode, args)
+        ms = lambda v: f"{v * 1000:.2f}ms"
+        print(f"  {mode:<8}{s['writes']:>8}{s['runs_per_s']:>9.1f}"
+              f"{ms(s['write_s']['p50']):>11}{ms(s['write_s']['p95']):>11}"
+              f"{ms(s['lock_wait_s']['p50']):>10}{ms(s['lock_wait_s']['p95']):>10}{ms(s['lock_wait_s']['max']):>10}")
+    print(f"{'=' * 78}\n")
+
+
+if __name__ == "__main__":
+    main()
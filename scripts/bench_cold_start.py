@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Cold-start benchmark — time to a compiled graph in a fresh process.
+
+Each mode runs in a new Python process and times build_graph() (what the
+first request pays after a restart), excluding interpreter and import time:
+
+  local-only  the local-tool graph (no MCP discovery)
+  mcp-cold    MCP servers from mcp_config.json with an empty tool cache:
+              start the servers and list their tools before compiling
+  mcp-cached  the same with the tool cache the cold run wrote: compile from
+              cached schemas while the servers start in the background
+
+The MCP modes set MCP_LOCAL_FASTPATH=0 so the Chroma server goes through the
+pool instead of being served in-process.
+
+Usage:
+    python scripts/bench_cold_start.py
+    python scripts/bench_cold_start.py --runs 5
+
+Run from the project root (mcp_config.json uses a relative --data-dir).
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_CHILD = """
+import json, sys, time, warnings
+sys.path.insert(0, {root!r})
+from graph import workflow
+build = workflow._build_graph_local_only if {local_only!r} else workflow.build_graph
+with warnings.catch_warnings(record=True) as caught:
+    warnings.simplefilter("always")
+    start = time.perf_counter()
+    app = build()
+    elapsed = time.perf_counter() - start
+tools = sorted(app.get_graph().nodes["tool_node"].data.tools_by_name)
+print(json.dumps({{"seconds": elapsed, "tools": len(tools), "fallback": bool(caught)}}))
+"""
+
+
+def _run(local_only: bool, env: dict) -> dict:
+    out = subprocess.run(
+        [sys.executable, "-c", _CHILD.format(root=PROJECT_ROOT, local_only=local_only)],
+        env=env, cwd=PROJECT_ROOT, capture_output=True, text=True, check=True,
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TriageAI cold-start benchmark")
+    parser.add_argument("--runs", type=int, default=3, help="Fresh processes per mode (default: 3)")
+    args = parser.parse_args()
+
+    results: dict[str, list[dict]] = {"local-only": [], "mcp-cold": [], "mcp-cached": []}
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = os.path.join(tmp, "mcp_tool_cache.json")
+        env = {**os.environ, "MCP_LOCAL_FASTPATH": "0", "MCP_TOOL_CACHE": cache, "MCP_HEALTH_INTERVAL_S": "0"}
+        for _ in range(args.runs):
+            results["local-only"].append(_run(True, env))
+            if os.path.exists(cache):
+                os.remove(cache)
+            results["mcp-cold"].append(_run(False, env))
+            results["mcp-cached"].append(_run(False, env))
+
+    print(f"\n{'=' * 58}")
+    print(f"Cold-start benchmark — build_graph() in a fresh process x{args.runs}")
+    print(f"{'=' * 58}")
+    print(f"  {'mode':<12}{'median_ms':>12}{'max_ms':>10}{'tools':>8}{'fallback':>10}")
+    for mode, runs in results.items():
+        seconds = sorted(r["seconds"] for r in runs)
+        print(f"  {mode:<12}{seconds[len(seconds) // 2] * 1e3:>12.0f}{seconds[-1] * 1e3:>10.0f}"
+              f"{runs[-1]['tools']:>8}{sum(r['fallback'] for r in runs):>10}")
+    print("\n  fallback: runs that fell back to local tools")
+    print(f"{'=' * 58}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+MCP tool-call benchmark — per-call sessions vs the warm session pool.
+
+Calls one MCP tool from mcp_config.json through:
+
+  per-call  MultiServerMCPClient.get_tools(): every call starts a new session
+            (a new chroma-mcp-server process with the stdio transport)
+  pooled    graph.mcp_pool.MCPSessionPool with --pool-size warm processes
+
+and reports latency percentiles for sequential calls and wall time for a
+burst of --concurrency parallel calls.
+
+Usage:
+    python scripts/bench_mcp_tools.py                            # chroma_query_documents
+    python scripts/bench_mcp_tools.py --calls 50 --concurrency 16
+    python scripts/bench_mcp_tools.py --tool chroma_list_collections --args '{}'
+
+Run from the project root (mcp_config.json uses a relative --data-dir).
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from graph.mcp_pool import MCPSessionPool
+from graph.workflow import MCP_CONFIG_PATH
+
+DEFAULT_ARGS = {"collection_name": "hospital_policies", "query_texts": ["prescription refill"], "n_results": 3}
+
+
+def _pct(values: list[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * q))]
+
+
+async def _measure(tool, args: dict, calls: int, concurrency: int) -> dict:
+    latencies = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        await tool.ainvoke(args)
+        latencies.append(time.perf_counter() - start)
+    start = time.perf_counter()
+    await asyncio.gather(*(tool.ainvoke(args) for _ in range(concurrency)))
+    burst = time.perf_counter() - start
+    return {"p50": _pct(latencies, 0.5), "p95": _pct(latencies, 0.95), "burst": burst}
+
+
+def _find(tools, name: str):
+    for tool in tools:
+        if tool.name == name:
+            return tool
+    sys.exit(f"Tool {name!r} not found; available: {', '.join(t.name for t in tools)}")
+
+
+async def _per_call(config: dict, name: str, args: dict, calls: int, concurrency: int) -> dict:
+    from langchain_mcp_adapters.client import MultiServerMCPClient
+
+    tools = await MultiServerMCPClient(config).get_tools()
+    return await _measure(_find(tools, name), args, calls, concurrency)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TriageAI MCP tool-call benchmark")
+    parser.add_argument("--tool", default="chroma_query_documents", help="MCP tool to call")
+    parser.add_argument("--args", default=json.dumps(DEFAULT_ARGS), help="Tool arguments as JSON")
+    parser.add_argument("--calls", type=int, default=20, help="Sequential calls per mode (default: 20)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Parallel calls in the burst (default: 8)")
+    parser.add_argument("--pool-size", type=int, default=2, help="Warm processes per server (default: 2)")
+    args = parser.parse_args()
+
+    with open(MCP_CONFIG_PATH) as f:
+        config = json.load(f)
+    tool_args = json.loads(args.args)
+
+    results = {"per-call": asyncio.run(_per_call(config, args.tool, tool_args, args.calls, args.concurrency))}
+
+    start = time.perf_counter()
+    pool = MCPSessionPool(config, size=args.pool_size).start()
+    startup = time.perf_counter() - start
+    try:
+        tool = _find(pool.get_tools(), args.tool)
+        results["pooled"] = asyncio.run(_measure(tool, tool_args, args.calls, args.concurrency))
+    finally:
+        pool.close()
+
+    print(f"\n{'=' * 60}")
+    print(f"MCP tool-call benchmark — {args.tool}")
+    print(f"{'=' * 60}")
+    print(f"{args.calls} sequential calls + burst of {args.concurrency} | pool: {args.pool_size} processes "
+          f"(started in {startup:.1f}s)\n")
+    print(f"  {'mode':<10}{'p50_ms':>10}{'p95_ms':>10}{'burst_s':>10}")
+    for mode, m in results.items():
+        print(f"  {mode:<10}{m['p50'] * 1e3:>10.1f}{m['p95'] * 1e3:>10.1f}{m['burst']:>10.2f}")
+    print(f"{'=' * 60}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Policy cache benchmark — repeated staff-view renders with and without the cache.
+
+Simulates the staff dashboard: each render of a selected message calls
+get_relevant_policy twice (draft reply and next steps). Clicks re-render, so
+--renders passes over --messages distinct messages, with the retrieval cache
+off (POLICY_CACHE_SIZE=0 behaviour) and on.
+
+Usage:
+    python scripts/seed_policy.py                    # once, if the store is empty
+    python scripts/bench_policy_cache.py
+    python scripts/bench_policy_cache.py --renders 20 --messages 10
+    python scripts/bench_policy_cache.py --stub-embeddings   # offline: temp store, hash embeddings
+
+Run from the project root.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents import policy_agent
+from agents.policy_cache import PolicyCache
+from tests.policy_stub import HashEmbeddings, create_stub_collection, point_policy_agent
+
+MESSAGES = [
+    ("I need a refill of my lisinopril before Friday", "Prescription refill request"),
+    ("When will my blood test results be ready?", "Lab results inquiry"),
+    ("I got a bill I don't understand", "Billing question"),
+    ("Can I get a referral to a dermatologist?", "Specialist referral"),
+    ("I'd like to book a follow-up appointment", "Appointment request"),
+    ("Is it normal to feel dizzy on the new medication?", "Clinical question about side effects"),
+]
+
+
+def _renders(renders: int, messages: int) -> tuple[float, int]:
+    calls, start = 0, time.perf_counter()
+    for _ in range(renders):
+        for message, summary in MESSAGES[:messages]:
+            for _view in ("draft", "next_steps"):
+                policy_agent.get_relevant_policy(message, summary)
+                calls += 1
+    return time.perf_counter() - start, calls
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TriageAI policy cache benchmark")
+    parser.add_argument("--renders", type=int, default=10, help="Passes over the messages (default: 10)")
+    parser.add_argument("--messages", type=int, default=len(MESSAGES), help=f"Distinct messages (max {len(MESSAGES)})")
+    parser.add_argument("--stub-embeddings", action="store_true", help="Use a temp store with hash embeddings")
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    if args.stub_embeddings:
+        point_policy_agent(tmp.name, create_stub_collection(tmp.name, embedding_function=HashEmbeddings(16)))
+    if policy_agent._get_collection() is None:
+        sys.exit("Policy store unavailable (run scripts/seed_policy.py, or pass --stub-embeddings offline).")
+
+    results = {}
+    for mode, size in (("uncached", 0), ("cached", 256)):
+        policy_agent._policy_cache = PolicyCache(max_entries=size)
+        seconds, calls = _renders(args.renders, args.messages)
+        results[mode] = (seconds, calls, policy_agent.policy_cache_stats())
+
+    print(f"\n{'=' * 60}")
+    print(f"Policy cache benchmark — {args.renders} renders x {args.messages} messages x 2 lookups")
+    print(f"{'=' * 60}")
+    print(f"  {'mode':<10}{'total_ms':>10}{'per_call_ms':>13}{'hit_rate':>10}")
+    for mode, (seconds, calls, stats) in results.items():
+        print(f"  {mode:<10}{seconds * 1e3:>10.1f}{seconds / calls * 1e3:>13.3f}{stats['hit_rate']:>10.0%}")
+    print(f"{'=' * 60}\n")
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Policy index benchmark — Chroma (HNSW + SQLite) vs the NumPy exact-search matrix.
+
+For each corpus size, random unit vectors (384-d, like all-MiniLM-L6-v2)
+are loaded into a temp persistent Chroma collection and into an
+agents.policy_matrix.MatrixIndex. The benchmark then reports:
+
+  build_s     Chroma add / matrix build from the collection's stored embeddings
+  chroma_ms   mean latency of a single-vector collection.query
+  matrix_ms   mean latency of a single-vector MatrixIndex.search
+  batch_ms    MatrixIndex.search latency per query, for batches of --batch
+  recall      share of Chroma's top-k that is in the exact top-k (HNSW is approximate)
+
+Queries are passed as embeddings, so the numbers are index time only, with
+no embedding model involved (embedding costs the same for both).
+
+Usage:
+    python scripts/bench_policy_index.py
+    python scripts/bench_policy_index.py --sizes 10,1000,50000 --queries 200 --k 5
+
+Run from the project root.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import chromadb
+import numpy as np
+
+from agents.policy_matrix import MatrixIndex
+
+DIM = 384
+
+
+def _unit(rng: np.random.Generator, n: int) -> np.ndarray:
+    v = rng.standard_normal((n, DIM)).astype(np.float32)
+    return v / np.linalg.norm(v, axis=1, keepdims=True)
+
+
+def _bench_size(size: int, queries: int, k: int, batch: int, tmp: str) -> dict:
+    rng = np.random.default_rng(size)
+    vectors = _unit(rng, size)
+    qs = _unit(rng, queries)
+    ids = [f"doc_{i}" for i in range(size)]
+
+    store = os.path.join(tmp, f"store_{size}")
+    coll = chromadb.PersistentClient(path=store).create_collection("hospital_policies", embedding_function=None)
+    start = time.perf_counter()
+    for i in range(0, size, 5000):
+        coll.add(ids=ids[i:i + 5000], embeddings=vectors[i:i + 5000], documents=[f"policy {j}" for j in range(i, min(i + 5000, size))])
+    chroma_build = time.perf_counter() - start
+
+    index = MatrixIndex(os.path.join(tmp, f"matrix_{size}"))
+    start = time.perf_counter()
+    index.build(coll)
+    matrix_build = time.perf_counter() - start
+
+    chroma_lat, chroma_ids = [], []
+    for q in qs:
+        start = time.perf_counter()
+        res = coll.query(query_embeddings=[q], n_results=min(k, size), include=["documents"])
+        chroma_lat.append(time.perf_counter() - start)
+        chroma_ids.append(res["ids"][0])
+
+    matrix_lat, exact_ids = [], []
+    for q in qs:
+        start = time.perf_counter()
+        hits = index.search(q, k)[0]
+        matrix_lat.append(time.perf_counter() - start)
+        exact_ids.append([index.ids[i] for i, _ in hits])
+
+    start = time.perf_counter()
+    for i in range(0, queries, batch):
+        index.search(qs[i:i + batch], k)
+    batch_per_query = (time.perf_counter() - start) / queries
+
+    recall = statistics.mean(len(set(c) & set(e)) / len(e) for c, e in zip(chroma_ids, exact_ids))
+    return {
+        "chroma_build_s": chroma_build,
+        "matrix_build_s": matrix_build,
+        "chroma_ms": statistics.mean(chroma_lat) * 1e3,
+        "matrix_ms": statistics.mean(matrix_lat) * 1e3,
+        "batch_ms": batch_per_query * 1e3,
+        "recall": recall,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TriageAI policy index benchmark")
+    parser.add_argument("--sizes", default="10,100,1000,10000,50000", help="Comma-separated corpus sizes")
+    parser.add_argument("--queries", type=int, default=100, help="Queries per size (default: 100)")
+    parser.add_argument("--k", type=int, default=3, help="Results per query (default: 3)")
+    parser.add_argument("--batch", type=int, default=32, help="Batch size for batched search (default: 32)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"\n{'=' * 84}")
+        print(f"Policy index — {DIM}-d unit vectors, {args.queries} queries, top-{args.k}")
+        print(f"{'=' * 84}")
+        print(f"  {'docs':>7}{'chroma_add_s':>14}{'matrix_build_s':>16}{'chroma_ms':>11}{'matrix_ms':>11}"
+              f"{f'batch{args.batch}_ms':>12}{'speedup':>9}{'recall':>8}")
+        for size in (int(s) for s in args.sizes.split(",")):
+            r = _bench_size(size, args.queries, args.k, args.batch, tmp)
+            print(f"  {size:>7}{r['chroma_build_s']:>14.2f}{r['matrix_build_s']:>16.2f}{r['chroma_ms']:>11.3f}"
+                  f"{r['matrix_ms']:>11.3f}{r['batch_ms']:>12.3f}{r['chroma_ms'] / r['matrix_ms']:>8.1f}x{r['recall']:>8.0%}")
+        print(f"{'=' * 84}\n")
+
+
+if __name__ == "__main__":
+    main()
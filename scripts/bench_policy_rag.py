@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+"""
+Policy RAG benchmark suite — latency, throughput and retrieval quality per backend.
+
+Queries and labels come from the triage eval datasets
+(agents.policy_eval.labeled_queries: each tests/eval_dataset*.json message
+with the DEFAULT_POLICIES entries its intent calls for). Each backend is a
+(POLICY_INDEX, retrieval mode) pair run through
+agents.policy_agent.search_policies:
+
+  lexical          BM25 only (no embedding)
+  vector-chroma    Chroma HNSW query
+  vector-numpy     exact memory-mapped matrix (agents.policy_matrix)
+  hybrid-chroma    BM25 + Chroma, reciprocal rank fusion (the default)
+  hybrid-numpy     BM25 + matrix
+
+For each backend, state is reset first: the Chroma client and collection
+are reopened, and the BM25 index and the matrix handle are dropped. The
+suite then reports:
+
+  first_ms     the first query, including opening the collection and building / loading indexes
+  cold         latency percentiles of the first pass over all queries (policy cache off)
+  warm         the same over --repeats further passes
+  qps          throughput with 1, 4, 8 ... concurrent callers (--concurrency)
+  recall@k     share of the expected policies in the top k (k in --ks), and MRR
+
+The "batch" row sends every query through one get_relevant_policy_batch
+call (POLICY_RETRIEVAL mode, no cross-query dedupe) and reports ms per
+query and recall; the "policy_cache" row times get_relevant_policy on
+repeated queries (served from agents.policy_cache). --output writes the
+results as JSON with the commit, settings and per-query ranks, so runs can
+be compared over time; nothing is written by default.
+
+Usage:
+    python scripts/bench_policy_rag.py                            # real store (run scripts/seed_policy.py first)
+    python scripts/bench_policy_rag.py --stub-embeddings --distractors 2000
+    python scripts/bench_policy_rag.py --backends lexical,hybrid-numpy --concurrency 1,8 --output /tmp/rag.json
+
+With --stub-embeddings the store is a temp copy of DEFAULT_POLICIES plus
+--distractors generated documents, embedded with a character-trigram hash
+(no model download): vector quality is not representative, but the
+latencies and lexical numbers are. The store is built by a separate
+process, as scripts/seed_policy.py would, with the HNSW index synced to
+disk before it exits. Below sync_threshold Chroma keeps the index only in
+memory, so every reopen (each backend's reset) would rebuild it from its
+log; the rebuilt graph's recall varies from run to run, and the Chroma
+rows would measure that rather than the backend.
+
+Run from the project root.
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from agents import policy_agent
+from agents.policy_cache import PolicyCache
+from agents.policy_eval import labeled_queries, latency_summary, retrieval_metrics
+from agents.policy_hnsw import POLICY_HNSW_SYNC_THRESHOLD, collection_configuration, hnsw_settings
+from tests.policy_stub import COLLECTION_NAME, TrigramEmbeddings, create_stub_collection, point_policy_agent
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# name -> (POLICY_INDEX, retrieval mode)
+BACKENDS = {
+    "lexical": ("chroma", "lexical"),
+    "vector-chroma": ("chroma", "vector"),
+    "vector-numpy": ("numpy", "vector"),
+    "hybrid-chroma": ("chroma", "hybrid"),
+    "hybrid-numpy": ("numpy", "hybrid"),
+}
+
+_VOCAB = (
+    "patients staff portal visit clinic office hours request form policy department review days "
+    "insurance parking visitor records privacy consent interpreter telehealth vaccine wellness "
+    "nurse physician schedule message reply confirm identity update contact weekend holiday"
+).split()
+
+
+def _ints(value: str) -> list[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def _build_stub_store(path: str, distractors: int) -> None:
+    """Write the stub store: DEFAULT_POLICIES plus distractors, trigram-hash
+    embeddings. Runs in its own process (--build-stub-store)."""
+    total = len(policy_agent.DEFAULT_POLICIES) + distractors
+    coll = create_stub_collection(
+        path,
+        embedding_function=TrigramEmbeddings(),
+        # Sync the index to disk within this run, so readers load this graph instead of rebuilding one
+        configuration=collection_configuration(sync_threshold=max(2, min(POLICY_HNSW_SYNC_THRESHOLD, total))),
+    )
+    rng = random.Random(7)
+    docs = [f"{rng.choice(_VOCAB).title()} {i}: " + " ".join(rng.choice(_VOCAB) for _ in range(24)) + "." for i in range(distractors)]
+    for i in range(0, len(docs), 500):
+        coll.add(documents=docs[i:i + 500], ids=[f"distractor_{j}" for j in range(i, i + len(docs[i:i + 500]))])
+
+
+def _stub_store(path: str, distractors: int) -> None:
+    """Build the stub store in a subprocess and point policy_agent at it."""
+    import chromadb
+
+    subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--build-stub-store", path, "--distractors", str(distractors)],
+        check=True,
+    )
+    embedding_function = TrigramEmbeddings()
+    # Reopened on every reset, like _new_collection on the real store
+    point_policy_agent(
+        path,
+        opener=lambda: chromadb.PersistentClient(path=path).get_collection(COLLECTION_NAME, embedding_function=embedding_function),
+    )
+
+
+def _reset() -> None:
+    """Drop every handle and index so the next query starts cold."""
+    from chromadb.api.client import SharedSystemClient
+
+    SharedSystemClient.clear_system_cache()
+    policy_agent._client.reset()
+    policy_agent._collection.reset()
+    policy_agent._lexical.clear()
+    policy_agent._matrix = None
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, timeout=10
+        ).stdout.strip()
+    except Exception:
+        return ""
+
+
+def _bench_backend(index: str, mode: str, cases: list[dict], depth: int, repeats: int, concurrency: list[int]) -> dict:
+    policy_agent.POLICY_INDEX = index
+    ids_by_doc = {doc: f"policy_{i}" for i, doc in enumerate(policy_agent.DEFAULT_POLICIES)}
+    queries = [c["query"] for c in cases]
+
+    def search(query: str) -> list[str]:
+        return policy_agent.search_policies(query, top_k=depth, mode=mode)
+
+    _reset()
+    start = time.perf_counter()
+    search(queries[0])
+    first = time.perf_counter() - start
+
+    cold, rankings = [], []
+    for query in queries:
+        start = time.perf_counter()
+        docs = search(query)
+        cold.append(time.perf_counter() - start)
+        rankings.append([ids_by_doc.get(doc, "") for doc in docs])
+    warm = []
+    for _ in range(repeats):
+        for query in queries:
+            start = time.perf_counter()
+            search(query)
+            warm.append(time.perf_counter() - start)
+
+    qps = {}
+    for workers in concurrency:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            start = time.perf_counter()
+            list(pool.map(search, queries))
+            qps[str(workers)] = len(queries) / (time.perf_counter() - start)
+    return {
+        "index": index,
+        "mode": mode,
+        "first_ms": first * 1e3,
+        "cold": latency_summary(cold),
+        "warm": latency_summary(warm),
+        "qps": qps,
+        "quality": retrieval_metrics(rankings, cases),
+        "_rankings": rankings,
+    }
+
+
+def _bench_batch(cases: list[dict], depth: int, repeats: int) -> dict:
+    """All queries in one get_relevant_policy_batch call (cache off, no cross-query dedupe)."""
+    ids_by_doc = {doc: f"policy_{i}" for i, doc in enumerate(policy_agent.DEFAULT_POLICIES)}
+    queries = [c["query"] for c in cases]
+    per_query, results = [], []
+    for _ in range(max(1, repeats)):
+        start = time.perf_counter()
+        results = policy_agent.get_relevant_policy_batch(queries, top_k=depth, dedupe=False)
+        per_query.append((time.perf_counter() - start) / len(queries))
+    rankings = [[ids_by_doc.get(doc, "") for doc in docs] for docs in results]
+    return {"per_query": latency_summary(per_query), "quality": retrieval_metrics(rankings, cases)}
+
+
+def _bench_cache(cases: list[dict], depth: int) -> dict:
+    """get_relevant_policy latency when every query is already cached."""
+    policy_agent._policy_cache = PolicyCache()
+    for case in cases:
+        policy_agent.get_relevant_policy(case["query"], top_k=depth)
+    hits = []
+    for case in cases:
+        start = time.perf_counter()
+        policy_agent.get_relevant_policy(case["query"], top_k=depth)
+        hits.append(time.perf_counter() - start)
+    return latency_summary(hits)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TriageAI policy RAG benchmark suite")
+    parser.add_argument("--backends", default=",".join(BACKENDS), help=f"Comma-separated subset of {', '.join(BACKENDS)}")
+    parser.add_argument("--ks", type=_ints, default=[1, 3, 5], help="recall@k cut-offs (default: 1,3,5); the largest is the retrieval depth")
+    parser.add_argument("--repeats", type=int, default=3, help="Warm passes over the query set (default: 3)")
+    parser.add_argument("--concurrency", type=_ints, default=[1, 4, 8], help="Concurrent callers for throughput (default: 1,4,8)")
+    parser.add_argument("--datasets", nargs="*", help="Eval dataset files (default: tests/eval_dataset*.json)")
+    parser.add_argument("--stub-embeddings", action="store_true", help="Use a temp store with trigram-hash embeddings")
+    parser.add_argument("--distractors", type=int, default=500, help="Distractor documents in the stub store (default: 500)")
+    parser.add_argument("--output", help="Write the results as JSON to this path")
+    parser.add_argument("--build-stub-store", metavar="PATH", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.build_stub_store:
+        _build_stub_store(args.build_stub_store, args.distractors)
+        return
+
+    backends = [b.strip() for b in args.backends.split(",") if b.strip()]
+    unknown = [b for b in backends if b not in BACKENDS]
+    if unknown:
+        parser.error(f"unknown backend(s): {', '.join(unknown)}")
+    cases = labeled_queries(args.datasets)
+    depth = max(args.ks)
+
+    tmp = tempfile.TemporaryDirectory()
+    if args.stub_embeddings:
+        _stub_store(os.path.join(tmp.name, "store"), args.distractors)
+    coll = policy_agent._get_collection()
+    if coll is None:
+        sys.exit("Policy store unavailable (run scripts/seed_policy.py, or pass --stub-embeddings offline).")
+    docs = coll.count()
+    saved_index, saved_cache = policy_agent.POLICY_INDEX, policy_agent._policy_cache
+    policy_agent._policy_cache = PolicyCache(max_entries=0)  # every backend query does the real work
+
+    results = {}
+    try:
+        for name in backends:
+            results[name] = _bench_backend(*BACKENDS[name], cases, depth, args.repeats, args.concurrency)
+        policy_agent.POLICY_INDEX = saved_index
+        batch = _bench_batch(cases, depth, args.repeats)
+        cache = _bench_cache(cases, depth)
+    finally:
+        policy_agent.POLICY_INDEX, policy_agent._policy_cache = saved_index, saved_cache
+
+    rankings = {name: r.pop("_rankings") for name, r in results.items()}
+    intents: dict[str, int] = {}
+    sources: dict[str, int] = {}
+    for case in cases:
+        intents[case["intent"]] = intents.get(case["intent"], 0) + 1
+        sources[case["source"]] = sources.get(case["source"], 0) + 1
+    output = {
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "commit": _commit(),
+        "settings": {
+            "embeddings": "stub-trigram" if args.stub_embeddings else "store",
+            "corpus_docs": docs,
+            "ks": args.ks,
+            "repeats": args.repeats,
+            "concurrency": args.concurrency,
+            "hnsw": hnsw_settings(),
+        },
+        "dataset": {"queries": len(cases), "by_source": sources, "by_intent": intents},
+        "backends": results,
+        "batch": batch,
+        "policy_cache": cache,
+        "per_query": [
+            {
+                "id": case["id"],
+                "source": case["source"],
+                "intent": case["intent"],
+                "expected": case["expected"],
+                "ranks": {
+                    name: next((r + 1 for r, doc_id in enumerate(ranked[i]) if doc_id in case["expected"]), None)
+                    for name, ranked in rankings.items()
+                },
+            }
+            for i, case in enumerate(cases)
+        ],
+    }
+
+    recall_cols = [f"recall@{k}" for k in sorted(args.ks)]
+    print(f"\n{'=' * 100}")
+    print(f"Policy RAG — {len(cases)} labelled queries, {docs} docs, "
+          f"{'trigram stub' if args.stub_embeddings else 'store'} embeddings")
+    print(f"{'=' * 100}")
+    print(f"  {'backend':<15}{'first_ms':>9}{'cold_p50':>10}{'cold_p95':>10}{'warm_p50':>10}{'warm_p99':>10}"
+          + "".join(f"{'qps@' + str(c):>9}" for c in args.concurrency)
+          + "".join(f"{c:>10}" for c in recall_cols) + f"{'mrr':>7}")
+    for name, r in results.items():
+        print(f"  {name:<15}{r['first_ms']:>9.1f}{r['cold']['p50_ms']:>10.2f}{r['cold']['p95_ms']:>10.2f}"
+              f"{r['warm']['p50_ms']:>10.2f}{r['warm']['p99_ms']:>10.2f}"
+              + "".join(f"{r['qps'][str(c)]:>9.0f}" for c in args.concurrency)
+              + "".join(f"{r['quality'][c]:>10.2f}" for c in recall_cols) + f"{r['quality']['mrr']:>7.2f}")
+    print(f"  {'batch':<15}{'':>9}{batch['per_query']['p50_ms']:>10.2f}{batch['per_query']['p95_ms']:>10.2f}"
+          f"{'':>20}{'':>{9 * len(args.concurrency)}}"
+          + "".join(f"{batch['quality'][c]:>10.2f}" for c in recall_cols) + f"{batch['quality']['mrr']:>7.2f}"
+          + "   (get_relevant_policy_batch, ms per query)")
+    print(f"  {'policy_cache':<15}{'':>9}{cache['p50_ms']:>10.3f}{cache['p95_ms']:>10.3f}   (get_relevant_policy, cached)")
+    print(f"{'=' * 100}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(output, f, indent=2)
+        print(f"Results saved to {args.output}")
+    print()
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Department-scoped policy retrieval benchmark — filtered vs unfiltered top-k.
+
+Builds a large synthetic corpus (random 384-d unit vectors, policy-like text)
+spread evenly over --departments departments and tagged like
+agents.policy_ingest tags chunks. It then runs the same queries unfiltered
+and with a department filter from agents.policy_scope.policy_where (the
+department plus "general"), through each backend:
+
+  chroma   collection.query(query_embeddings=..., where=...)
+  chroma+  agents.policy_scope.chroma_query_scoped (unfiltered over-fetch, then where=)
+  matrix   agents.policy_matrix.MatrixIndex.search(..., where=...)
+  bm25     agents.policy_lexical.BM25Index.search(..., where=...)
+
+It reports mean latency and the in-scope rate: the share of returned chunks
+that belong to the queried department (or "general"). Unfiltered, that is
+roughly the department's share of the corpus.
+
+Usage:
+    python scripts/bench_policy_scope.py
+    python scripts/bench_policy_scope.py --docs 50000 --departments 8 --queries 200
+
+Run from the project root.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import chromadb
+import numpy as np
+
+from agents.policy_lexical import BM25Index
+from agents.policy_matrix import MatrixIndex
+from agents.policy_scope import chroma_query_scoped, policy_where
+
+DIM = 384
+DEPARTMENTS = ["pharmacy", "billing", "laboratory", "referrals", "scheduling", "nursing", "radiology", "cardiology"]
+_SHARED = "patients staff portal request policy review days confirm identity contact form record update".split()
+
+
+def _corpus(docs: int, departments: list[str], rng: random.Random) -> tuple[list[str], list[dict]]:
+    texts, metadatas = [], []
+    for i in range(docs):
+        department = "general" if i % 50 == 0 else departments[i % len(departments)]
+        words = [rng.choice(_SHARED) for _ in range(20)] + [department] * 2 + [f"{department}{rng.randrange(40)}" for _ in range(4)]
+        rng.shuffle(words)
+        texts.append(" ".join(words))
+        metadatas.append({"department": department, "topic": f"{department} procedures"})
+    return texts, metadatas
+
+
+def _timed(fn, queries) -> tuple[float, list]:
+    latencies, results = [], []
+    for q in queries:
+        start = time.perf_counter()
+        results.append(fn(q))
+        latencies.append(time.perf_counter() - start)
+    return statistics.mean(latencies) * 1e3, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TriageAI department-scoped retrieval benchmark")
+    parser.add_argument("--docs", type=int, default=20000, help="Corpus size (default: 20000)")
+    parser.add_argument("--departments", type=int, default=8, help=f"Departments (max {len(DEPARTMENTS)}, default: 8)")
+    parser.add_argument("--queries", type=int, default=100, help="Queries per mode (default: 100)")
+    parser.add_argument("--k", type=int, default=5, help="Results per query (default: 5)")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    nrng = np.random.default_rng(0)
+    departments = DEPARTMENTS[:args.departments]
+    texts, metadatas = _corpus(args.docs, departments, rng)
+    vectors = nrng.standard_normal((args.docs, DIM)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    ids = [f"chunk_{i}" for i in range(args.docs)]
+    query_vectors = nrng.standard_normal((args.queries, DIM)).astype(np.float32)
+    query_depts = [departments[i % len(departments)] for i in range(args.queries)]
+    query_texts = [f"{d} {rng.choice(_SHARED)} {d}{rng.randrange(40)}" for d in query_depts]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        coll = chromadb.PersistentClient(path=os.path.join(tmp, "store")).create_collection(
+            "hospital_policies", embedding_function=None
+        )
+        for i in range(0, args.docs, 5000):
+            coll.add(ids=ids[i:i + 5000], embeddings=vectors[i:i + 5000], documents=texts[i:i + 5000], metadatas=metadatas[i:i + 5000])
+        matrix = MatrixIndex(os.path.join(tmp, "matrix"))
+        matrix.build(coll)
+        bm25 = BM25Index()
+        bm25.build(coll)
+        dept_of = dict(zip(ids, (m["department"] for m in metadatas)))
+
+        cases = {
+            "chroma": lambda i, where: coll.query(
+                query_embeddings=[query_vectors[i]], n_results=args.k, where=where, include=[]
+            )["ids"][0],
+            "chroma+": lambda i, where: [
+                doc_id for doc_id, _ in chroma_query_scoped(coll, args.k, where, query_embeddings=[query_vectors[i]])[0]
+            ],
+            "matrix": lambda i, where: [matrix.ids[r] for r, _ in matrix.search(query_vectors[i], args.k, where)[0]],
+            "bm25": lambda i, where: [doc_id for doc_id, _ in bm25.search(query_texts[i], args.k, where)],
+        }
+        print(f"\n{'=' * 72}")
+        print(f"Scoped retrieval — {args.docs} chunks, {len(departments)} departments, {args.queries} queries, top-{args.k}")
+        print(f"{'=' * 72}")
+        print(f"  {'backend':<8}{'unfiltered_ms':>15}{'filtered_ms':>13}{'speedup':>9}{'in_scope':>10}{'->':>4}{'filtered':>9}")
+        for name, fn in cases.items():
+            rows = []
+            for scoped in (False, True):
+                ms, results = _timed(
+                    lambda i: fn(i, policy_where(department=query_depts[i]) if scoped else None), range(args.queries)
+                )
+                hits = [dept_of[doc_id] in (query_depts[i], "general") for i, r in enumerate(results) for doc_id in r]
+                rows.append((ms, sum(hits) / max(len(hits), 1)))
+            (u_ms, u_scope), (f_ms, f_scope) = rows
+            print(f"  {name:<8}{u_ms:>15.3f}{f_ms:>13.3f}{u_ms / f_ms:>8.1f}x{u_scope:>10.0%}{'':>4}{f_scope:>9.0%}")
+        print(f"{'=' * 72}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Policy search benchmark — chroma_query_documents over MCP vs in-process.
+
+Runs the same chroma_query_documents call against ./data/vector_store:
+
+  mcp         through a warm chroma-mcp-server (graph.mcp_pool, one process)
+  in-process  through graph.mcp_local on agents.policy_agent's Chroma client
+
+and reports call latency plus resident memory: the server process's RSS for
+the MCP path, and this process's RSS growth for the in-process path (the
+app process already holds that client for draft replies).
+
+Usage:
+    python scripts/seed_policy.py                 # once, if the store is empty
+    python scripts/bench_policy_search.py
+    python scripts/bench_policy_search.py --calls 100 --query "lab results turnaround"
+
+Linux only (reads /proc for RSS). Run from the project root.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from graph.mcp_local import local_query_documents_tool, local_vector_store
+from graph.mcp_pool import MCPSessionPool
+from graph.workflow import MCP_CONFIG_PATH
+
+
+def _rss_mb(pid: int) -> float:
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return 0.0
+
+
+def _child_pids() -> list[int]:
+    pids = []
+    for entry in os.listdir("/proc"):
+        if entry.isdigit():
+            try:
+                with open(f"/proc/{entry}/stat") as f:
+                    if int(f.read().rsplit(")", 1)[1].split()[1]) == os.getpid():
+                        pids.append(int(entry))
+            except (OSError, IndexError, ValueError):
+                pass
+    return pids
+
+
+def _measure(tool, args: dict, calls: int) -> dict:
+    latencies, errors = [], 0
+    for _ in range(calls):
+        start = time.perf_counter()
+        try:
+            tool.invoke(args)
+        except Exception:
+            errors += 1
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return {
+        "p50": latencies[len(latencies) // 2],
+        "p95": latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))],
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TriageAI policy search benchmark")
+    parser.add_argument("--calls", type=int, default=50, help="Queries per mode (default: 50)")
+    parser.add_argument("--query", default="prescription refill policy", help="Query text")
+    parser.add_argument("--collection", default="hospital_policies", help="Collection to query")
+    args = parser.parse_args()
+
+    with open(MCP_CONFIG_PATH) as f:
+        config = json.load(f)
+    local = {name: conn for name, conn in config.items() if local_vector_store(conn)}
+    if not local:
+        sys.exit("No local Chroma MCP server in mcp_config.json — nothing to compare.")
+    tool_args = {"collection_name": args.collection, "query_texts": [args.query], "n_results": 3}
+
+    results = {}
+    pool = MCPSessionPool(local, size=1, health_interval_s=0).start()
+    try:
+        mcp_tool = next(t for t in pool.get_tools() if t.name == "chroma_query_documents")
+        results["mcp"] = _measure(mcp_tool, tool_args, args.calls)
+        results["mcp"]["rss_mb"] = sum(_rss_mb(pid) for pid in _child_pids())
+    finally:
+        pool.close()
+
+    before = _rss_mb(os.getpid())
+    results["in-process"] = _measure(local_query_documents_tool(), tool_args, args.calls)
+    results["in-process"]["rss_mb"] = _rss_mb(os.getpid()) - before
+
+    print(f"\n{'=' * 62}")
+    print(f"Policy search benchmark — chroma_query_documents x{args.calls}")
+    print(f"{'=' * 62}")
+    print(f"  {'mode':<12}{'p50_ms':>10}{'p95_ms':>10}{'errors':>8}{'rss_MB':>12}")
+    for mode, m in results.items():
+        print(f"  {mode:<12}{m['p50'] * 1e3:>10.2f}{m['p95'] * 1e3:>10.2f}{m['errors']:>8}{m['rss_mb']:>12.1f}")
+    print("\n  rss_MB: server process RSS (mcp) / growth of this process (in-process)")
+    print(f"{'=' * 62}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+LOW-urgency reply template benchmark — template hit rate and draft latency.
+
+Takes every LOW message in tests/eval_dataset*.json, builds the triage result
+the triage agent would return (expected intent, LOW, the intent's usual
+queue), retrieves policy the way draft_reply_node does (scoped
+get_relevant_policy) and tries agents.reply_templates on it. It reports:
+
+  hit rate        share of LOW messages answered by a vetted template, per intent
+  misses          why the rest went to the LLM (no_template, stale, no_policy)
+  template_ms     mean time to match and fill a template
+  llm_ms          mean generate_draft_reply time for the misses (needs
+                  LLM_GEMINI_API_KEY; otherwise --llm-ms is used and marked assumed)
+  saved per LOW   hit rate x (llm_ms - template_ms)
+
+Usage:
+    python scripts/bench_reply_templates.py                       # real store + Gemini
+    python scripts/bench_reply_templates.py --stub-embeddings --llm-ms 2500
+    python scripts/bench_reply_templates.py --show 3              # print a few filled replies
+
+Run from the project root.
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from agents import policy_agent, reply_templates
+from agents.policy_scope import policy_where_for
+from tests.policy_stub import HashEmbeddings, create_stub_collection, point_policy_agent
+
+# Queue the triage agent usually recommends per intent
+QUEUES = {"Refill": "Pharmacy", "Appointment": "Front Desk", "Billing": "Billing", "Clinical Question": "Nursing"}
+
+
+def _low_messages() -> list[dict]:
+    items, seen = [], set()
+    for path in sorted(glob.glob(os.path.join(os.path.dirname(reply_templates.__file__), "..", "tests", "eval_dataset*.json"))):
+        with open(path) as f:
+            for item in json.load(f):
+                message = item.get("message") or ""
+                if item.get("expected_urgency") == "LOW" and message and message not in seen:
+                    seen.add(message)
+                    items.append(item)
+    return items
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TriageAI LOW-urgency reply template benchmark")
+    parser.add_argument("--stub-embeddings", action="store_true", help="Use a temp store with hash embeddings")
+    parser.add_argument("--llm-ms", type=float, help="Assumed LLM draft latency when LLM_GEMINI_API_KEY is not set")
+    parser.add_argument("--show", type=int, default=0, help="Print this many filled template replies")
+    args = parser.parse_args()
+
+    tmp = tempfile.TemporaryDirectory()
+    if args.stub_embeddings:
+        store = os.path.join(tmp.name, "store")
+        point_policy_agent(store, create_stub_collection(store, embedding_function=HashEmbeddings(16)))
+    if policy_agent._get_collection() is None:
+        sys.exit("Policy store unavailable (run scripts/seed_policy.py, or pass --stub-embeddings offline).")
+    use_llm = bool(os.environ.get("LLM_GEMINI_API_KEY"))
+
+    items = _low_messages()
+    by_intent: dict[str, list[int]] = {}
+    shown = 0
+    for item in items:
+        triage = {
+            "intent": item.get("expected_intent", ""),
+            "urgency": "LOW",
+            "summary": "",
+            "recommended_queue": QUEUES.get(item.get("expected_intent", ""), ""),
+            "checklist": [],
+        }
+        chunks = policy_agent.get_relevant_policy(item["message"], "", where=policy_where_for(triage))
+        reply = reply_templates.low_urgency_template_reply(item["message"], triage, chunks, item.get("full_name", ""))
+        by_intent.setdefault(triage["intent"], []).append(reply is not None)
+        if reply is None and use_llm:
+            start = time.perf_counter()
+            policy_agent.generate_draft_reply(item["message"], triage, chunks)
+            reply_templates.record_llm_draft(time.perf_counter() - start)
+        elif reply is not None and shown < args.show:
+            shown += 1
+            print(f"\n--- {item.get('id', '')}: {item['message'][:90]}\n{reply}")
+
+    stats = reply_templates.template_stats()
+    llm_ms, assumed = stats["mean_llm_ms"], ""
+    if not stats["mean_llm_ms"] and args.llm_ms:
+        llm_ms, assumed = args.llm_ms, " (assumed)"
+    saved = stats["hit_rate"] * (llm_ms - stats["mean_template_ms"]) if llm_ms else None
+
+    print(f"\n{'=' * 60}")
+    print(f"LOW reply templates — {stats['low_messages']} LOW messages")
+    print(f"{'=' * 60}")
+    for intent, hits in sorted(by_intent.items()):
+        print(f"  {intent:<20}{sum(hits):>4}/{len(hits):<4}{sum(hits) / len(hits):>6.0%}")
+    print(f"  {'total':<20}{stats['hits']:>4}/{stats['low_messages']:<4}{stats['hit_rate']:>6.0%}   misses: {stats['misses']}")
+    print(f"  template        {stats['mean_template_ms']:.2f}ms per reply")
+    print(f"  LLM draft       {f'{llm_ms:.0f}ms{assumed}' if llm_ms else 'n/a (set LLM_GEMINI_API_KEY or --llm-ms)'}")
+    if saved is not None:
+        print(f"  saved           {saved:.0f}ms per LOW message, {stats['hits']} LLM calls avoided")
+    print(f"{'=' * 60}\n")
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
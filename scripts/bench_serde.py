@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Checkpoint serializer benchmark — JsonPlusSerializer vs CompactSerializer.
+
+Decodes checkpoints recorded in a checkpoint DB (default data/checkpoints.db)
+and re-encodes each one with:
+
+  default   LangGraph's JsonPlusSerializer (msgpack, full model_dump)
+  compact   CompactSerializer without compression
+  zstd      CompactSerializer with zstd above the size threshold
+
+and reports bytes per checkpoint plus encode/decode time.
+
+Usage:
+    python scripts/bench_serde.py                              # recorded threads in data/checkpoints.db
+    python scripts/bench_serde.py --db /path/to/checkpoints.db --limit 2000
+    python scripts/bench_serde.py --synthetic 200              # Gemini-shaped threads, no DB needed
+
+Record real threads by running the app (or scripts/load_test.py) with the
+default checkpoint DB first. --synthetic builds threads with the same message
+shapes the triage graph produces (tool calls, policy tool outputs, Gemini
+response/usage metadata) for environments without recordings.
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from graph.checkpoint_serde import CHECKPOINT_ZSTD_MIN_BYTES, CompactSerializer
+
+
+def load_recorded(path: str, limit: int) -> list:
+    reader = CompactSerializer()  # decodes both formats
+    conn = sqlite3.connect(path)
+    try:
+        rows = conn.execute(
+            "SELECT type, checkpoint FROM checkpoints ORDER BY thread_id, checkpoint_id LIMIT ?", (limit,)
+        ).fetchall()
+    finally:
+        conn.close()
+    return [reader.loads_typed((t, b)) for t, b in rows]
+
+
+def synthetic_threads(n_threads: int) -> list:
+    """Checkpoints for triage-shaped threads (one per node step)."""
+    from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+    from langgraph.checkpoint.base import empty_checkpoint
+
+    policy = ("Prescription refills are processed within 2 business days. Controlled substances "
+              "require an in-person visit every 90 days. Patients should contact the pharmacy... ") * 8
+    gemini_meta = {
+        "model_provider": "google_genai",
+        "finish_reason": "STOP",
+        "model_name": "gemini-2.5-flash",
+        "safety_ratings": [{"category": f"HARM_CATEGORY_{c}", "probability": "NEGLIGIBLE", "blocked": False}
+                           for c in ("HARASSMENT", "HATE_SPEECH", "SEXUALLY_EXPLICIT", "DANGEROUS_CONTENT")],
+        "prompt_feedback": {"block_reason": 0, "safety_ratings": []},
+    }
+    usage = {"input_tokens": 2400, "output_tokens": 180, "total_tokens": 2580,
+             "input_token_details": {"cache_read": 0}, "output_token_details": {"reasoning": 96}}
+
+    checkpoints = []
+    for i in range(n_threads):
+        messages = [HumanMessage(content=f"I need a refill of my lisinopril, running out in 3 days ({i})", id=f"h{i}")]
+        steps = [
+            AIMessage(content="", id=f"a{i}-1", response_metadata=gemini_meta, usage_metadata=usage,
+                      tool_calls=[{"name": "search_hospital_policy", "args": {"query": "refill policy"}, "id": f"c{i}-1"},
+                                  {"name": "get_patient_history", "args": {"patient_id": f"PAT-{i}"}, "id": f"c{i}-2"}]),
+            ToolMessage(content=policy, tool_call_id=f"c{i}-1", name="search_hospital_policy", id=f"t{i}-1"),
+            ToolMessage(content="Hypertension, on lisinopril 10mg since 2021. No allergies. " * 6,
+                        tool_call_id=f"c{i}-2", name="get_patient_history", id=f"t{i}-2"),
+            AIMessage(content='{"intent": "Refill", "urgency": "LOW", "summary": "Routine lisinopril refill", '
+                              '"checklist": []}', id=f"a{i}-2", response_metadata=gemini_meta, usage_metadata=usage),
+        ]
+        for step in steps:
+            messages = messages + [step]
+            cp = empty_checkpoint()
+            cp["channel_values"] = {
+                "messages": messages,
+                "message": messages[0].content,
+                "patient_id": f"PAT-{i}",
+                "triage_result": {"intent": "Refill", "urgency": "LOW", "summary": "Routine lisinopril refill"},
+                "draft_reply": "Thank you for reaching out. Your refill request has been sent to the pharmacy. " * 3,
+            }
+            checkpoints.append(cp)
+    return checkpoints
+
+
+def measure(serde, objects) -> dict:
+    start = time.perf_counter()
+    encoded = [serde.dumps_typed(o) for o in objects]
+    enc_s = time.perf_counter() - start
+    start = time.perf_counter()
+    for e in encoded:
+        serde.loads_typed(e)
+    dec_s = time.perf_counter() - start
+    sizes = [len(b) for _, b in encoded]
+    return {
+        "mean_bytes": sum(sizes) / len(sizes),
+        "total_bytes": sum(sizes),
+        "enc_us": enc_s / len(objects) * 1e6,
+        "dec_us": dec_s / len(objects) * 1e6,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TriageAI checkpoint serializer benchmark")
+    parser.add_argument("--db", help="Checkpoint DB with recorded threads (default: data/checkpoints.db)")
+    parser.add_argument("--limit", type=int, default=5000, help="Max recorded checkpoints to load (default: 5000)")
+    parser.add_argument("--synthetic", type=int, default=0, help="Use N synthetic threads instead of a DB")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        objects = synthetic_threads(args.synthetic)
+        source = f"synthetic ({args.synthetic} threads)"
+    else:
+        from graph.workflow import _CHECKPOINT_DB
+        path = args.db or _CHECKPOINT_DB
+        if not os.path.exists(path):
+            sys.exit(f"No checkpoint DB at {path} — record some threads first or pass --synthetic N")
+        objects = load_recorded(path, args.limit)
+        source = path
+    if not objects:
+        sys.exit("No checkpoints to benchmark.")
+
+    modes = [
+        ("default", JsonPlusSerializer()),
+        ("compact", CompactSerializer(zstd_min_bytes=0)),
+        ("zstd", CompactSerializer()),
+    ]
+
+    print(f"\n{'=' * 66}")
+    print("Checkpoint serializer benchmark")
+    print(f"{'=' * 66}")
+    print(f"Source: {source} — {len(objects)} checkpoints | zstd threshold: {CHECKPOINT_ZSTD_MIN_BYTES}B\n")
+    print(f"  {'mode':<10}{'bytes/ckpt':>12}{'total_MB':>10}{'ratio':>8}{'enc_us':>10}{'dec_us':>10}")
+    baseline = None
+    for name, serde in modes:
+        m = measure(serde, objects)
+        baseline = baseline or m["total_bytes"]
+        print(f"  {name:<10}{m['mean_bytes']:>12.0f}{m['total_bytes'] / 1e6:>10.2f}"
+              f"{baseline / m['total_bytes']:>7.1f}x{m['enc_us']:>10.1f}{m['dec_us']:>10.1f}")
+    print(f"{'=' * 66}\n")
+
+
+if __name__ == "__main__":
+    main()
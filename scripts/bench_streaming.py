@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Streaming render benchmark — per-token vs coalesced UI updates.
+
+Replays a recorded ``stream_graph`` event stream through the same render loop
+the patient portal uses and reports how many UI updates were issued and how
+much CPU time rendering took, with and without ``coalesce_tokens``.
+
+Usage:
+    python scripts/bench_streaming.py                          # synthetic 2,000-token stream
+    python scripts/bench_streaming.py --tokens 5000 --gap-ms 8
+    python scripts/bench_streaming.py --recording stream.json  # replay a recorded stream
+
+Recording format (JSON list), one entry per event in arrival order:
+    [{"t": 0.000, "type": "status", "content": "Analyzing your message"},
+     {"t": 0.012, "type": "token",  "content": "Thank"}, ...]
+"t" is the arrival offset in seconds; replay uses a virtual clock so the
+benchmark runs at CPU speed while preserving frame boundaries.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.streaming import coalesce_tokens
+
+
+class _VirtualClock:
+    """Clock advanced by the replayer to each event's recorded arrival time."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class _MarkdownSink:
+    """Stand-in for ``st.empty()`` — renders markdown like the real element does."""
+
+    def __init__(self):
+        self.updates = 0
+        try:
+            from markdown_it import MarkdownIt
+            self._md = MarkdownIt()
+        except ImportError:
+            self._md = None
+
+    def markdown(self, text):
+        self.updates += 1
+        if self._md is not None:
+            self._md.render(text)
+        else:
+            text.encode("utf-8")
+
+
+def _synthetic_recording(n_tokens: int, gap_ms: float) -> list[dict]:
+    words = ("Thank you for reaching out about your refill. Our pharmacy team "
+             "will review the request within two business days. ").split()
+    events = [{"t": 0.0, "type": "status", "content": "Analyzing your message"}]
+    t = 0.0
+    for i in range(n_tokens):
+        t += gap_ms / 1000.0
+        events.append({"t": t, "type": "token", "content": words[i % len(words)] + " "})
+        if i and i % 500 == 0:
+            events.append({"t": t, "type": "status", "content": "Gathering information"})
+    events.append({"t": t, "type": "done", "content": ""})
+    return events
+
+
+def _replay(recording, clock):
+    for event in recording:
+        clock.now = event.get("t", clock.now)
+        yield {"type": event["type"], "content": event.get("content", "")}
+
+
+def _render(events) -> tuple[int, int, float]:
+    """Run the portal's render loop; returns (text updates, status updates, cpu_s)."""
+    text_area, status_area = _MarkdownSink(), _MarkdownSink()
+    full_response = ""
+    start = time.process_time()
+    for event in events:
+        if event["type"] == "token":
+            full_response += event["content"]
+            text_area.markdown(full_response + " **|**")
+        elif event["type"] == "status":
+            status_area.markdown(event["content"])
+        elif event["type"] in ("interrupt", "done"):
+            text_area.markdown(full_response)
+    return text_area.updates, status_area.updates, time.process_time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TriageAI streaming render benchmark")
+    parser.add_argument("--recording", help="Path to a recorded event stream (JSON)")
+    parser.add_argument("--tokens", type=int, default=2000, help="Synthetic stream length (default: 2000)")
+    parser.add_argument("--gap-ms", type=float, default=10.0, help="Synthetic inter-token gap (default: 10ms)")
+    parser.add_argument("--interval", type=float, default=0.05, help="Frame interval in seconds (default: 0.05)")
+    parser.add_argument("--max-chars", type=int, default=200, help="Frame size cap in chars (default: 200)")
+    args = parser.parse_args()
+
+    if args.recording:
+        with open(args.recording) as f:
+            recording = json.load(f)
+        source = args.recording
+    else:
+        recording = _synthetic_recording(args.tokens, args.gap_ms)
+        source = f"synthetic ({args.tokens} tokens, {args.gap_ms}ms gap)"
+
+    n_tokens = sum(1 for e in recording if e["type"] == "token")
+
+    raw_text, raw_status, raw_cpu = _render(_replay(recording, _VirtualClock()))
+    clock = _VirtualClock()
+    co_text, co_status, co_cpu = _render(
+        coalesce_tokens(_replay(recording, clock), interval=args.interval,
+                        max_chars=args.max_chars, clock=clock)
+    )
+
+    print(f"\n{'=' * 60}")
+    print("Streaming render benchmark")
+    print(f"{'=' * 60}")
+    print(f"Stream: {source} — {n_tokens} token events")
+    print(f"Frame: {args.interval * 1000:.0f}ms / {args.max_chars} chars\n")
+    print(f"  {'mode':<12}{'text updates':>14}{'status':>10}{'cpu_s':>10}")
+    print(f"  {'per-token':<12}{raw_text:>14}{raw_status:>10}{raw_cpu:>10.3f}")
+    print(f"  {'coalesced':<12}{co_text:>14}{co_status:>10}{co_cpu:>10.3f}")
+    if co_text and co_cpu:
+        print(f"\n  Update reduction: {raw_text / co_text:.1f}x | CPU reduction: {raw_cpu / co_cpu:.1f}x")
+    print(f"{'=' * 60}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+TriageAI inbox importer — bulk-triage a backlog of portal messages.
+
+Streams a JSONL or CSV export through run_triage_batch with bounded
+concurrency, writes results to the message store in batches, and records
+progress so an interrupted import resumes where it stopped.
+
+Usage:
+    python scripts/import_inbox.py --input backlog.jsonl
+    python scripts/import_inbox.py --input backlog.csv --concurrency 16
+    python scripts/import_inbox.py --input backlog.jsonl --no-save          # dry run
+    python scripts/import_inbox.py --input backlog.jsonl --progress run.progress.jsonl
+
+Input rows need a "message" field; optional: id, patient_id, patient_email
+(or email), user_id, full_name. Rows without an id are keyed by row number.
+Progress defaults to <input>.progress.jsonl next to the input file.
+Saving needs Supabase: rows that cannot be stored are reported as failed
+and retried on the next run (use --no-save for a dry run without it).
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TriageAI bulk inbox importer")
+    parser.add_argument("--input", required=True, help="Path to JSONL or CSV inbox export")
+    parser.add_argument("--concurrency", type=int, default=8, help="In-flight messages (default: 8)")
+    parser.add_argument("--progress", default="", help="Progress file (default: <input>.progress.jsonl)")
+    parser.add_argument("--store-batch-size", type=int, default=50, help="Rows per bulk store write (default: 50)")
+    parser.add_argument("--item-timeout", type=float, default=0, help="Per-message timeout in seconds (0=none)")
+    parser.add_argument("--report-every", type=float, default=5.0, help="Seconds between throughput lines (default: 5)")
+    parser.add_argument("--no-save", action="store_true", help="Skip writing results to the message store")
+    args = parser.parse_args()
+
+    from graph.batch import read_inbox, run_triage_batch
+
+    progress_path = args.progress or f"{args.input}.progress.jsonl"
+    last_report = [0.0]
+
+    def _on_progress(stats):
+        now = time.monotonic()
+        if now - last_report[0] < args.report_every:
+            return
+        last_report[0] = now
+        print(f"  ok={stats['ok']} failed={stats['failed']} skipped={stats['skipped']} "
+              f"stored={stats['stored']} | {stats['msgs_per_min']:.1f} msg/min")
+
+    print(f"\n{'=' * 60}")
+    print("TriageAI Inbox Import")
+    print(f"{'=' * 60}")
+    print(f"Input: {args.input}")
+    print(f"Progress: {progress_path}")
+    print(f"Concurrency: {args.concurrency} | Store batch: {args.store_batch_size} | "
+          f"Save: {'no' if args.no_save else 'yes'}\n")
+
+    stats = run_triage_batch(
+        read_inbox(args.input),
+        concurrency=args.concurrency,
+        progress_path=progress_path,
+        save=not args.no_save,
+        store_batch_size=args.store_batch_size,
+        on_progress=_on_progress,
+        item_timeout=args.item_timeout or None,
+    )
+
+    print(f"\n{'=' * 60}")
+    print(f"  Triaged: {stats['ok']} | Failed: {stats['failed']} | Skipped (already done): {stats['skipped']}")
+    print(f"  Stored:  {stats['stored']}")
+    print(f"  Elapsed: {stats['elapsed_s']:.0f}s | Throughput: {stats['msgs_per_min']:.1f} msg/min")
+    for err in stats["errors"][:10]:
+        print(f"  ERROR {err['id']}: {err['error']}")
+    print(f"{'=' * 60}\n")
+    if stats["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
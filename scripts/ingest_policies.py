@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Ingest a policy manual directory into the hospital_policies collection.
+
+Walks --dir (markdown, text and, with pypdf installed, PDF files), chunks
+each file by section and upserts only new or changed chunks; chunks of
+deleted files or sections are removed (agents/policy_ingest.py). Re-running
+on an unchanged directory only reads the stored hashes, so it is cheap to
+run on every deploy or from cron.
+
+Usage:
+    python scripts/ingest_policies.py --dir policies/
+    python scripts/ingest_policies.py --dir policies/ --keep-removed
+    python scripts/ingest_policies.py --synthetic 5000 --stub-embeddings   # benchmark: temp corpus + store
+
+--synthetic N writes a generated corpus of about N chunks to a temp
+directory and ingests it three times into a temp store (never
+data/vector_store): initial, unchanged, and after editing one file and
+deleting another. --stub-embeddings swaps the embedding model for a hash
+embedding (no model download) so the timings show the pipeline itself.
+
+Run from the project root.
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import chromadb
+
+from agents.embeddings import get_embedding_function
+from agents.policy_hnsw import collection_configuration
+from agents.policy_ingest import ingest_directory
+
+VECTOR_STORE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "data",
+    "vector_store",
+)
+
+COLLECTION_NAME = "hospital_policies"
+
+DEPARTMENTS = ["pharmacy", "scheduling", "billing", "laboratory", "referrals", "nursing"]
+
+
+def _write_synthetic(root: str, chunks: int, sections_per_file: int = 10) -> list[str]:
+    """Markdown files with one ~600-char chunk per section; returns the file paths."""
+    paths = []
+    for f in range(max(1, chunks // sections_per_file)):
+        department = DEPARTMENTS[f % len(DEPARTMENTS)]
+        os.makedirs(os.path.join(root, department), exist_ok=True)
+        lines = [f"# {department.title()} policy {f}", ""]
+        for s in range(sections_per_file):
+            lines += [f"## Procedure {s}", ""]
+            lines += [f"Step {n} of procedure {s} in policy {f}: staff confirm the patient's identity, "
+                      f"record the request and respond within {n + 1} business days." for n in range(4)]
+            lines.append("")
+        path = os.path.join(root, department, f"policy_{f:04d}.md")
+        with open(path, "w") as fh:
+            fh.write("\n".join(lines))
+        paths.append(path)
+    return paths
+
+
+def _print_report(label: str, report: dict) -> None:
+    s = report["seconds"]
+    print(f"  {label:<10}{report['files']:>7}{report['chunks']:>8}{report['unchanged']:>11}"
+          f"{report['upserted']:>10}{report['deleted']:>9}"
+          f"{s['scan']:>8.2f}{s['diff']:>8.2f}{s['upsert']:>9.2f}{s['delete']:>8.2f}{s['total']:>8.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TriageAI policy manual ingestion")
+    parser.add_argument("--dir", help="Policy directory to ingest")
+    parser.add_argument("--batch-size", type=int, default=64, help="Chunks per embed + upsert call (default: 64)")
+    parser.add_argument("--max-chars", type=int, default=1200, help="Max characters per chunk (default: 1200)")
+    parser.add_argument("--keep-removed", action="store_true", help="Do not delete chunks of removed files/sections")
+    parser.add_argument("--synthetic", type=int, metavar="N", help="Benchmark on a generated corpus of ~N chunks")
+    parser.add_argument("--stub-embeddings", action="store_true", help="Use a temp store with hash embeddings")
+    args = parser.parse_args()
+    if not args.dir and not args.synthetic:
+        parser.error("--dir or --synthetic is required")
+    if args.dir and args.synthetic:
+        parser.error("--synthetic benchmarks on a temp store; it cannot be combined with --dir")
+
+    tmp = tempfile.TemporaryDirectory()
+    # The synthetic corpus must never reach the live store: delete_removed would
+    # drop every real chunk and the generated ones would be served in drafts
+    store_path = os.path.join(tmp.name, "store") if args.stub_embeddings or args.synthetic else VECTOR_STORE_PATH
+    if args.stub_embeddings:
+        from tests.policy_stub import HashEmbeddings
+        embedding_function = HashEmbeddings(16)
+    else:
+        embedding_function = get_embedding_function()
+        if hasattr(embedding_function, "load"):
+            print(f"Embedding model loaded in {embedding_function.load():.2f}s")
+    os.makedirs(store_path, exist_ok=True)
+    coll = chromadb.PersistentClient(path=store_path).get_or_create_collection(
+        COLLECTION_NAME,
+        metadata={"description": "Clinic policy snippets"},
+        configuration=collection_configuration(),
+        embedding_function=embedding_function,
+    )
+
+    def _ingest():
+        return ingest_directory(
+            root, coll, batch_size=args.batch_size, max_chars=args.max_chars, delete_removed=not args.keep_removed,
+        )
+
+    print(f"\n{'=' * 90}")
+    print(f"  {'run':<10}{'files':>7}{'chunks':>8}{'unchanged':>11}{'upserted':>10}{'deleted':>9}"
+          f"{'scan_s':>8}{'diff_s':>8}{'upsert_s':>9}{'del_s':>8}{'total_s':>8}")
+    if args.synthetic:
+        root = os.path.join(tmp.name, "policies")
+        paths = _write_synthetic(root, args.synthetic)
+        _print_report("initial", _ingest())
+        _print_report("unchanged", _ingest())
+        with open(paths[0], "a") as fh:
+            fh.write("\nAmended: refills of controlled substances need a visit every 90 days.\n")
+        os.remove(paths[-1])
+        _print_report("edited", _ingest())
+    else:
+        root = args.dir
+        report = _ingest()
+        _print_report("ingest", report)
+        for skipped in report["skipped_files"]:
+            print(f"  skipped: {skipped}")
+    print(f"{'=' * 90}")
+    print(f"Collection '{COLLECTION_NAME}' at {store_path}: {coll.count()} docs\n")
+    tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
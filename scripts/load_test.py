@@ -15,6 +15,12 @@ Usage:
     python scripts/load_test.py --limit 20                   # first 20 only
     python scripts/load_test.py --dataset tests/eval_dataset.json  # use original 26
     python scripts/load_test.py --delay 2                    # 2s between messages
+    python scripts/load_test.py --durable                    # checkpoint every node to SQLite
+
+Threads run ephemerally by default (in-memory checkpoints, persisted only when
+a thread pauses for a checklist answer or staff review); the CHECKPOINT WRITES
+section reports rows and bytes added to the checkpoint DB, so a --durable run
+over the same dataset shows the disk writes saved.
 
 Results are written to:
     tests/load_test_results.json   — full detail + aggregate metrics
@@ -53,7 +59,7 @@ PATIENT = {
 }
 
 
-def run_single_message(message: str, patient_id: str, max_turns: int = 3):
+def run_single_message(message: str, patient_id: str, max_turns: int = 3, ephemeral: bool = True):
     """Run one message through the FULL streaming workflow, handling checklist
     interrupts automatically — same path the patient portal takes.
 
@@ -62,7 +68,7 @@ def run_single_message(message: str, patient_id: str, max_turns: int = 3):
 
     Returns (safety_dict, triage_dict, elapsed_seconds).
     """
-    from graph.workflow import stream_triage_workflow, resume_chat, get_workflow_state
+    from graph.workflow import stream_triage_workflow, resume_chat, finish_ephemeral_run
     from app.streaming import stream_graph
 
     start = time.time()
@@ -72,12 +78,16 @@ def run_single_message(message: str, patient_id: str, max_turns: int = 3):
         patient_message=message,
         patient_id=patient_id,
         patient_email=PATIENT["email"],
+        ephemeral=ephemeral,
     )
 
     interrupt_question = None
     for event in stream_graph(app, initial, config):
         if event["type"] == "interrupt":
             interrupt_question = event["content"]
+    snapshot = app.get_state(config)
+    if ephemeral:
+        finish_ephemeral_run(thread_id)
 
     # --- Follow-up turns: answer checklist interrupts ---
     turn = 1
@@ -91,11 +101,12 @@ def run_single_message(message: str, patient_id: str, max_turns: int = 3):
         for event in stream_graph(app, command, config):
             if event["type"] == "interrupt":
                 interrupt_question = event["content"]
+        snapshot = app.get_state(config)
 
     elapsed = time.time() - start
 
     # --- Extract final results from completed workflow state ---
-    state = get_workflow_state(thread_id)
+    state = dict(snapshot.values) if snapshot and snapshot.values else None
     safety = {}
     triage = {}
     if state:
@@ -139,6 +150,27 @@ def _auto_answer(question: str, original_message: str) -> str:
         return "It started about 3 days ago, pain is moderate maybe 5 out of 10, no other symptoms."
 
 
+def checkpoint_db_usage() -> dict:
+    """Rows and payload bytes in the checkpoint DB (zeros if it does not exist)."""
+    import sqlite3
+    from graph.workflow import _CHECKPOINT_DB
+
+    usage = {"threads": 0, "checkpoints": 0, "writes": 0, "bytes": 0}
+    if not os.path.exists(_CHECKPOINT_DB):
+        return usage
+    conn = sqlite3.connect(_CHECKPOINT_DB)
+    try:
+        usage["threads"], usage["checkpoints"], cp_bytes = conn.execute(
+            "SELECT COUNT(DISTINCT thread_id), COUNT(*), COALESCE(SUM(LENGTH(checkpoint) + LENGTH(metadata)), 0) "
+            "FROM checkpoints").fetchone()
+        usage["writes"], wr_bytes = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(LENGTH(value)), 0) FROM writes").fetchone()
+    finally:
+        conn.close()
+    usage["bytes"] = cp_bytes + wr_bytes
+    return usage
+
+
 def save_to_store(content: str, triage_result: dict):
     """Persist to the message store so it shows up in the staff dashboard."""
     from app.messages_store import save_message
@@ -274,6 +306,8 @@ def main():
     parser.add_argument("--limit", type=int, default=0, help="Max messages to process (0=all)")
     parser.add_argument("--delay", type=float, default=0.5, help="Seconds between messages (default: 0.5)")
     parser.add_argument("--no-save", action="store_true", help="Skip saving to message store")
+    parser.add_argument("--durable", action="store_true",
+                        help="Checkpoint every node to SQLite (default: ephemeral until a thread pauses)")
     args = parser.parse_args()
 
     with open(args.dataset) as f:
@@ -288,18 +322,20 @@ def main():
     print(f"Dataset: {args.dataset} ({len(dataset)} messages)")
     print(f"Delay: {args.delay}s between messages")
     print(f"Save to store: {'no' if args.no_save else 'yes'}")
+    print(f"Checkpointing: {'durable' if args.durable else 'ephemeral'}")
     print()
 
     results = []
     errors = 0
     start_total = time.time()
+    usage_before = checkpoint_db_usage()
 
     for i, item in enumerate(dataset):
         msg = item["message"]
         print(f"  [{i+1}/{len(dataset)}] {item.get('id', '?')}: {msg[:60]}{'...' if len(msg) > 60 else ''}")
 
         try:
-            safety, triage, elapsed = run_single_message(msg, PATIENT["patient_id"])
+            safety, triage, elapsed = run_single_message(msg, PATIENT["patient_id"], ephemeral=not args.durable)
             result = {"safety": safety, "triage": triage, "elapsed": elapsed}
 
             act_urg = (triage.get("urgency") or "?").upper()
@@ -322,6 +358,9 @@ def main():
             time.sleep(args.delay)
 
     total_time = time.time() - start_total
+    usage_after = checkpoint_db_usage()
+    ckpt = {k: usage_after[k] - usage_before[k] for k in usage_after}
+    ckpt["mode"] = "durable" if args.durable else "ephemeral"
 
     # Compute and display metrics
     metrics = compute_metrics(dataset, results)
@@ -349,6 +388,14 @@ def main():
     print(f"  Mean: {lm['mean_s']:.1f}s | P50: {lm['p50_s']:.1f}s | P95: {lm['p95_s']:.1f}s")
     print(f"  Min:  {lm['min_s']:.1f}s | Max: {lm['max_s']:.1f}s | Total: {lm['total_s']:.0f}s")
 
+    print(f"\n{'=' * 60}")
+    print(f"CHECKPOINT WRITES ({ckpt['mode']})")
+    print(f"{'=' * 60}")
+    n = max(1, len(dataset))
+    print(f"  Threads persisted: {ckpt['threads']}/{len(dataset)}")
+    print(f"  Checkpoints: {ckpt['checkpoints']} ({ckpt['checkpoints'] / n:.1f}/message) | Writes: {ckpt['writes']}")
+    print(f"  Bytes: {ckpt['bytes'] / 1e6:.2f}MB ({ckpt['bytes'] / n / 1e3:.1f}KB/message)")
+
     print(f"\n  Errors: {metrics['errors']}/{metrics['total_messages']}")
     print(f"  Wall clock: {total_time:.0f}s")
     print(f"{'=' * 60}\n")
@@ -362,6 +409,7 @@ def main():
         "num_messages": len(dataset),
         "total_time_s": round(total_time, 1),
         "metrics": metrics,
+        "checkpoint_writes": ckpt,
         "per_message": [
             {
                 "id": item.get("id", ""),
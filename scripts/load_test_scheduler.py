@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Scheduler load test — FIFO vs urgency-priority job scheduling.
+
+Feeds mixed-urgency jobs into a real JobQueue + WorkerPool on a temporary
+SQLite database at increasing utilization (Poisson arrivals). The handler
+simulates service time instead of calling the LLM, so the run isolates the
+scheduling policy: under "priority" each job is a short screen stage plus
+agent work; under "fifo" the same total time is spent in one stage. For each
+load level it reports the P95 scheduling delay (enqueue to start of agent
+work) per urgency level.
+
+Usage:
+    python scripts/load_test_scheduler.py                         # utilization 0.8, 1.0, 1.2, 1.5
+    python scripts/load_test_scheduler.py --loads 0.7 0.9 1.1 --jobs 400
+    python scripts/load_test_scheduler.py --agent-ms 100 --screen-ms 10
+
+Expected: under "priority", EMERGENCY P95 stays roughly flat as utilization
+grows past saturation; under "fifo" it grows with queue depth. LOW delay
+grows under "priority" until aging (TRIAGE_QUEUE_AGING_S) lifts it.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.job_queue import JobQueue, WorkerPool
+
+URGENCIES = ["EMERGENCY", "HIGH", "NORMAL", "LOW"]
+MIX = [0.05, 0.15, 0.40, 0.40]
+
+
+def _make_handler(screen_s: float, agent_s: float):
+    def _handler(queue, job):
+        if job["stage"] == "screen":
+            time.sleep(screen_s)
+            queue.promote(job, job["payload"]["label"])
+            return
+        time.sleep(agent_s if queue.scheduling == "priority" else screen_s + agent_s)
+    return _handler
+
+
+def run_load(scheduling: str, utilization: float, n_jobs: int, workers: int,
+             screen_s: float, agent_s: float, seed: int) -> dict:
+    rng = random.Random(seed)
+    rate = utilization * workers / (screen_s + agent_s)  # arrivals per second
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = JobQueue(os.path.join(tmp, "jobs.db"), scheduling=scheduling, aging_s=3600)
+        pool = WorkerPool(queue, workers=workers, handler=_make_handler(screen_s, agent_s),
+                          poll_interval=0.002).start()
+        for i in range(n_jobs):
+            label = rng.choices(URGENCIES, MIX)[0]
+            job_id = queue.enqueue("start", f"thread-{i}", {"message": label.lower(), "label": label})
+            if scheduling == "fifo":
+                # No screen stage under FIFO; record the label for reporting only
+                with queue._connect() as conn:
+                    conn.execute("UPDATE jobs SET urgency = ? WHERE id = ?", (label, job_id))
+            time.sleep(rng.expovariate(rate))
+        while True:
+            stats = queue.stats(window=n_jobs)
+            if stats["done"] + stats["failed"] >= n_jobs:
+                break
+            time.sleep(0.05)
+        pool.stop()
+    return stats["by_urgency"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TriageAI scheduler load test")
+    parser.add_argument("--loads", type=float, nargs="+", default=[0.8, 1.0, 1.2, 1.5],
+                        help="Offered utilization levels (default: 0.8 1.0 1.2 1.5)")
+    parser.add_argument("--jobs", type=int, default=200, help="Jobs per run (default: 200)")
+    parser.add_argument("--workers", type=int, default=4, help="Worker threads (default: 4)")
+    parser.add_argument("--screen-ms", type=float, default=5.0, help="Simulated screen time (default: 5ms)")
+    parser.add_argument("--agent-ms", type=float, default=100.0, help="Simulated agent time (default: 100ms)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"\n{'=' * 72}")
+    print("Scheduler load test — P95 scheduling delay (s) by urgency")
+    print(f"{'=' * 72}")
+    print(f"Workers: {args.workers} | screen {args.screen_ms:.0f}ms | agent {args.agent_ms:.0f}ms\n")
+    print(f"  {'policy':<10}{'load':>6}" + "".join(f"{u:>12}" for u in URGENCIES))
+    for scheduling in ("fifo", "priority"):
+        for load in args.loads:
+            by_urgency = run_load(scheduling, load, args.jobs, args.workers, args.screen_ms / 1000,
+                                  args.agent_ms / 1000, args.seed)
+            cells = "".join(
+                f"{by_urgency[u]['scheduling_delay_s']['p95']:>12.3f}" if u in by_urgency else f"{'-':>12}"
+                for u in URGENCIES
+            )
+            print(f"  {scheduling:<10}{load:>6.2f}{cells}")
+    print(f"{'=' * 72}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Checkpoint retention CLI — compact or delete finished triage threads.
+
+Runs one graph.retention.prune_checkpoints pass and prints database size and
+get_tuple read latency before and after. Threads waiting on staff review or a
+patient answer are never touched.
+
+Usage:
+    python scripts/prune_checkpoints.py                       # data/checkpoints.db, 30-day grace
+    python scripts/prune_checkpoints.py --grace-days 7 --dry-run
+    python scripts/prune_checkpoints.py --convert             # one-time switch to incremental vacuum
+    python scripts/prune_checkpoints.py --seed 100000         # benchmark on a synthetic temp DB
+
+Seed mode builds a temporary database with N triage-shaped threads (six
+checkpoints each; ~60% auto-completed, ~25% approved, ~15% pending review,
+ages spread over 60 days) and reports the same before/after numbers.
+"""
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from graph.retention import CHECKPOINT_RETENTION_GRACE_DAYS, convert_to_incremental_vacuum, db_report, prune_checkpoints
+
+NODES = ["safety_node", "triage_agent_node", "tools", "synthesis_node", "draft_reply_node", "communication_node"]
+
+
+def seed_database(path: str, n_threads: int, seed: int = 0) -> None:
+    """Write n_threads synthetic threads straight into a checkpoint DB."""
+    from langchain_core.messages import AIMessage, HumanMessage
+    from langgraph.checkpoint.base import empty_checkpoint
+    from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+    from graph.checkpoint_store import PooledSqliteSaver
+
+    PooledSqliteSaver(path, pool_size=1).close()  # schema + pragmas
+    serde = JsonPlusSerializer()
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    filler = "Patient reports a medication question about their refill schedule. " * 6
+
+    conn = sqlite3.connect(path, isolation_level=None)
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.execute("BEGIN")
+    for i in range(n_threads):
+        thread_id = f"seed-{i:07d}"
+        roll = rng.random()
+        final_status = "auto_completed" if roll < 0.60 else "approved" if roll < 0.85 else "pending_review"
+        start = now - timedelta(days=rng.uniform(0, 60))
+        messages = [HumanMessage(content=filler)]
+        parent = None
+        for step, node in enumerate(NODES):
+            messages = messages + [AIMessage(content=f"{node}: {filler}")]
+            checkpoint = empty_checkpoint()
+            checkpoint["ts"] = (start + timedelta(seconds=step * 2)).isoformat()
+            checkpoint["id"] = f"{int(start.timestamp() * 1000):015d}-{step:02d}-{i:07d}"
+            status = final_status if step == len(NODES) - 1 else "pending_review"
+            checkpoint["channel_values"] = {"messages": messages, "hitl_status": status, "message": filler}
+            type_, blob = serde.dumps_typed(checkpoint)
+            conn.execute(
+                "INSERT INTO checkpoints (thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, "
+                "type, checkpoint, metadata) VALUES (?, '', ?, ?, ?, ?, ?)",
+                (thread_id, checkpoint["id"], parent, type_, blob, b'{"source": "loop"}'),
+            )
+            w_type, w_blob = serde.dumps_typed(status)
+            conn.execute(
+                "INSERT INTO writes (thread_id, checkpoint_ns, checkpoint_id, task_id, idx, channel, type, value) "
+                "VALUES (?, '', ?, ?, 0, 'hitl_status', ?, ?)",
+                (thread_id, checkpoint["id"], f"task-{step}", w_type, w_blob),
+            )
+            parent = checkpoint["id"]
+        if i % 5000 == 4999:
+            conn.execute("COMMIT")
+            conn.execute("BEGIN")
+    conn.execute("COMMIT")
+    conn.close()
+
+
+def _print_report(label: str, r: dict) -> None:
+    print(f"  {label:<8}{r['file_bytes'] / 1e6:>10.1f}{r['threads']:>10}{r['checkpoints']:>13}{r['writes']:>10}"
+          f"{r['read_p50_s'] * 1000:>10.2f}{r['read_p95_s'] * 1000:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TriageAI checkpoint retention")
+    parser.add_argument("--db", help="Checkpoint database (default: data/checkpoints.db)")
+    parser.add_argument("--grace-days", type=float, default=CHECKPOINT_RETENTION_GRACE_DAYS,
+                        help=f"Delete finished threads older than this (default: {CHECKPOINT_RETENTION_GRACE_DAYS:g})")
+    parser.add_argument("--dry-run", action="store_true", help="Classify threads without deleting anything")
+    parser.add_argument("--convert", action="store_true", help="Enable incremental vacuum first (full VACUUM)")
+    parser.add_argument("--seed", type=int, default=0, help="Benchmark: seed a temp DB with N threads")
+    parser.add_argument("--samples", type=int, default=500, help="Threads sampled for read latency (default: 500)")
+    args = parser.parse_args()
+
+    tmp = None
+    path = args.db
+    if args.seed:
+        tmp = tempfile.TemporaryDirectory()
+        path = os.path.join(tmp.name, "checkpoints.db")
+        start = time.monotonic()
+        seed_database(path, args.seed)
+        print(f"Seeded {args.seed} threads in {time.monotonic() - start:.1f}s")
+    if path is None:
+        from graph.workflow import _CHECKPOINT_DB
+        path = _CHECKPOINT_DB
+
+    if args.convert:
+        convert_to_incremental_vacuum(path)
+
+    print(f"\n{'=' * 72}")
+    print(f"Checkpoint retention — {path}")
+    print(f"{'=' * 72}")
+    before = db_report(path, samples=args.samples)
+    stats = prune_checkpoints(path, grace_s=args.grace_days * 86400, dry_run=args.dry_run)
+    after = db_report(path, samples=args.samples)
+
+    print(f"  threads={stats['threads']} pending(kept)={stats['pending']} compacted={stats['compacted']} "
+          f"deleted={stats['deleted']}{' (dry run)' if args.dry_run else ''}")
+    print(f"  removed checkpoints={stats['checkpoints_removed']} writes={stats['writes_removed']} "
+          f"pages freed={stats['pages_freed']} in {stats['elapsed_s']:.1f}s\n")
+    print(f"  {'':<8}{'size_MB':>10}{'threads':>10}{'checkpoints':>13}{'writes':>10}{'read_p50':>10}{'read_p95':>10}")
+    _print_report("before", before)
+    _print_report("after", after)
+    print(f"  (read latency in ms; get_tuple on {args.samples} random threads)")
+    print(f"{'=' * 72}\n")
+
+    if tmp is not None:
+        tmp.cleanup()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Rebuild the hospital_policies collection with new HNSW settings.
+
+Chroma fixes distance, ef_construction and M when a collection is created,
+so changing POLICY_HNSW_SPACE / POLICY_HNSW_M / POLICY_HNSW_EF_CONSTRUCTION
+only takes effect after a rebuild. This recreates the collection from the
+ids, documents, metadatas and embeddings already in the store
+(agents.policy_hnsw.rebuild_collection): nothing is re-ingested or
+re-embedded. Flags override the environment for this run.
+
+Usage:
+    python scripts/rebuild_policy_index.py                       # apply the POLICY_HNSW_* settings
+    python scripts/rebuild_policy_index.py --m 32 --ef-construction 200
+    python scripts/rebuild_policy_index.py --space cosine --keep-backup
+
+Keep the same values in the environment afterwards: search-time settings
+(ef_search, batch size) are re-applied from it whenever the collection is
+opened, and a build-time mismatch logs a warning.
+
+Run from the project root.
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+import chromadb
+
+from agents.embeddings import get_embedding_function
+from agents.policy_hnsw import BUILD_KEYS, SEARCH_KEYS, hnsw_settings, rebuild_collection
+
+VECTOR_STORE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "data",
+    "vector_store",
+)
+
+COLLECTION_NAME = "hospital_policies"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TriageAI policy collection HNSW rebuild")
+    parser.add_argument("--space", choices=["l2", "cosine", "ip"], help="Distance (default: POLICY_HNSW_SPACE)")
+    parser.add_argument("--m", type=int, help="max_neighbors per node (default: POLICY_HNSW_M)")
+    parser.add_argument("--ef-construction", type=int, help="Build-time candidate list (default: POLICY_HNSW_EF_CONSTRUCTION)")
+    parser.add_argument("--ef-search", type=int, help="Query-time candidate list (default: POLICY_HNSW_EF_SEARCH)")
+    parser.add_argument("--batch-size", type=int, help="HNSW batch size (default: POLICY_HNSW_BATCH_SIZE)")
+    parser.add_argument("--copy-batch", type=int, default=1000, help="Records per copy page (default: 1000)")
+    parser.add_argument("--keep-backup", action="store_true", help=f"Keep the old collection as {COLLECTION_NAME}__backup")
+    parser.add_argument("--path", default=VECTOR_STORE_PATH, help="Vector store directory (default: data/vector_store)")
+    args = parser.parse_args()
+
+    settings = hnsw_settings(
+        space=args.space,
+        max_neighbors=args.m,
+        ef_construction=args.ef_construction,
+        ef_search=args.ef_search,
+        batch_size=args.batch_size,
+    )
+    client = chromadb.PersistentClient(path=args.path)
+    report = rebuild_collection(
+        client,
+        COLLECTION_NAME,
+        get_embedding_function(),
+        settings=settings,
+        batch_size=args.copy_batch,
+        keep_backup=args.keep_backup,
+    )
+
+    print(f"\n{'=' * 60}")
+    print(f"Rebuilt '{COLLECTION_NAME}' at {args.path}: {report['records']} records")
+    print(f"{'=' * 60}")
+    print(f"  {'setting':<18}{'before':>14}{'after':>14}")
+    for key in BUILD_KEYS + SEARCH_KEYS:
+        if key not in report["before"] and key not in report["after"]:
+            continue  # not reported back by Chroma (batch_size)
+        before, after = report["before"].get(key), report["after"].get(key)
+        print(f"  {key:<18}{str(before):>14}{str(after):>14}{'  *' if before != after else ''}")
+    s = report["seconds"]
+    print(f"  copy {s['copy']:.2f}s, swap {s['swap']:.3f}s")
+    if report["backup"]:
+        print(f"  previous collection kept as '{report['backup']}'")
+    print(f"{'=' * 60}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,9 +5,12 @@ Usage (run once from project root):
     python scripts/seed_policy.py
 
 Idempotent: safe to run multiple times. Skips seeding if the collection already
-has documents.
+has documents (but tags seed docs from older runs with department/topic metadata).
 
 Output directory: ./data/vector_store/
+
+Offline / air-gapped: set POLICY_EMBEDDING_MODEL_DIR to an extracted
+all-MiniLM-L6-v2 ONNX model (model.onnx + tokenizer.json); nothing is downloaded.
 """
 import os
 import sys
@@ -17,6 +20,10 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import chromadb
 
+from agents.embeddings import get_embedding_function
+from agents.policy_agent import DEFAULT_POLICY_METADATA, tag_default_policies
+from agents.policy_hnsw import collection_configuration
+
 VECTOR_STORE_PATH = os.path.join(
     os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
     "data",
@@ -37,19 +44,29 @@ DEFAULT_POLICIES = [
 
 
 def seed():
+    # Same embedding backend as query time (agents/embeddings.py); load it up
+    # front so a missing offline model fails before the store is touched
+    embedding_function = get_embedding_function()
+    if hasattr(embedding_function, "load"):
+        print(f"Embedding model loaded in {embedding_function.load():.2f}s")
+
     os.makedirs(VECTOR_STORE_PATH, exist_ok=True)
     client = chromadb.PersistentClient(path=VECTOR_STORE_PATH)
     coll = client.get_or_create_collection(
         COLLECTION_NAME,
         metadata={"description": "Clinic policy snippets"},
+        configuration=collection_configuration(),
+        embedding_function=embedding_function,
     )
 
     if coll.count() >= len(DEFAULT_POLICIES):
-        print(f"Collection '{COLLECTION_NAME}' already has {coll.count()} docs — skipping seed.")
+        tagged = tag_default_policies(coll)
+        print(f"Collection '{COLLECTION_NAME}' already has {coll.count()} docs — skipping seed"
+              + (f" (tagged {tagged} with department/topic)." if tagged else "."))
         return
 
     ids = [f"policy_{i}" for i in range(len(DEFAULT_POLICIES))]
-    coll.upsert(documents=DEFAULT_POLICIES, ids=ids)
+    coll.upsert(documents=DEFAULT_POLICIES, ids=ids, metadatas=DEFAULT_POLICY_METADATA)
     print(f"Seeded {len(DEFAULT_POLICIES)} documents into '{COLLECTION_NAME}' at {VECTOR_STORE_PATH}")
 
 
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+HNSW parameter sweep — latency and recall@k of the policy collection's ANN
+index against exact search.
+
+For each (M, ef_construction) pair a temp Chroma collection is built with
+agents.policy_hnsw.collection_configuration(); each ef_search value is then
+applied in place (sync_collection_settings, as at startup) and measured.
+Chroma reads ef_search when it loads the index, so the client is reopened
+(system cache cleared) for every value:
+
+  build_s     Chroma add time for the corpus
+  ef_search   query-time candidate list
+  mean_ms     mean latency of a single-vector collection.query
+  p95_ms      95th percentile latency
+  recall@k    share of the exact top-k (agents.policy_matrix.MatrixIndex) that Chroma returned
+
+Vectors are random 384-d unit vectors (like all-MiniLM-L6-v2) by default,
+which is a hard case for HNSW; --from-store uses the embeddings of the
+hospital_policies collection in data/vector_store instead (copied into the
+temp collections, the store itself is not modified), with queries drawn
+from those embeddings plus noise.
+
+Usage:
+    python scripts/sweep_policy_hnsw.py
+    python scripts/sweep_policy_hnsw.py --docs 50000 --m 8,16,32 --ef-construction 100,200 --ef-search 10,50,100,200
+    python scripts/sweep_policy_hnsw.py --from-store
+
+Pick values from the table, then set POLICY_HNSW_* (ef_search applies on
+the next start; M / ef_construction / space need
+scripts/rebuild_policy_index.py).
+
+Run from the project root.
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import chromadb
+import numpy as np
+from chromadb.api.client import SharedSystemClient
+
+from agents.policy_hnsw import collection_configuration, hnsw_settings, sync_collection_settings
+from agents.policy_matrix import MatrixIndex
+
+DIM = 384
+
+VECTOR_STORE_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "data",
+    "vector_store",
+)
+
+
+def _ints(value: str) -> list[int]:
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+def _unit(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _corpus(args, rng: np.random.Generator) -> tuple[np.ndarray, np.ndarray]:
+    if args.from_store:
+        coll = chromadb.PersistentClient(path=VECTOR_STORE_PATH).get_collection("hospital_policies")
+        vectors = np.asarray(coll.get(include=["embeddings"])["embeddings"], dtype=np.float32)
+        picks = vectors[rng.integers(0, len(vectors), args.queries)]
+        queries = picks + rng.standard_normal(picks.shape).astype(np.float32) * 0.05
+        return _unit(vectors), _unit(queries)
+    return _unit(rng.standard_normal((args.docs, DIM))), _unit(rng.standard_normal((args.queries, DIM)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TriageAI policy HNSW parameter sweep")
+    parser.add_argument("--docs", type=int, default=20000, help="Corpus size (default: 20000)")
+    parser.add_argument("--queries", type=int, default=200, help="Queries per setting (default: 200)")
+    parser.add_argument("--k", type=int, default=5, help="Results per query (default: 5)")
+    parser.add_argument("--space", choices=["l2", "cosine", "ip"], help="Distance (default: POLICY_HNSW_SPACE)")
+    parser.add_argument("--m", type=_ints, default=[8, 16, 32], help="M values (default: 8,16,32)")
+    parser.add_argument("--ef-construction", type=_ints, default=[100, 200], help="ef_construction values (default: 100,200)")
+    parser.add_argument("--ef-search", type=_ints, default=[10, 50, 100, 200], help="ef_search values (default: 10,50,100,200)")
+    parser.add_argument("--from-store", action="store_true", help="Use the hospital_policies embeddings in data/vector_store")
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors, queries = _corpus(args, rng)
+    ids = [f"doc_{i}" for i in range(len(vectors))]
+    k = min(args.k, len(ids))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        exact = MatrixIndex(os.path.join(tmp, "matrix"))
+        exact.write(ids, [""] * len(ids), vectors)
+        truth = [{exact.ids[i] for i, _ in hits} for hits in exact.search(queries, k)]
+        store = os.path.join(tmp, "store")
+        client = chromadb.PersistentClient(path=store)
+
+        print(f"\n{'=' * 78}")
+        print(f"HNSW sweep — {len(ids)} vectors ({'store' if args.from_store else 'random'}), "
+              f"{len(queries)} queries, top-{k}, space={args.space or hnsw_settings()['space']}")
+        print(f"{'=' * 78}")
+        print(f"  {'M':>4}{'ef_constr':>11}{'build_s':>9}{'ef_search':>11}{'mean_ms':>10}{'p95_ms':>9}{f'recall@{k}':>11}")
+        for m in args.m:
+            for ef_construction in args.ef_construction:
+                coll = client.create_collection(
+                    f"sweep_{m}_{ef_construction}",
+                    configuration=collection_configuration(space=args.space, max_neighbors=m, ef_construction=ef_construction),
+                    embedding_function=None,
+                )
+                start = time.perf_counter()
+                for i in range(0, len(ids), 5000):
+                    coll.add(ids=ids[i:i + 5000], embeddings=vectors[i:i + 5000])
+                build_s = time.perf_counter() - start
+                for ef_search in args.ef_search:
+                    sync_collection_settings(coll, hnsw_settings(space=args.space, ef_search=ef_search))
+                    SharedSystemClient.clear_system_cache()
+                    client = chromadb.PersistentClient(path=store)
+                    coll = client.get_collection(coll.name, embedding_function=None)
+                    coll.query(query_embeddings=[queries[0]], n_results=k, include=[])  # warm up
+                    latencies, found = [], 0
+                    for q, expected in zip(queries, truth):
+                        start = time.perf_counter()
+                        got = coll.query(query_embeddings=[q], n_results=k, include=[])["ids"][0]
+                        latencies.append(time.perf_counter() - start)
+                        found += len(expected.intersection(got))
+                    p95 = sorted(latencies)[int(0.95 * (len(latencies) - 1))]
+                    print(f"  {m:>4}{ef_construction:>11}{build_s:>9.2f}{ef_search:>11}"
+                          f"{statistics.mean(latencies) * 1e3:>10.3f}{p95 * 1e3:>9.3f}{found / (k * len(queries)):>11.3f}")
+                client.delete_collection(coll.name)
+        print(f"{'=' * 78}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+TriageAI background worker — executes queued triage jobs.
+
+Claims jobs from the durable job table (data/jobs.db, or TRIAGE_JOBS_DB),
+drives the LangGraph workflow, publishes progress events for the patient
+portal and writes finished results to the message store. Run any number of
+these alongside (or instead of) the in-process Streamlit worker pool.
+
+Usage:
+    python scripts/triage_worker.py                 # 4 worker threads
+    python scripts/triage_worker.py --workers 8
+    python scripts/triage_worker.py --stats-every 30
+    python scripts/triage_worker.py --no-warmup     # build the graph on the first job
+
+Warm-up (graph/warmup.py) compiles the graph and loads the vector store and
+embedding model before the first job, and prints the time per step.
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="TriageAI background worker")
+    parser.add_argument("--workers", type=int, default=4, help="Worker threads (default: 4)")
+    parser.add_argument("--stats-every", type=float, default=60.0, help="Seconds between queue stats lines (default: 60)")
+    parser.add_argument("--no-warmup", action="store_true", help="Skip the startup warm-up (graph, vector store, LLM)")
+    args = parser.parse_args()
+
+    from agents.reply_templates import template_stats
+    from app.job_queue import WorkerPool, get_job_queue
+    from graph.retention import start_retention_task
+    from graph.warmup import start_warmup
+
+    queue = get_job_queue()
+    warmup = None if args.no_warmup else start_warmup()
+    pool = WorkerPool(queue, workers=args.workers).start()
+    start_retention_task()
+    print(f"TriageAI worker started ({args.workers} threads) on {queue.path}")
+    if warmup is not None:
+        warmup.wait()
+        report = warmup.status()
+        print(f"Warm-up {report['state']} in {report['elapsed_s']:.1f}s")
+        for name, step in report["steps"].items():
+            print(f"  {name:<13}{step['status']:<9}{step['seconds']:>7.2f}s  {step['detail']}")
+
+    try:
+        while True:
+            time.sleep(args.stats_every)
+            st = queue.stats()
+            print(f"  queued={st['queued']} running={st['running']} done={st['done']} failed={st['failed']} | "
+                  f"wait p50={st['wait_s']['p50']:.1f}s p95={st['wait_s']['p95']:.1f}s | "
+                  f"service p50={st['service_s']['p50']:.1f}s p95={st['service_s']['p95']:.1f}s")
+            tpl = template_stats()
+            if tpl["low_messages"]:
+                print(f"  LOW replies: templates {tpl['hits']}/{tpl['low_messages']} ({tpl['hit_rate']:.0%}) | "
+                      f"template {tpl['mean_template_ms']:.1f}ms vs LLM {tpl['mean_llm_ms']:.0f}ms | "
+                      f"saved ~{tpl['saved_ms_per_low']:.0f}ms per LOW message")
+    except KeyboardInterrupt:
+        print("Stopping workers...")
+        pool.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -53,6 +53,11 @@ create index if not exists idx_messages_user_id on public.messages(user_id);
 create index if not exists idx_messages_patient_id on public.messages(patient_id);
 create index if not exists idx_messages_created_at on public.messages(created_at desc);
 
+-- Triage job queue: the workflow thread a message was triaged in. Unique so a job
+-- re-delivered to another worker stores its message once. Safe to run multiple times.
+alter table public.messages add column if not exists thread_id text;
+create unique index if not exists idx_messages_thread_id on public.messages(thread_id);
+
 -- RLS: allow users to read/write their own profile and messages; staff could be given broader access via a role.
 alter table public.profiles enable row level security;
 alter table public.messages enable row level security;
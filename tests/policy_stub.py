@@ -0,0 +1,126 @@
+"""
+Offline stand-ins for the policy store: stub embeddings and a temp collection.
+
+Test and benchmark support only; the app never imports this module. The
+tests and the --stub-embeddings benchmarks need a hospital_policies
+collection without the all-MiniLM-L6-v2 download. They share these helpers
+instead of each defining its own embedding class and patching policy_agent
+by hand:
+
+  HashEmbeddings       dim values from a SHA-256 of the text: deterministic,
+                       no semantics (ranking tests, latency benchmarks);
+                       every input batch is recorded in .calls
+  TrigramEmbeddings    hashed character-trigram counts, L2-normalized: texts
+                       that share wording score closer (recall benchmarks)
+  create_stub_collection()
+                       a hospital_policies collection at path, seeded with
+                       the tagged DEFAULT_POLICIES unless documents is given
+  point_policy_agent() make agents.policy_agent serve a store at path and
+                       drop its derived state (BM25 index, matrix, cache)
+  stub_policy_store()  both of the above as a context manager that restores
+                       policy_agent on exit
+
+Vector quality from either embedding says nothing about the real model;
+latencies and lexical results do.
+"""
+import hashlib
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional
+
+import numpy as np
+from chromadb import Documents, EmbeddingFunction, Embeddings
+
+COLLECTION_NAME = "hospital_policies"
+
+
+class HashEmbeddings(EmbeddingFunction):
+    """SHA-256 bytes of the text, centred on zero."""
+
+    def __init__(self, dim: int = 8):
+        self.dim = dim
+        self.calls: list[list[str]] = []
+
+    def __call__(self, input: Documents) -> Embeddings:
+        self.calls.append(list(input))
+        return [[b / 255 - 0.5 for b in hashlib.sha256(t.encode()).digest()[:self.dim]] for t in input]
+
+    @staticmethod
+    def name() -> str:
+        return "stub-hash"
+
+
+class TrigramEmbeddings(EmbeddingFunction):
+    """Counts of hashed character trigrams, L2-normalized."""
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def __call__(self, input: Documents) -> Embeddings:
+        out = []
+        for text in input:
+            v = np.zeros(self.dim, dtype=np.float32)
+            t = f"  {text.lower()}  "
+            for i in range(len(t) - 2):
+                v[int.from_bytes(hashlib.md5(t[i:i + 3].encode()).digest()[:2], "little") % self.dim] += 1
+            out.append(v / (np.linalg.norm(v) or 1.0))
+        return out
+
+    @staticmethod
+    def name() -> str:
+        return "stub-trigram"
+
+
+def create_stub_collection(
+    path: str,
+    documents: Optional[list[str]] = None,
+    ids: Optional[list[str]] = None,
+    metadatas: Optional[list[dict]] = None,
+    embedding_function: Optional[EmbeddingFunction] = None,
+    configuration: Optional[dict[str, Any]] = None,
+):
+    """A new hospital_policies collection at path. Without documents it holds
+    DEFAULT_POLICIES (ids policy_0 .., department metadata); pass documents=[]
+    for an empty one."""
+    import chromadb
+    from agents.policy_agent import DEFAULT_POLICIES, DEFAULT_POLICY_METADATA
+
+    if documents is None:
+        documents, metadatas = DEFAULT_POLICIES, metadatas or DEFAULT_POLICY_METADATA
+    kwargs = {"configuration": configuration} if configuration else {}
+    coll = chromadb.PersistentClient(path=path).create_collection(
+        COLLECTION_NAME, embedding_function=embedding_function or HashEmbeddings(), **kwargs
+    )
+    if documents:
+        coll.add(documents=documents, ids=ids or [f"policy_{i}" for i in range(len(documents))], metadatas=metadatas)
+    return coll
+
+
+def point_policy_agent(path: str, collection=None, opener: Optional[Callable[[], Any]] = None) -> None:
+    """Serve agents.policy_agent lookups from the store at path: a fixed
+    collection handle, or opener() on every (re)open."""
+    from agents import policy_agent
+    from graph.lazy_init import LazyInit
+
+    policy_agent.VECTOR_STORE_PATH = path
+    policy_agent._collection = LazyInit(opener or (lambda: collection), name=f"{COLLECTION_NAME} collection")
+    policy_agent._lexical.clear()
+    policy_agent._policy_cache.clear()
+    policy_agent._matrix = None
+
+
+@contextmanager
+def stub_policy_store(path: str, **kwargs) -> Iterator[Any]:
+    """create_stub_collection(path, **kwargs) behind policy_agent for the
+    duration of the block; the previous store and caches are restored after."""
+    from agents import policy_agent
+
+    saved = policy_agent.VECTOR_STORE_PATH, policy_agent._collection
+    try:
+        coll = create_stub_collection(path, **kwargs)
+        point_policy_agent(path, coll)
+        yield coll
+    finally:
+        policy_agent.VECTOR_STORE_PATH, policy_agent._collection = saved
+        policy_agent._lexical.clear()
+        policy_agent._policy_cache.clear()
+        policy_agent._matrix = None